@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Stored analysis results for the dashboard, with an in-memory TTL cache in front.
+
+AnalysisStore keeps the latest analysis of each publication on disk, as
+JSON or, when pyarrow is installed, as memory-mapped Arrow IPC files.
+AnalysisCache serves from memory (falling back to the store), returns stale
+results immediately while refreshing them in the background, and only runs
+an analysis in the caller's thread when nothing has been stored yet.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Optional, Set, Tuple
+
+import arrow_store
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisStore:
+    """Directory holding the latest analysis per publication, one file each.
+
+    file_format is 'json' or 'arrow'; by default Arrow is used when pyarrow
+    is installed, since it loads back much faster for large archives.
+    Analyses are saved in file_format, but a publication stored only in the
+    other format (e.g. JSON written before pyarrow was installed) is still
+    loaded, and rewritten in file_format on the next save.
+    """
+
+    def __init__(self, directory: str = 'analysis_store', file_format: Optional[str] = None):
+        if file_format is None:
+            file_format = 'arrow' if arrow_store.available() else 'json'
+        if file_format not in ('json', 'arrow'):
+            raise ValueError(f"Unknown analysis store format: {file_format}")
+        self.directory = directory
+        self.file_format = file_format
+        self._lock = threading.Lock()
+
+    def _path(self, publication_name: str, file_format: Optional[str] = None) -> str:
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', publication_name.lower())
+        return os.path.join(self.directory, f"{safe_name}.{file_format or self.file_format}")
+
+    def load(self, publication_name: str) -> Optional[Tuple[Dict, datetime]]:
+        """Return (analysis, stored_at) for a publication, or None."""
+        formats = [self.file_format] + [f for f in ('json', 'arrow') if f != self.file_format]
+        for file_format in formats:
+            if file_format == 'arrow' and not arrow_store.available():
+                continue
+            path = self._path(publication_name, file_format)
+            if os.path.exists(path):
+                return self._read(path, file_format)
+        return None
+
+    @staticmethod
+    def _read(path: str, file_format: str) -> Optional[Tuple[Dict, datetime]]:
+        try:
+            if file_format == 'arrow':
+                analysis = arrow_store.read_analysis(path)
+                stored_at = analysis.pop('stored_at')
+            else:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                analysis, stored_at = entry['analysis'], entry['stored_at']
+            return analysis, datetime.fromisoformat(stored_at)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable stored analysis %s: %s", path, e)
+            return None
+
+    def save(self, publication_name: str, analysis: Dict, stored_at: Optional[datetime] = None) -> None:
+        """Write a publication's analysis to disk atomically."""
+        path = self._path(publication_name)
+        stored_at = (stored_at or datetime.now()).isoformat()
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            if self.file_format == 'arrow':
+                arrow_store.write_analysis(analysis, path, extra_metadata={'stored_at': stored_at})
+                return
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'stored_at': stored_at, 'analysis': analysis}, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, path)
+
+
+class AnalysisCache:
+    """TTL cache of analyses with stale-while-revalidate refreshes.
+
+    analyze(publication_name) produces a fresh analysis dict; results with
+    an 'error' key are returned but never cached or stored.
+    """
+
+    def __init__(self, analyze: Callable[[str], Dict], store: Optional[AnalysisStore] = None,
+                 ttl_seconds: float = 3600, refresh_workers: int = 1):
+        self.analyze = analyze
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # publication -> (analysis, stored_at as a time.time() timestamp)
+        self._entries: Dict[str, Tuple[Dict, float]] = {}
+        self._refreshing: Set[str] = set()
+        # First-time analyses in flight; concurrent misses wait on the same one
+        self._misses: Dict[str, Future] = {}
+        self._refresh_pool = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix='analysis-refresh')
+
+    @staticmethod
+    def _key(publication_name: str) -> str:
+        return publication_name.lower()
+
+    def _lookup(self, key: str) -> Optional[Tuple[Dict, float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None and self.store is not None:
+            stored = self.store.load(key)
+            if stored is not None:
+                entry = (stored[0], stored[1].timestamp())
+                with self._lock:
+                    entry = self._entries.setdefault(key, entry)
+        return entry
+
+    def get(self, publication_name: str) -> Dict:
+        """Return the cached analysis, refreshing it in the background once stale."""
+        key = self._key(publication_name)
+        entry = self._lookup(key)
+        if entry is None:
+            return self._analyze_miss(key)
+
+        analysis, stored_at = entry
+        if time.time() - stored_at > self.ttl_seconds:
+            self.refresh_in_background(key)
+        return analysis
+
+    def _analyze_miss(self, key: str) -> Dict:
+        """Analyze an uncached publication once, however many callers ask for it at the same time."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry[0]
+            future = self._misses.get(key)
+            owner = future is None
+            if owner:
+                future = self._misses[key] = Future()
+        if not owner:
+            return future.result()
+
+        logger.info("No stored analysis for %s, running fresh analysis...", key)
+        try:
+            analysis = self._refresh(key)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(analysis)
+            return analysis
+        finally:
+            with self._lock:
+                self._misses.pop(key, None)
+
+    def put(self, publication_name: str, analysis: Dict) -> None:
+        """Cache and store an analysis produced elsewhere (e.g. a dashboard job)."""
+        if 'error' in analysis:
+            return
+        key = self._key(publication_name)
+        now = time.time()
+        with self._lock:
+            self._entries[key] = (analysis, now)
+        if self.store is not None:
+            self.store.save(key, analysis, datetime.fromtimestamp(now))
+
+    def invalidate(self, publication_name: str) -> None:
+        with self._lock:
+            self._entries.pop(self._key(publication_name), None)
+
+    def refresh_in_background(self, publication_name: str) -> bool:
+        """Schedule a refresh unless one is already running; returns True if scheduled."""
+        key = self._key(publication_name)
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+        self._refresh_pool.submit(self._background_refresh, key)
+        return True
+
+    def _background_refresh(self, key: str) -> None:
+        try:
+            self._refresh(key)
+        except Exception as e:
+            logger.warning("Background refresh of %s failed: %s", key, e)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _refresh(self, key: str) -> Dict:
+        analysis = self.analyze(key)
+        self.put(key, analysis)
+        return analysis
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._refresh_pool.shutdown(wait=wait)
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar on-disk format for analysis results (Arrow IPC or Parquet).
+
+all_posts is written as a table with one typed column per field, and the
+rest of the analysis (publication, analytics, statistics, top posts) goes
+into the schema metadata. Arrow IPC files are written uncompressed so
+read_posts_table can memory-map them without copying; Parquet is smaller
+on disk and is read with memory mapping too.
+
+pyarrow is optional: importing this module always works, but writing or
+reading raises ImportError when it is not installed.
+"""
+
+import json
+import os
+from typing import Dict, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - exercised only without pyarrow
+    pa = ipc = pq = None
+
+# Schema metadata key holding everything except all_posts
+METADATA_KEY = b'substack_analysis'
+
+PARQUET_EXTENSIONS = ('.parquet',)
+
+# Post field -> Arrow type name
+POST_FIELDS = [
+    ('title', 'string'),
+    ('link', 'string'),
+    ('description', 'string'),
+    ('pub_date', 'string'),
+    ('author', 'string'),
+    ('likes', 'string'),
+    ('comments', 'string'),
+    ('shares', 'string'),
+    ('restacks', 'string'),
+    ('likes_num', 'int64'),
+    ('comments_num', 'int64'),
+    ('shares_num', 'int64'),
+    ('restacks_num', 'int64'),
+    ('word_count', 'int64'),
+    ('reading_time', 'int64'),
+    ('total_engagement', 'int64'),
+    ('engagement_rate', 'float64'),
+    ('fetch_error', 'string'),
+]
+
+
+def available() -> bool:
+    """True if pyarrow is installed."""
+    return pa is not None
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("pyarrow is required for Arrow/Parquet export (pip install pyarrow)")
+
+
+def _is_parquet(path: str) -> bool:
+    return path.lower().endswith(PARQUET_EXTENSIONS)
+
+
+def post_schema():
+    _require_pyarrow()
+    return pa.schema([pa.field(name, getattr(pa, type_name)()) for name, type_name in POST_FIELDS])
+
+
+def _top_post_rows(analysis: Dict) -> List[int]:
+    all_posts = analysis.get('all_posts', [])
+    by_id = {id(post): i for i, post in enumerate(all_posts)}
+    by_link = {}
+    for i, post in enumerate(all_posts):
+        by_link.setdefault(post.get('link'), i)
+    rows = []
+    for post in analysis.get('top_posts', []):
+        row = by_id.get(id(post), by_link.get(post.get('link')))
+        if row is not None:
+            rows.append(row)
+    return rows
+
+
+def analysis_to_table(analysis: Dict, extra_metadata: Optional[Dict] = None):
+    """Build a pyarrow Table of all_posts, carrying the rest of the analysis as metadata."""
+    _require_pyarrow()
+    schema = post_schema()
+    posts = analysis.get('all_posts', [])
+    columns = [pa.array([post.get(name) for post in posts], type=field.type)
+               for name, field in zip(schema.names, schema)]
+    metadata = {key: value for key, value in analysis.items() if key not in ('all_posts', 'top_posts')}
+    metadata['top_post_rows'] = _top_post_rows(analysis)
+    metadata.update(extra_metadata or {})
+    schema = schema.with_metadata({METADATA_KEY: json.dumps(metadata, default=str).encode('utf-8')})
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def write_analysis(analysis: Dict, path: str, extra_metadata: Optional[Dict] = None) -> str:
+    """Write an analysis to path; .parquet gives Parquet, anything else Arrow IPC."""
+    table = analysis_to_table(analysis, extra_metadata)
+    tmp_path = f"{path}.tmp"
+    if _is_parquet(path):
+        pq.write_table(table, tmp_path)
+    else:
+        with pa.OSFile(tmp_path, 'wb') as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_posts_table(path: str):
+    """Load the posts table; Arrow IPC files are memory-mapped without copying."""
+    _require_pyarrow()
+    if _is_parquet(path):
+        return pq.read_table(path, memory_map=True)
+    with pa.memory_map(path, 'r') as source:
+        return ipc.open_file(source).read_all()
+
+
+def read_metadata(table) -> Dict:
+    """The non-post part of an analysis stored with a posts table."""
+    raw = (table.schema.metadata or {}).get(METADATA_KEY)
+    return json.loads(raw) if raw else {}
+
+
+def read_analysis(path: str) -> Dict:
+    """Load an analysis written by write_analysis back into analyze_publication's dict shape."""
+    table = read_posts_table(path)
+    analysis = read_metadata(table)
+    all_posts = table.to_pylist()
+    for post in all_posts:
+        if post.get('fetch_error') is None:
+            post.pop('fetch_error', None)
+    analysis['all_posts'] = all_posts
+    analysis['top_posts'] = [all_posts[i] for i in analysis.pop('top_post_rows', []) if i < len(all_posts)]
+    return analysis
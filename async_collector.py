@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+"""
+Native asyncio variant of the Substack collector.
+
+AsyncSubstackCollector has the same public surface as SubstackDataCollector
+(fetch_posts, get_publication_info, get_post_engagement,
+analyze_publication), as coroutines. Requests go through one httpx
+AsyncClient, and a shared asyncio.Semaphore caps how many are in flight, so
+thousands of post fetches across many publications can run in one process
+without a thread per request. Rate limiting, retries and backoff follow the
+synchronous collector, but waits are awaited instead of slept. Feed and page
+parsing run in an executor (threads by default; a ProcessPoolExecutor also
+works) so the event loop only does network I/O.
+
+Needs httpx (pip install httpx). The HTTP cache, page capture and
+incremental runs are only available on the synchronous collector.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+from xml.etree import ElementTree
+
+from data_collector import SubstackDataCollector
+from extract_pool import extract_homepage, extract_post_engagement
+from metrics import PhaseStats
+from parser_backend import parse_html
+from rate_limiter import AdaptiveRateLimiter, HostRateLimiter
+from retry_policy import RetryPolicy, parse_retry_after
+from transport import DEFAULT_USER_AGENT, Transport, accept_encoding
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+# Every wrapped synchronous collector gets this one transport: they never send
+# requests, so none of them should open its own session and connection pool
+_unused_transport: Optional[Transport] = None
+
+
+def _shared_unused_transport() -> Transport:
+    global _unused_transport
+    if _unused_transport is None:
+        _unused_transport = Transport(pool_size=1)
+    return _unused_transport
+
+
+def parse_feed(content: bytes, limit: Optional[int] = None) -> List[Dict]:
+    """Worker: post dicts from a downloaded RSS feed (the first limit, if given)."""
+    parser = ElementTree.XMLPullParser(events=('end',))
+    parser.feed(content)
+    parser.close()
+    posts = []
+    for post in SubstackDataCollector._rss_posts_from_events(parser):
+        if limit is not None and len(posts) >= limit:
+            break
+        posts.append(post)
+    return posts
+
+
+def new_client(max_concurrency: int = 20, connect_timeout: float = 5.0,
+               read_timeout: float = 30.0) -> 'httpx.AsyncClient':
+    """A pooled AsyncClient sized for max_concurrency requests in flight."""
+    return httpx.AsyncClient(
+        headers={'User-Agent': DEFAULT_USER_AGENT, 'Accept-Encoding': accept_encoding()},
+        follow_redirects=True,
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+        limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+    )
+
+
+class AsyncSubstackCollector:
+    """Asyncio counterpart of SubstackDataCollector for one publication.
+
+    Pass the same client, semaphore and rate_limiter to many collectors to
+    share connections and the global in-flight cap. Any other keyword
+    arguments (parser_backend, subscriber_pipeline, snapshot_store,
+    metrics_registry, ...) configure the wrapped synchronous collector,
+    which provides the parsing, aggregation and export helpers.
+    """
+
+    def __init__(self, publication_input: str, max_concurrency: int = 20,
+                 requests_per_second: float = 1.0,
+                 rate_limiter: Optional[HostRateLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 client: Optional['httpx.AsyncClient'] = None,
+                 semaphore: Optional[asyncio.Semaphore] = None,
+                 parse_executor: Optional[Executor] = None,
+                 connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 **collector_kwargs):
+        if httpx is None:
+            raise ImportError("The asyncio collector needs httpx (pip install httpx)")
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(requests_per_second)
+        self.retry_policy = retry_policy or RetryPolicy()
+        # The synchronous collector never sends a request here; it only
+        # provides URLs, parsing, aggregation and export
+        collector_kwargs.setdefault('transport', _shared_unused_transport())
+        self.collector = SubstackDataCollector(publication_input, rate_limiter=self.rate_limiter,
+                                               retry_policy=self.retry_policy, **collector_kwargs)
+        self.base_url = self.collector.base_url
+        self.publication_name = self.collector.publication_name
+        self.parser_backend = self.collector.parser_backend
+        # Global cap on requests in flight; share one across collectors
+        self.semaphore = semaphore or asyncio.Semaphore(self.max_concurrency)
+        # None runs parsing on the event loop's default thread pool
+        self.parse_executor = parse_executor
+
+        self._owns_client = client is None
+        self.client = client or new_client(self.max_concurrency, connect_timeout, read_timeout)
+
+    @property
+    def stats(self):
+        return self.collector.stats
+
+    @property
+    def subscriber_count_strategy(self) -> Optional[str]:
+        return self.collector.subscriber_count_strategy
+
+    async def aclose(self) -> None:
+        """Close the HTTP client if this collector created it."""
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def _parse(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.parse_executor, func, *args)
+
+    async def _get(self, url: str, headers: Optional[Dict[str, str]] = None) -> 'httpx.Response':
+        """GET through the rate limiter, retrying throttled, 5xx and failed requests with backoff.
+
+        Mirrors SubstackDataCollector._send_with_retries; only the request
+        itself holds a semaphore slot, never the waits.
+        """
+        policy = self.retry_policy
+        attempt = 0
+        while True:
+            delay = self.rate_limiter.reserve(url)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            started = time.monotonic()
+            try:
+                async with self.semaphore:
+                    response = await self.client.get(url, headers=headers)
+            except httpx.TransportError as e:
+                self.rate_limiter.record(url, None, time.monotonic() - started)
+                self.stats.count('http_errors', error=type(e).__name__)
+                if attempt >= policy.max_retries:
+                    raise
+                delay = policy.backoff(attempt)
+                logger.info("%s for %s, retry %s in %.1fs", type(e).__name__, url, attempt + 1, delay)
+            else:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                self.rate_limiter.record(url, response.status_code, time.monotonic() - started, retry_after)
+                self.stats.count('http_responses', status=response.status_code)
+                if not policy.should_retry(response.status_code, attempt):
+                    return response
+                delay = policy.backoff(attempt, retry_after)
+                logger.info("HTTP %s for %s, retry %s in %.1fs", response.status_code, url, attempt + 1, delay)
+            self.stats.count('http_retries')
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def fetch_posts(self, limit: int = None) -> List[Dict]:
+        """Fetch posts from the publication RSS feed."""
+        if limit is not None and limit <= 0:
+            return []
+        try:
+            with self.stats.time('feed_fetch'):
+                response = await self._get(f"{self.base_url}/feed")
+                response.raise_for_status()
+                return await self._parse(parse_feed, response.content, limit)
+        except Exception as e:
+            logger.warning("Error fetching posts: %s", e)
+            return []
+
+    def _parse_homepage(self, html: str) -> Tuple[Optional[str], Optional[int]]:
+        # Thread-only fallback for pipelines with custom (unpicklable) strategies
+        soup = parse_html(html, self.parser_backend)
+        title = soup.find('title')
+        return (title.text if title else None), self.collector._extract_subscriber_count(soup, html)
+
+    async def get_publication_info(self) -> Dict:
+        """Get basic publication information using HTML scraping."""
+        collector = self.collector
+        try:
+            logger.debug("Fetching publication page: %s", self.base_url)
+            with self.stats.time('homepage_fetch'):
+                response = await self._get(self.base_url)
+                response.raise_for_status()
+
+            strategy_order = collector.subscriber_pipeline.portable_order(collector.publication_key)
+            with self.stats.time('extraction'):
+                if strategy_order is not None:
+                    title_text, subscriber_count, collector.subscriber_count_strategy = await self._parse(
+                        extract_homepage, response.content, response.charset_encoding,
+                        self.parser_backend, self.publication_name, strategy_order)
+                    if collector.subscriber_count_strategy:
+                        collector.subscriber_pipeline.record_win(collector.publication_key,
+                                                                 collector.subscriber_count_strategy)
+                else:
+                    title_text, subscriber_count = await asyncio.get_running_loop().run_in_executor(
+                        None, self._parse_homepage, response.text)
+
+            if subscriber_count is None:
+                logger.info("Subscriber count not found in HTML. Trying alternative methods...")
+                with self.stats.time('api_fetch'):
+                    subscriber_count = await self._get_subscriber_count_from_api()
+
+            if subscriber_count is None:
+                logger.info("Subscriber count not publicly available for this publication")
+
+            return {
+                'name': title_text or f"{self.publication_name} | Substack",
+                'url': self.base_url,
+                'subscriber_count': subscriber_count,
+                'last_updated': datetime.now().isoformat(),
+            }
+        except Exception as e:
+            logger.warning("Error fetching publication info: %s", e)
+            return {
+                'name': f"{self.publication_name} | Substack",
+                'url': self.base_url,
+                'subscriber_count': None,
+                'last_updated': datetime.now().isoformat(),
+            }
+
+    async def _get_subscriber_count_from_api(self) -> Optional[int]:
+        try:
+            url, headers = self.collector._subscriber_search_request()
+            response = await self._get(url, headers=headers)
+            response.raise_for_status()
+            return self.collector._subscriber_count_from_search(response.json())
+        except Exception as e:
+            logger.error("Error fetching subscriber count from API: %s", e)
+            return None
+
+    async def get_post_engagement(self, post_url: str) -> Dict:
+        """Get engagement metrics for a specific post."""
+        try:
+            with self.stats.time('post_fetch'):
+                response = await self._get(post_url)
+                response.raise_for_status()
+            with self.stats.time('extraction'):
+                return await self._parse(extract_post_engagement, response.content,
+                                         response.charset_encoding, self.parser_backend)
+        except Exception as e:
+            logger.warning("Error fetching engagement for %s: %s", post_url, e)
+            return self.collector._engagement_error(e)
+
+    async def analyze_publication(self, limit: int = None, max_workers: Optional[int] = None,
+                                  progress_callback: Optional[Callable[[int, int], None]] = None,
+                                  posts: Optional[List[Dict]] = None,
+                                  publication_info: Optional[Dict] = None) -> Dict:
+        """Perform comprehensive analysis of the publication.
+
+        Returns the same dict as SubstackDataCollector.analyze_publication.
+        The homepage and the feed are fetched together, then every post.
+        max_workers caps this publication's post fetches in flight (the
+        shared semaphore always applies). progress_callback(done, total)
+        is called on the event loop as each post completes.
+        """
+        logger.info("Starting comprehensive analysis...")
+        self.collector.stats = PhaseStats(self.collector.metrics_registry)
+        started = time.perf_counter()
+
+        pub_info_task = (self.get_publication_info() if publication_info is None
+                         else _resolved(publication_info))
+        posts_task = self.fetch_posts(limit or None) if posts is None else _resolved(posts[:limit] if limit else posts)
+        pub_info, posts = await asyncio.gather(pub_info_task, posts_task)
+
+        if not posts:
+            self.stats.count('analyses', outcome='no_posts')
+            return {"error": "No posts found"}
+
+        total_posts = len(posts)
+        logger.info("Found %s posts to analyze", total_posts)
+        window = asyncio.Semaphore(max(1, max_workers)) if max_workers is not None else None
+        done = 0
+
+        async def analyze_one(post: Dict) -> Dict:
+            nonlocal done
+            if window is None:
+                engagement = await self.get_post_engagement(post['link'])
+            else:
+                async with window:
+                    engagement = await self.get_post_engagement(post['link'])
+            done += 1
+            if progress_callback is not None:
+                progress_callback(done, total_posts)
+            return engagement
+
+        engagements = await asyncio.gather(*(analyze_one(post) for post in posts))
+        return self.collector._build_analysis(pub_info, posts, list(engagements), started)
+
+    def export_to_excel(self, analysis_data: Dict, filename: str = None, streaming: bool = False, **kwargs) -> str:
+        return self.collector.export_to_excel(analysis_data, filename, streaming=streaming, **kwargs)
+
+
+async def _resolved(value):
+    return value
+
+
+async def analyze_publications(publications: Iterable[str], max_concurrency: int = 100,
+                               requests_per_second: float = 1.0,
+                               per_publication_workers: Optional[int] = None,
+                               **kwargs) -> AsyncIterator[Tuple[str, Dict]]:
+    """Analyze many publications on one event loop, yielding each result as soon as it is ready.
+
+    All collectors share one client, semaphore (max_concurrency requests in
+    flight in total) and rate limiter. limit and progress_callback are
+    passed to every analyze_publication call; the rest configure the
+    collectors.
+    """
+    if httpx is None:
+        raise ImportError("The asyncio collector needs httpx (pip install httpx)")
+    analyze_kwargs = {key: kwargs.pop(key) for key in ('limit', 'progress_callback') if key in kwargs}
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    rate_limiter = kwargs.pop('rate_limiter', None) or AdaptiveRateLimiter(requests_per_second)
+    async with new_client(max(1, max_concurrency)) as client:
+
+        async def analyze_one(publication: str) -> Tuple[str, Dict]:
+            try:
+                collector = AsyncSubstackCollector(publication, max_concurrency=max_concurrency,
+                                                   rate_limiter=rate_limiter, client=client,
+                                                   semaphore=semaphore, **kwargs)
+                return publication, await collector.analyze_publication(
+                    max_workers=per_publication_workers, **analyze_kwargs)
+            except Exception as e:
+                logger.error("Analysis of %s failed: %s", publication, e)
+                return publication, {"error": str(e)}
+
+        for task in asyncio.as_completed([analyze_one(publication) for publication in publications]):
+            yield await task
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Batch analysis of many Substack publications over one shared fetch pool.
+
+Every homepage, feed and post fetch from every publication runs on a single
+thread pool, so max_concurrency is a global cap on requests in flight. A
+shared AdaptiveRateLimiter paces each host, and per_publication_workers bounds
+how much of the pool one publication can hold at a time. Results are
+yielded as soon as each publication finishes, so one slow publication does
+not hold up the others. All collectors share one Transport whose connection
+pool matches max_concurrency, so TLS connections are reused across
+publications. With extraction_processes set (0 = one per core), page
+parsing and extraction run in a shared process pool, so they scale past
+one core. refresh() first checks each feed against a FeedDigestStore and
+only runs the full analysis for publications whose feed changed.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from data_collector import SubstackDataCollector
+from extract_pool import ExtractorPool
+from feed_digest import FeedDigestStore
+from rate_limiter import AdaptiveRateLimiter, HostRateLimiter
+from transport import Transport
+
+logger = logging.getLogger(__name__)
+
+
+class BatchAnalyzer:
+    """Analyze a list of publications with cross-publication scheduling."""
+
+    def __init__(self, max_concurrency: int = 16, per_publication_workers: int = 4,
+                 requests_per_second: float = 1.0, max_publications_in_flight: Optional[int] = None,
+                 rate_limiter: Optional[HostRateLimiter] = None,
+                 extraction_processes: Optional[int] = None,
+                 collector_factory: Callable[..., SubstackDataCollector] = SubstackDataCollector,
+                 **collector_kwargs):
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_publication_workers = max(1, per_publication_workers)
+        self.max_publications_in_flight = max_publications_in_flight or self.max_concurrency
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(requests_per_second)
+        self.collector_factory = collector_factory
+        # Passed through to every collector (e.g. http_cache, parser_backend, transport)
+        self._owns_transport = 'transport' not in collector_kwargs
+        if self._owns_transport:
+            collector_kwargs['transport'] = Transport(pool_size=self.max_concurrency)
+        # Pipeline mode: fetch threads hand page bytes to extractor processes
+        self._owns_extractor_pool = extraction_processes is not None and 'extractor_pool' not in collector_kwargs
+        if self._owns_extractor_pool:
+            collector_kwargs['extractor_pool'] = ExtractorPool(max_workers=extraction_processes or None)
+        self.collector_kwargs = collector_kwargs
+        self._fetch_pool = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                              thread_name_prefix='substack-fetch')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the shared fetch pool and the transport and extractor pool it created."""
+        self._fetch_pool.shutdown(wait=True)
+        if self._owns_transport:
+            self.collector_kwargs['transport'].close()
+        if self._owns_extractor_pool:
+            self.collector_kwargs['extractor_pool'].shutdown()
+
+    def _collector(self, publication: str) -> SubstackDataCollector:
+        return self.collector_factory(
+            publication,
+            max_workers=self.per_publication_workers,
+            rate_limiter=self.rate_limiter,
+            executor=self._fetch_pool,
+            **self.collector_kwargs,
+        )
+
+    def _analyze_one(self, publication: str, analyze_kwargs: Dict) -> Dict:
+        try:
+            return self._collector(publication).analyze_publication(**analyze_kwargs)
+        except Exception as e:
+            logger.error("Error analyzing %s: %s", publication, e)
+            return {"error": str(e)}
+
+    def _refresh_one(self, publication: str, digest_store: FeedDigestStore, unchanged: str,
+                     previous: Optional[Callable[[str], Optional[Dict]]], analyze_kwargs: Dict) -> Optional[Dict]:
+        try:
+            previous_analysis = previous(publication) if previous is not None else None
+            return self._collector(publication).refresh_publication(
+                digest_store, unchanged=unchanged, previous_analysis=previous_analysis, save=False,
+                **analyze_kwargs)
+        except Exception as e:
+            logger.error("Error refreshing %s: %s", publication, e)
+            return {"error": str(e)}
+
+    def refresh(self, publications: Iterable[str], digest_store: FeedDigestStore, unchanged: str = 'skip',
+                previous: Optional[Callable[[str], Optional[Dict]]] = None,
+                **analyze_kwargs) -> Iterator[Tuple[str, Optional[Dict]]]:
+        """Like analyze(), but publications whose feed did not change are skipped or lightly refreshed.
+
+        Skipped publications are yielded with None. previous(publication)
+        may return the last analysis, whose publication info and posts an
+        unchanged='light' refresh reuses instead of refetching them. The
+        digest store is written once, when the batch ends.
+        """
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_publications_in_flight,
+                                    thread_name_prefix='substack-batch') as coordinators:
+                futures = {
+                    coordinators.submit(self._refresh_one, publication, digest_store, unchanged,
+                                        previous, analyze_kwargs): publication
+                    for publication in publications
+                }
+                for future in as_completed(futures):
+                    yield futures[future], future.result()
+        finally:
+            digest_store.save()
+
+    def analyze(self, publications: Iterable[str], **analyze_kwargs) -> Iterator[Tuple[str, Dict]]:
+        """Yield (publication, analysis) pairs in completion order.
+
+        analyze_kwargs (limit, incremental, freshness_days, ...) are passed to
+        every analyze_publication call.
+        """
+        # Coordinators only wait on the fetch pool; they never fetch themselves
+        with ThreadPoolExecutor(max_workers=self.max_publications_in_flight,
+                                thread_name_prefix='substack-batch') as coordinators:
+            futures = {
+                coordinators.submit(self._analyze_one, publication, analyze_kwargs): publication
+                for publication in publications
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+
+def analyze_publications(publications: Iterable[str], max_concurrency: int = 16,
+                         **kwargs) -> Iterator[Tuple[str, Dict]]:
+    """Analyze many publications, yielding each result as soon as it is ready.
+
+    Keyword arguments understood by analyze_publication (limit, incremental,
+    freshness_days, refetch_after_days, source) are applied to every
+    publication; the rest configure the BatchAnalyzer.
+    """
+    analyze_kwargs = {key: kwargs.pop(key) for key in ('limit', 'incremental', 'freshness_days',
+                                                       'refetch_after_days', 'source')
+                      if key in kwargs}
+    with BatchAnalyzer(max_concurrency=max_concurrency, **kwargs) as batch:
+        yield from batch.analyze(publications, **analyze_kwargs)
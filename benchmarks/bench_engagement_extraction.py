@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark: single-pass engagement extraction vs. the legacy extractors.
+
+Both paths work on the same pre-parsed soup, so only extraction CPU is
+measured. Run from the repository root:
+
+    python benchmarks/bench_engagement_extraction.py [paragraphs ...]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from engagement_extractor import extract_engagement
+from legacy_extraction import extract_engagement_legacy
+
+
+def build_post_page(paragraphs: int) -> str:
+    """Build a Substack-like post page with the given number of paragraphs."""
+    body = ''.join(
+        f'<p>Paragraph {i} with <a href="/p/{i}">a link</a> and <em>some emphasis</em> '
+        f'about markets, savings and compounding over {i % 40} years.</p>'
+        for i in range(paragraphs)
+    )
+    ufi = ('<div class="post-ufi"><button data-testid="like-button" class="like-button">'
+           '<span>42</span></button><a class="post-ufi-comment-button">7 comments</a>'
+           '<button aria-label="Share"><span>Share</span></button></div>')
+    return (f'<html><head><title>Post</title></head><body>{ufi}'
+            f'<article><h1>Title</h1><div class="available-content"><div class="body markup">{body}'
+            f'</div></div></article>{ufi}</body></html>')
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(sizes):
+    print(f"{'paragraphs':>10} {'legacy ms':>10} {'single-pass ms':>15} {'speedup':>8}")
+    for paragraphs in sizes:
+        soup = BeautifulSoup(build_post_page(paragraphs), 'html.parser')
+        assert extract_engagement(soup) == extract_engagement_legacy(soup)
+        repeat = 5 if paragraphs < 5000 else 2
+        legacy = best_of(lambda: extract_engagement_legacy(soup), repeat)
+        single = best_of(lambda: extract_engagement(soup), repeat)
+        print(f"{paragraphs:>10} {legacy * 1000:>10.1f} {single * 1000:>15.1f} {legacy / single:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1000, 5000])
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: regular vs. write-only streaming Excel export.
+
+Reports wall time and peak traced memory for archives of increasing size.
+Run from the repository root:
+
+    python benchmarks/bench_excel_export.py [posts ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_collector import SubstackDataCollector
+
+
+def build_post(i: int) -> dict:
+    return {'title': f"Post {i}: notes on markets, savings and compounding", 'pub_date': "Mon, 01 Jan 2024 00:00:00 GMT",
+            'link': f"https://benchmark.substack.com/p/post-{i}", 'description': "", 'author': "",
+            'likes': str(i % 300), 'comments': str(i % 40), 'shares': "-", 'restacks': str(i % 9),
+            'likes_num': i % 300, 'comments_num': i % 40, 'shares_num': 0, 'restacks_num': i % 9,
+            'word_count': 800 + i % 2000, 'reading_time': 4.0, 'total_engagement': i % 349, 'engagement_rate': 0}
+
+
+def build_analysis(posts: int) -> dict:
+    all_posts = [build_post(i) for i in range(posts)]
+    return {
+        'publication': {'name': "benchmark", 'url': "https://benchmark.substack.com",
+                        'subscriber_count': 1000, 'last_updated': "2024-01-01T00:00:00"},
+        'analytics': {'total_posts_analyzed': posts, 'average_likes_per_post': 1.0,
+                      'average_comments_per_post': 1.0, 'average_shares_per_post': 0.0,
+                      'average_restacks_per_post': 1.0, 'average_word_count': 1000.0,
+                      'average_reading_time': 4.0, 'publishing_frequency': 1.0, 'total_engagement': 1},
+        'top_posts': all_posts[:5],
+        'all_posts': all_posts,
+    }
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024)
+
+
+def main(sizes):
+    collector = SubstackDataCollector("benchmark")
+    print(f"{'posts':>7} {'regular s':>10} {'regular MB':>11} {'streaming s':>12} {'streaming MB':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for posts in sizes:
+            analysis = build_analysis(posts)
+            path = os.path.join(tmp, f"export_{posts}.xlsx")
+            regular = measure(lambda: collector.export_to_excel(analysis, path))
+            # The generator keeps only one post alive at a time
+            streaming = measure(lambda: collector.export_to_excel(
+                analysis, path, streaming=True, posts=(build_post(i) for i in range(posts))))
+            print(f"{posts:>7} {regular[0]:>10.2f} {regular[1]:>11.1f} {streaming[0]:>12.2f} {streaming[1]:>13.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 30000])
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark corpus built from the recorded pages in fixtures/.
+
+The saved feed, homepages and posts are replayed as-is and scaled up to
+larger sizes: feeds get more items, homepages get longer archive lists, and
+the "huge" post repeats the long article body until it is about 1 MB.
+The corpus is deterministic, so results from different runs compare.
+"""
+
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Dict
+
+from replay_server import Routes
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fixtures')
+
+RECORDED_BASE_URL = 'https://cashandcache.substack.com'
+
+# Publication sizes; each post's page is chosen by cycling through 'pages'
+TIERS = {
+    'small': {'posts': 10, 'pages': ('short',), 'homepage': 'json'},
+    'medium': {'posts': 100, 'pages': ('short', 'short', 'long', 'paywalled'), 'homepage': 'json'},
+    'large': {'posts': 500, 'pages': ('long',), 'homepage': 'large'},
+    'xlarge': {'posts': 1000, 'pages': ('long',) * 9 + ('huge',), 'homepage': 'large'},
+}
+
+HUGE_POST_BYTES = 1024 * 1024
+LARGE_HOMEPAGE_PREVIEWS = 2000
+
+
+def _read(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _huge_post(long_post: str) -> str:
+    """The long post with its article paragraphs repeated to about HUGE_POST_BYTES."""
+    body_start = long_post.index('<div class="available-content"')
+    body_end = long_post.index('<div class="comments-section"')
+    paragraphs = ''.join(re.findall(r'<p>.*?</p>', long_post[body_start:body_end], re.S))
+    insert_at = long_post.rindex('</p>', body_start, body_end) + len('</p>')
+    copies = max(1, (HUGE_POST_BYTES - len(long_post)) // max(1, len(paragraphs)))
+    return long_post[:insert_at] + paragraphs * copies + long_post[insert_at:]
+
+
+def _large_homepage(homepage: str) -> str:
+    """The JSON-count homepage with a long archive list in front of the preloads."""
+    previews = ''.join(
+        f'<div class="post-preview"><a href="/p/archive-{i}">Archive post {i}</a>'
+        f'<div class="post-preview-description">Notes on budgets, taxes and savings, part {i}.</div></div>'
+        for i in range(LARGE_HOMEPAGE_PREVIEWS)
+    )
+    marker = '<div class="portable-archive-list">'
+    return homepage.replace(marker, marker + previews, 1)
+
+
+def post_pages() -> Dict[str, str]:
+    """Post pages by kind: 'short', 'paywalled', 'long' and 'huge'."""
+    long_post = _read('post_long.html')
+    return {
+        'short': _read('post_short.html'),
+        'paywalled': _read('post_paywalled.html'),
+        'long': long_post,
+        'huge': _huge_post(long_post),
+    }
+
+
+def homepages() -> Dict[str, str]:
+    """Homepages by kind: 'json' (count in preloads), 'text' (count in copy) and 'large'."""
+    json_homepage = _read('home_json_count.html')
+    return {
+        'json': json_homepage,
+        'text': _read('home_text_count.html'),
+        'large': _large_homepage(json_homepage),
+    }
+
+
+def build_feed(base_url: str, posts: int) -> str:
+    """RSS feed with posts items, cycling through the recorded items with unique links and dates."""
+    feed = _read('feed.xml')
+    items = re.findall(r'<item>.*?</item>', feed, re.S)
+    head, tail = feed[:feed.index('<item>')], feed[feed.rindex('</item>') + len('</item>'):]
+    newest = datetime(2025, 9, 14, 12, 0, tzinfo=timezone.utc)
+
+    generated = []
+    for i in range(posts):
+        item = items[i % len(items)]
+        item = re.sub(r'/p/([\w-]+)', rf'/p/\1-{i}', item)
+        item = item.replace(']]></title>', f' #{i}]]></title>', 1)
+        pub_date = format_datetime(newest - timedelta(days=3 * i), usegmt=True)
+        item = re.sub(r'<pubDate>.*?</pubDate>', f'<pubDate>{pub_date}</pubDate>', item)
+        generated.append(item)
+    return (head + ''.join(generated) + tail).replace(RECORDED_BASE_URL, base_url)
+
+
+def build_routes(tier: str, base_url: str) -> Routes:
+    """Every page of a publication of the given tier, with links pointing at base_url."""
+    spec = TIERS[tier]
+    feed = build_feed(base_url, spec['posts'])
+    pages = {kind: page.encode('utf-8') for kind, page in post_pages().items()}
+
+    routes: Routes = {
+        '/': ('text/html; charset=utf-8', homepages()[spec['homepage']].encode('utf-8')),
+        '/feed': ('application/rss+xml; charset=utf-8', feed.encode('utf-8')),
+    }
+    for i, path in enumerate(re.findall(r'<link>' + re.escape(base_url) + r'(/p/[^<]+)</link>', feed)):
+        kind = spec['pages'][i % len(spec['pages'])]
+        routes[path] = ('text/html; charset=utf-8', pages[kind])
+    for kind, page in pages.items():
+        routes[f'/p/bench-{kind}'] = ('text/html; charset=utf-8', page)
+    return routes
@@ -0,0 +1,444 @@
+# -*- coding: utf-8 -*-
+"""
+The collector's original multi-pass extractors, kept as a reference.
+
+They are no longer used by SubstackDataCollector; the parity tests and the
+micro-benchmarks compare the current extractors against them.
+"""
+
+import json
+import logging
+import re
+from typing import Dict, Optional
+
+from bs4 import BeautifulSoup
+
+from engagement_extractor import build_engagement
+
+logger = logging.getLogger(__name__)
+
+
+def extract_engagement_legacy(soup: BeautifulSoup) -> Dict:
+    """Engagement dict built from one full scan of the page per metric."""
+    likes_str = _extract_likes(soup)
+    comments_str = _extract_comments(soup)
+    shares_str = _extract_shares(soup)
+    restacks_str = _extract_restacks(soup)
+
+    # Extract word count from post content
+    content = soup.find('div', class_='post-content') or soup.find('article')
+    word_count = len(content.get_text().split()) if content else 0
+
+    return build_engagement(likes_str, comments_str, shares_str, restacks_str, word_count)
+
+
+def _extract_likes(soup: BeautifulSoup) -> str:
+    """Extract likes count with improved accuracy."""
+    # Look for Substack-specific like elements
+    like_selectors = [
+        'button[data-testid="like-button"]',
+        '.like-button',
+        '[class*="like"]',
+        'button[aria-label*="like"]',
+        'button[title*="like"]'
+    ]
+
+    for selector in like_selectors:
+        elements = soup.select(selector)
+        for element in elements:
+            # Look for number in the element or its children
+            text = element.get_text()
+            match = re.search(r'(\d+)', text)
+            if match:
+                try:
+                    number = int(match.group(1))
+                    if number <= 1000:  # Realistic cap
+                        return str(number)
+                except ValueError:
+                    continue
+
+    # Fallback to general text search
+    text_content = soup.get_text()
+    patterns = [r'(\d+)\s*likes?', r'(\d+)\s*hearts?', r'(\d+)\s*favorites?']
+    for pattern in patterns:
+        match = re.search(pattern, text_content, re.IGNORECASE)
+        if match:
+            try:
+                number = int(match.group(1))
+                if number <= 1000:  # Realistic cap
+                    return str(number)
+            except ValueError:
+                continue
+
+    return "-"
+
+
+def _extract_comments(soup: BeautifulSoup) -> str:
+    """Extract comments count with improved accuracy."""
+    # Look for Substack-specific comment elements
+    comment_selectors = [
+        'button[data-testid="comment-button"]',
+        '.comment-button',
+        '[class*="comment"]',
+        'button[aria-label*="comment"]',
+        'button[title*="comment"]'
+    ]
+
+    for selector in comment_selectors:
+        elements = soup.select(selector)
+        for element in elements:
+            text = element.get_text()
+            match = re.search(r'(\d+)', text)
+            if match:
+                try:
+                    number = int(match.group(1))
+                    if number <= 100:  # Realistic cap
+                        return str(number)
+                except ValueError:
+                    continue
+
+    # Fallback to general text search
+    text_content = soup.get_text()
+    patterns = [r'(\d+)\s*comments?', r'(\d+)\s*replies?']
+    for pattern in patterns:
+        match = re.search(pattern, text_content, re.IGNORECASE)
+        if match:
+            try:
+                number = int(match.group(1))
+                if number <= 100:  # Realistic cap
+                    return str(number)
+            except ValueError:
+                continue
+
+    return "-"
+
+
+def _extract_shares(soup: BeautifulSoup) -> str:
+    """Extract shares count with improved accuracy."""
+    # Look for Substack-specific share elements
+    share_selectors = [
+        'button[data-testid="share-button"]',
+        '.share-button',
+        '[class*="share"]',
+        'button[aria-label*="share"]',
+        'button[title*="share"]'
+    ]
+
+    for selector in share_selectors:
+        elements = soup.select(selector)
+        for element in elements:
+            text = element.get_text()
+            match = re.search(r'(\d+)', text)
+            if match:
+                try:
+                    number = int(match.group(1))
+                    if number <= 1000:  # Realistic cap
+                        return str(number)
+                except ValueError:
+                    continue
+
+    # Fallback to general text search
+    text_content = soup.get_text()
+    patterns = [r'(\d+)\s*shares?', r'(\d+)\s*retweets?']
+    for pattern in patterns:
+        match = re.search(pattern, text_content, re.IGNORECASE)
+        if match:
+            try:
+                number = int(match.group(1))
+                if number <= 1000:  # Realistic cap
+                    return str(number)
+            except ValueError:
+                continue
+
+    return "-"
+
+
+def _extract_restacks(soup: BeautifulSoup) -> str:
+    """Extract restacks count with improved accuracy."""
+    # Look for Substack-specific restack elements
+    restack_selectors = [
+        'button[data-testid="restack-button"]',
+        '.restack-button',
+        '[class*="restack"]',
+        'button[aria-label*="restack"]',
+        'button[title*="restack"]',
+        'button[aria-label*="repost"]',
+        'button[title*="repost"]'
+    ]
+
+    for selector in restack_selectors:
+        elements = soup.select(selector)
+        for element in elements:
+            text = element.get_text()
+            match = re.search(r'(\d+)', text)
+            if match:
+                try:
+                    number = int(match.group(1))
+                    if number <= 1000:  # Realistic cap
+                        return str(number)
+                except ValueError:
+                    continue
+
+    # Fallback to general text search for restack patterns
+    text_content = soup.get_text()
+    patterns = [
+        r'(\d+)\s*restacks?',
+        r'(\d+)\s*reposts?',
+        r'(\d+)\s*re-shares?',
+        r'(\d+)\s*re-shares?'
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, text_content, re.IGNORECASE)
+        if match:
+            try:
+                number = int(match.group(1))
+                if number <= 1000:  # Realistic cap
+                    return str(number)
+            except ValueError:
+                continue
+
+    return "-"
+
+
+def extract_subscriber_count_legacy(soup: BeautifulSoup, publication_name: str) -> Optional[int]:
+    """Subscriber count from eight strategies tried in a fixed order, each scanning the whole page."""
+    subscriber_count = None
+
+    # Method 1: Look for Substack-specific subscriber elements
+    # Common Substack patterns for subscriber count
+    subscriber_patterns = [
+        r'(\d+)\s*subscribers?',
+        r'(\d+)\s*readers?',
+        r'(\d+)\s*members?',
+        r'(\d+)\s*people\s+subscribed',
+        r'(\d+)\s*subscribed'
+    ]
+
+    # Search in all text content
+    page_text = soup.get_text()
+    for pattern in subscriber_patterns:
+        matches = re.findall(pattern, page_text, re.IGNORECASE)
+        for match in matches:
+            try:
+                count = int(match)
+                if count > 0 and count < 1000000:  # Reasonable range
+                    subscriber_count = count
+                    logger.debug("Found subscriber count via text pattern: %s", count)
+                    break
+            except ValueError:
+                continue
+        if subscriber_count:
+            break
+
+    # Method 2: Look for specific HTML elements with subscriber data
+    if not subscriber_count:
+        # Look for elements with data attributes
+        data_elements = soup.find_all(attrs={'data-subscriber-count': True})
+        for element in data_elements:
+            try:
+                count = int(element.get('data-subscriber-count'))
+                if count > 0:
+                    subscriber_count = count
+                    logger.debug("Found subscriber count via data attribute: %s", count)
+                    break
+            except (ValueError, TypeError):
+                continue
+
+    # Method 3: Look for specific CSS classes that might contain subscriber count
+    if not subscriber_count:
+        class_patterns = [
+            'subscriber-count', 'subscriberCount', 'subscribers',
+            'reader-count', 'readerCount', 'readers',
+            'member-count', 'memberCount', 'members'
+        ]
+
+        for class_pattern in class_patterns:
+            elements = soup.find_all(class_=re.compile(class_pattern, re.IGNORECASE))
+            for element in elements:
+                text = element.get_text()
+                match = re.search(r'(\d+)', text)
+                if match:
+                    try:
+                        count = int(match.group(1))
+                        if count > 0 and count < 1000000:
+                            subscriber_count = count
+                            logger.debug("Found subscriber count via class %s: %s", class_pattern, count)
+                            break
+                    except ValueError:
+                        continue
+            if subscriber_count:
+                break
+
+    # Method 4: Look for JavaScript variables or data
+    if not subscriber_count:
+        script_tags = soup.find_all('script')
+        for script in script_tags:
+            if script.string:
+                # Look for subscriber count in JavaScript variables
+                js_patterns = [
+                    r'subscriberCount["\']?\s*[:=]\s*(\d+)',
+                    r'subscribers["\']?\s*[:=]\s*(\d+)',
+                    r'readerCount["\']?\s*[:=]\s*(\d+)',
+                    r'memberCount["\']?\s*[:=]\s*(\d+)',
+                    r'"subscriber_count"\s*:\s*(\d+)',
+                    r'"subscribers"\s*:\s*(\d+)'
+                ]
+
+                for pattern in js_patterns:
+                    matches = re.findall(pattern, script.string, re.IGNORECASE)
+                    for match in matches:
+                        try:
+                            count = int(match)
+                            if count > 0 and count < 1000000:
+                                subscriber_count = count
+                                logger.debug("Found subscriber count via JavaScript: %s", count)
+                                break
+                        except ValueError:
+                            continue
+                    if subscriber_count:
+                        break
+                if subscriber_count:
+                    break
+
+    # Method 5: Look for meta tags with subscriber information
+    if not subscriber_count:
+        meta_tags = soup.find_all('meta')
+        for meta in meta_tags:
+            name = meta.get('name', '').lower()
+            property_attr = meta.get('property', '').lower()
+            content = meta.get('content', '')
+
+            if any(keyword in name or keyword in property_attr for keyword in ['subscriber', 'reader', 'member']):
+                match = re.search(r'(\d+)', content)
+                if match:
+                    try:
+                        count = int(match.group(1))
+                        if count > 0 and count < 1000000:
+                            subscriber_count = count
+                            logger.debug("Found subscriber count via meta tag: %s", count)
+                            break
+                    except ValueError:
+                        continue
+
+    # Method 6: Look for JSON-LD structured data
+    if not subscriber_count:
+        json_scripts = soup.find_all('script', type='application/ld+json')
+        for script in json_scripts:
+            try:
+                data = json.loads(script.string)
+                if isinstance(data, dict):
+                    # Look for subscriber count in various possible keys
+                    for key in ['subscriberCount', 'subscribers', 'memberCount', 'readers', 'subscriber_count']:
+                        if key in data and isinstance(data[key], (int, str)):
+                            try:
+                                count = int(data[key])
+                                if count > 0 and count < 1000000:
+                                    subscriber_count = count
+                                    logger.debug("Found subscriber count via JSON-LD: %s", count)
+                                    break
+                            except ValueError:
+                                continue
+                    if subscriber_count:
+                        break
+            except (json.JSONDecodeError, TypeError):
+                continue
+
+    # Method 7: Look for specific Substack UI elements
+    if not subscriber_count:
+        # Look for common Substack UI patterns
+        ui_selectors = [
+            '[data-testid*="subscriber"]',
+            '[data-testid*="reader"]',
+            '[data-testid*="member"]',
+            '.subscriber-count',
+            '.reader-count',
+            '.member-count'
+        ]
+
+        for selector in ui_selectors:
+            elements = soup.select(selector)
+            for element in elements:
+                text = element.get_text()
+                match = re.search(r'(\d+)', text)
+                if match:
+                    try:
+                        count = int(match.group(1))
+                        if count > 0 and count < 1000000:
+                            subscriber_count = count
+                            logger.debug("Found subscriber count via UI selector %s: %s", selector, count)
+                            break
+                    except ValueError:
+                        continue
+                if subscriber_count:
+                    break
+            if subscriber_count:
+                break
+
+    # Method 8: Try to extract from JSON data in the HTML
+    if not subscriber_count:
+        subscriber_count = _extract_subscriber_count_from_json(str(soup), publication_name)
+        if subscriber_count:
+            logger.debug("Found subscriber count via JSON data: %s", subscriber_count)
+
+    if subscriber_count:
+        logger.debug("Final subscriber count: %s", subscriber_count)
+    else:
+        logger.debug("No subscriber count found")
+
+    return subscriber_count
+
+
+def _extract_subscriber_count_from_json(html_content: str, publication_name: str) -> Optional[int]:
+    """Extract subscriber count from JSON data in the HTML."""
+    try:
+        # First, try publication-specific patterns for any publication
+        pub_patterns = [
+            rf'"publication":\s*{{[^}}]*"subdomain":\s*"{publication_name}"[^}}]*"subscriber_count":\s*(\d+)',
+            rf'"publication":\s*{{[^}}]*"subdomain":\s*"{publication_name}"[^}}]*"subscribers":\s*(\d+)',
+            rf'"publication":\s*{{[^}}]*"subdomain":\s*"{publication_name}"[^}}]*"total_subscribers":\s*(\d+)',
+            rf'"publication":\s*{{[^}}]*"subdomain":\s*"{publication_name}"[^}}]*"subscriberCount":\s*(\d+)',
+            rf'"publication":\s*{{[^}}]*"subdomain":\s*"{publication_name}"[^}}]*"subscriber_count":\s*"(\d+)"',
+            rf'"publication":\s*{{[^}}]*"subdomain":\s*"{publication_name}"[^}}]*"subscribers":\s*"(\d+)"',
+            rf'"publication":\s*{{[^}}]*"subdomain":\s*"{publication_name}"[^}}]*"total_subscribers":\s*"(\d+)"',
+            rf'"publication":\s*{{[^}}]*"subdomain":\s*"{publication_name}"[^}}]*"subscriberCount":\s*"(\d+)"'
+        ]
+
+        for pattern in pub_patterns:
+            matches = re.findall(pattern, html_content, re.IGNORECASE | re.DOTALL)
+            for match in matches:
+                try:
+                    count = int(match)
+                    if count > 0 and count < 1000000:
+                        logger.debug("Found subscriber count via JSON pattern for %s: %s", publication_name, count)
+                        return count
+                except ValueError:
+                    continue
+
+        # Fallback to general patterns
+        general_patterns = [
+            r'"subscriber_count":\s*(\d+)',
+            r'"subscribers":\s*(\d+)',
+            r'"total_subscribers":\s*(\d+)',
+            r'"subscriberCount":\s*(\d+)',
+            r'"subscriber_count":\s*"(\d+)"',
+            r'"subscribers":\s*"(\d+)"',
+            r'"total_subscribers":\s*"(\d+)"',
+            r'"subscriberCount":\s*"(\d+)"'
+        ]
+
+        for pattern in general_patterns:
+            matches = re.findall(pattern, html_content, re.IGNORECASE)
+            for match in matches:
+                try:
+                    count = int(match)
+                    if count > 0 and count < 1000000:
+                        logger.debug("Found subscriber count via general JSON pattern: %s", count)
+                        return count
+                except ValueError:
+                    continue
+
+        logger.debug("No subscriber count found in JSON data.")
+        return None
+    except Exception as e:
+        logger.warning("Error extracting subscriber count from JSON: %s", e)
+        return None
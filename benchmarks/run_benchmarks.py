@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+Offline benchmark suite for the collector.
+
+Serves the recorded corpus (benchmarks/corpus.py) from a local replay
+server and measures latency, throughput and peak traced memory of
+fetch_posts, get_post_engagement, _extract_subscriber_count,
+analyze_publication and export_to_excel. Results are written as JSON so
+runs can be compared; with --baseline the run fails when a median latency
+regresses by more than --tolerance. --processes also runs
+analyze_publication in pipeline mode with that many extractor processes.
+Run from the repository root:
+
+    python benchmarks/run_benchmarks.py [--tiers small medium large xlarge]
+        [--repeat N] [--workers N] [--processes N] [--latency SECONDS]
+        [--output results.json] [--baseline old.json] [--tolerance 0.25]
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCHMARKS)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCHMARKS)
+
+from corpus import TIERS, build_routes, homepages, post_pages
+from data_collector import SubstackDataCollector
+from extract_pool import ExtractorPool
+from parser_backend import parse_html
+from replay_server import ReplayServer
+
+DEFAULT_TIERS = ('small', 'medium', 'large')
+RESULTS_VERSION = 1
+
+
+def measure(name: str, func: Callable[[], object], items: int = 1, repeat: int = 5,
+            params: Optional[Dict] = None, memory: bool = True) -> Dict:
+    """Time func repeat times (after one warm-up call) and trace its peak memory once."""
+    func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        finally:
+            tracemalloc.stop()
+
+    median = statistics.median(timings)
+    return {
+        'name': name,
+        'params': params or {},
+        'repeat': repeat,
+        'items': items,
+        'latency_seconds': {
+            'min': round(min(timings), 6),
+            'median': round(median, 6),
+            'mean': round(statistics.fmean(timings), 6),
+            'max': round(max(timings), 6),
+        },
+        'items_per_second': round(items / median, 2) if median > 0 else None,
+        'peak_memory_mb': round(peak_mb, 2) if peak_mb is not None else None,
+    }
+
+
+def result_key(result: Dict) -> str:
+    params = ','.join(f"{key}={value}" for key, value in sorted(result['params'].items()))
+    return f"{result['name']}[{params}]"
+
+
+def _collector(server: ReplayServer, workers: int = 1,
+               extractor_pool: Optional[ExtractorPool] = None) -> SubstackDataCollector:
+    # No rate limit or retries: the replay server is local and never fails
+    collector = SubstackDataCollector(server.url, max_workers=workers, requests_per_second=0,
+                                      metrics_registry=None, extractor_pool=extractor_pool)
+    collector.retry_policy.max_retries = 0
+    return collector
+
+
+def bench_extraction(server: ReplayServer, repeat: int) -> List[Dict]:
+    """Per-page benchmarks that do not depend on the publication size."""
+    results = []
+    collector = _collector(server)
+    for kind, page in post_pages().items():
+        url = f"{server.url}/p/bench-{kind}"
+        results.append(measure('get_post_engagement', lambda: collector.get_post_engagement(url),
+                               repeat=repeat, params={'page': kind, 'bytes': len(page.encode('utf-8'))}))
+
+    for kind, html in homepages().items():
+        soup = parse_html(html, collector.parser_backend)
+        assert collector._extract_subscriber_count(soup, html) is not None, kind
+        results.append(measure('_extract_subscriber_count',
+                               lambda: collector._extract_subscriber_count(soup, html),
+                               repeat=repeat, params={'homepage': kind, 'bytes': len(html.encode('utf-8'))}))
+    return results
+
+
+def bench_tier(server: ReplayServer, tier: str, repeat: int, workers: int, tmp_dir: str,
+               extractor_pool: Optional[ExtractorPool] = None) -> List[Dict]:
+    """Feed, end-to-end analysis and export benchmarks for one publication size."""
+    posts = TIERS[tier]['posts']
+    server.set_routes(build_routes(tier, server.url))
+    results = []
+
+    collector = _collector(server)
+    assert len(collector.fetch_posts()) == posts
+    results.append(measure('fetch_posts', collector.fetch_posts, items=posts, repeat=repeat,
+                           params={'tier': tier}))
+
+    # Big tiers make every end-to-end run expensive; fewer repeats keep the suite usable
+    slow_repeat = max(1, repeat // 2) if posts >= 500 else repeat
+    analyses = []
+
+    def analyze():
+        analysis = _collector(server, workers).analyze_publication()
+        analyses.append(analysis)
+        return analysis
+
+    result = measure('analyze_publication', analyze, items=posts, repeat=slow_repeat,
+                     params={'tier': tier, 'workers': workers})
+    analysis = analyses[-1]
+    assert analysis['analytics']['total_posts_analyzed'] == posts, analysis.get('error')
+    result['phases'] = analysis['stats']['phases']
+    results.append(result)
+
+    if extractor_pool is not None:
+        result = measure('analyze_publication',
+                         lambda: _collector(server, workers, extractor_pool).analyze_publication(),
+                         items=posts, repeat=slow_repeat, memory=False,
+                         params={'tier': tier, 'workers': workers, 'processes': extractor_pool.max_workers})
+        results.append(result)
+
+    path = os.path.join(tmp_dir, f"{tier}.xlsx")
+    for streaming in (False, True):
+        results.append(measure('export_to_excel',
+                               lambda: collector.export_to_excel(analysis, path, streaming=streaming),
+                               items=posts, repeat=slow_repeat, params={'tier': tier, 'streaming': streaming}))
+    return results
+
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'html_parser': SubstackDataCollector('benchmark').parser_backend,
+    }
+
+
+def run_suite(tiers=DEFAULT_TIERS, repeat: int = 5, workers: int = 4, latency: float = 0.0,
+              processes: Optional[int] = None) -> Dict:
+    """Run every benchmark and return the machine-readable results."""
+    results = []
+    extractor_pool = ExtractorPool(max_workers=processes) if processes else None
+    try:
+        with ReplayServer(latency=latency) as server, tempfile.TemporaryDirectory() as tmp_dir:
+            server.set_routes(build_routes('small', server.url))
+            results.extend(bench_extraction(server, repeat))
+            for tier in tiers:
+                results.extend(bench_tier(server, tier, repeat, workers, tmp_dir, extractor_pool))
+    finally:
+        if extractor_pool is not None:
+            extractor_pool.shutdown()
+    return {
+        'version': RESULTS_VERSION,
+        'environment': environment(),
+        'settings': {'tiers': list(tiers), 'repeat': repeat, 'workers': workers, 'latency': latency,
+                     'processes': processes},
+        'results': results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float = 0.25) -> List[Dict]:
+    """Benchmarks whose median latency grew by more than tolerance (a fraction) over the baseline."""
+    previous = {result_key(result): result for result in baseline.get('results', [])}
+    regressions = []
+    for result in current['results']:
+        old = previous.get(result_key(result))
+        if old is None:
+            continue
+        old_median, new_median = old['latency_seconds']['median'], result['latency_seconds']['median']
+        if old_median > 0 and new_median > old_median * (1 + tolerance):
+            regressions.append({'benchmark': result_key(result), 'baseline_median': old_median,
+                                'median': new_median, 'change': round(new_median / old_median - 1, 4)})
+    return regressions
+
+
+def print_table(report: Dict) -> None:
+    print(f"{'benchmark':<58} {'median ms':>10} {'items/s':>10} {'peak MB':>8}")
+    for result in report['results']:
+        peak = result['peak_memory_mb']
+        print(f"{result_key(result):<58} {result['latency_seconds']['median'] * 1000:>10.2f} "
+              f"{result['items_per_second'] or 0:>10.1f} {peak if peak is not None else '-':>8}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tiers', nargs='+', choices=sorted(TIERS), default=list(DEFAULT_TIERS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=4, help="max_workers for analyze_publication")
+    parser.add_argument('--processes', type=int, help="also benchmark pipeline mode with this many extractor processes")
+    parser.add_argument('--latency', type=float, default=0.0, help="added delay per request, in seconds")
+    parser.add_argument('--output', help="write the JSON results to this file")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed median latency growth over the baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.ERROR, format='[%(levelname)s] %(message)s')
+
+    report = run_suite(args.tiers, repeat=args.repeat, workers=args.workers, latency=args.latency,
+                       processes=args.processes)
+    print_table(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['benchmark']}: {regression['baseline_median'] * 1000:.2f} ms -> "
+                  f"{regression['median'] * 1000:.2f} ms (+{regression['change']:.0%})")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Opt-in capture of fetched pages for debugging extraction problems.
+
+A CaptureSink keeps a random sample of pages. Each sampled page is handed
+to a background writer thread, so the fetch path only pays for a queue put.
+The writer stores pages gzip-compressed in a ring directory and deletes
+the oldest captures once the directory exceeds max_bytes. If the queue is
+full, the page is dropped rather than blocking the caller.
+"""
+
+import gzip
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CaptureSink:
+    """Sampled, asynchronous, size-bounded store of gzip-compressed page snapshots."""
+
+    def __init__(self, directory: str = 'captures', sample_rate: float = 0.01,
+                 max_bytes: int = 50 * 1024 * 1024, max_pending: int = 32,
+                 rng: Optional[random.Random] = None):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.captured = 0
+        self.dropped = 0
+        self._rng = rng or random.Random()
+        self._queue: 'queue.Queue[Optional[Tuple[str, bytes]]]' = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._counter = 0
+        # (filename, size) oldest first; rebuilt from disk when a writer starts
+        self._files: List[Tuple[str, int]] = []
+        self._total_bytes = 0
+
+    def capture(self, kind: str, name: str, content: str) -> bool:
+        """Maybe queue a page for capture; returns True if it was sampled and queued."""
+        if self.sample_rate <= 0 or self._rng.random() >= self.sample_rate:
+            return False
+        with self._lock:
+            self._counter += 1
+            safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', name)[:80]
+            filename = f"{int(time.time() * 1000)}_{self._counter:06d}_{kind}_{safe_name}.html.gz"
+            self._ensure_writer()
+        try:
+            self._queue.put_nowait((filename, content.encode('utf-8')))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._run, name='capture-writer', daemon=True)
+            self._writer.start()
+
+    def _load_existing(self) -> None:
+        """Rebuild the ring from disk; a restarted writer must not count files twice."""
+        self._files, self._total_bytes = [], 0
+        os.makedirs(self.directory, exist_ok=True)
+        for filename in sorted(os.listdir(self.directory)):
+            if filename.endswith('.html.gz'):
+                size = os.path.getsize(os.path.join(self.directory, filename))
+                self._files.append((filename, size))
+                self._total_bytes += size
+
+    def _run(self) -> None:
+        # The writer must keep draining the queue even if the directory is
+        # unusable, or flush() and close() would wait forever
+        try:
+            self._load_existing()
+        except OSError as e:
+            logger.warning("Could not read capture directory: %s", e)
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except OSError as e:
+                logger.warning("Could not write capture: %s", e)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, filename: str, body: bytes) -> None:
+        path = os.path.join(self.directory, filename)
+        data = gzip.compress(body, compresslevel=6)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._files.append((filename, len(data)))
+        self._total_bytes += len(data)
+        self.captured += 1
+        self._evict()
+
+    def _evict(self) -> None:
+        """Delete the oldest captures until the ring fits in max_bytes (the newest is always kept)."""
+        while self._total_bytes > self.max_bytes and len(self._files) > 1:
+            filename, size = self._files.pop(0)
+            try:
+                os.remove(os.path.join(self.directory, filename))
+            except FileNotFoundError:
+                pass
+            self._total_bytes -= size
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def flush(self) -> None:
+        """Block until every queued capture has been written."""
+        if self._writer is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Write pending captures and stop the writer thread."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join()
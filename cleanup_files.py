@@ -46,7 +46,6 @@ def cleanup_files():
         'test_*.py',
         'ultra_*.py',
         'visualization.py',
-        'debug_*.html',
         'login',
         'logout',
         '='
@@ -75,6 +74,15 @@ def cleanup_files():
                 except Exception as e:
                     print(f"Could not delete {file}: {e}")
     
+    # Remove sampled page captures (written by capture_sink.CaptureSink when enabled)
+    for file in glob.glob(os.path.join('captures', '*.html.gz')):
+        try:
+            os.remove(file)
+            print(f"Deleted capture: {file}")
+            deleted_count += 1
+        except Exception as e:
+            print(f"Could not delete {file}: {e}")
+    
     # Keep only the most recent Excel file
     excel_files = glob.glob('substack_analytics_cashandcache_*.xlsx')
     if len(excel_files) > 1:
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Shared test fixtures.
+"""
+
+import os
+
+import pytest
+
+from replay_server import ReplayServer
+
+
+@pytest.fixture
+def replay_server():
+    """A running ReplayServer with no routes; tests fill in server.routes."""
+    with ReplayServer() as server:
+        yield server
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Posts of the fixture site in feed order; 'missing' has no page (404)
+FIXTURE_POSTS = [('long', 'post_long.html'), ('short', 'post_short.html'),
+                 ('paywalled', 'post_paywalled.html'), ('missing', None)]
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+def _comparable(analysis):
+    posts = [{key: value for key, value in post.items() if key != 'fetch_error'} for post in analysis['all_posts']]
+    return analysis['publication']['subscriber_count'], analysis['publication']['name'], posts, analysis['analytics']
+
+
+@pytest.fixture
+def fixture_site(replay_server):
+    """Serve the recorded fixtures as one publication; call it to get the base URL.
+
+    fixture_site(extra_posts=N) appends N copies of the short post to the
+    feed after FIXTURE_POSTS.
+    """
+    def serve(extra_posts=0):
+        posts = FIXTURE_POSTS + [(f"extra-{i}", 'post_short.html') for i in range(extra_posts)]
+
+        def feed(request):
+            items = ''.join(f"<item><title>{slug}</title><link>{request.base_url}/p/{slug}</link>"
+                            f"<pubDate>Mon, {i + 1:02d} Jan 2024 10:00:00 GMT</pubDate></item>"
+                            for i, (slug, _) in enumerate(posts))
+            return 'application/rss+xml', f'<rss><channel>{items}</channel></rss>'.encode('utf-8')
+
+        replay_server.routes = {'/': _fixture('home_json_count.html'), '/feed': feed,
+                                **{f"/p/{slug}": _fixture(page) for slug, page in posts if page}}
+        return replay_server.url
+    return serve
+
+
+@pytest.fixture
+def comparable():
+    """What two analyses of the fixture site must agree on (fetch error messages aside)."""
+    return _comparable
@@ -1,113 +1,331 @@
 ﻿# -*- coding: utf-8 -*-
 import requests
-import json
+import logging
 import re
 import time
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from xml.etree import ElementTree
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from urllib.parse import urlencode, urljoin, urlsplit
 import openpyxl
 from openpyxl.styles import Font, PatternFill, Alignment
+import arrow_store
+from archive_api import (ARCHIVE_PAGE_SIZE, archive_engagement, archive_post, archive_url,
+                         archive_values, missing_fields)
+from capture_sink import CaptureSink
+from engagement_extractor import extract_engagement
+from excel_export import export_analysis
+from extract_pool import ExtractorPool
+from feed_digest import FeedCheck, FeedDigestStore, feed_digest
+from http_cache import HttpCache
+from metrics import MetricsRegistry, PhaseStats, default_registry
+from parser_backend import html_backend, parse_html
+from post_columns import PostColumns, RunningTotals
+from post_store import PostStore
+from rate_limiter import AdaptiveRateLimiter, HostRateLimiter
+from retry_policy import RetryPolicy, parse_retry_after
+from snapshot_store import SnapshotStore
+from subscriber_extractor import PageContext, SubscriberCountPipeline, default_pipeline
+from transport import Transport
+
+logger = logging.getLogger(__name__)
+
+# RSS item children read into each post dict, mapped to the post keys
+RSS_FIELDS = {
+    'title': 'title',
+    'link': 'link',
+    'description': 'description',
+    'pubDate': 'pub_date',
+    'author': 'author',
+}
+RSS_CHUNK_SIZE = 16 * 1024
 
 class SubstackDataCollector:
-    def __init__(self, publication_input: str, api_key: Optional[str] = None):
+    def __init__(self, publication_input: str, api_key: Optional[str] = None,
+                 max_workers: int = 1, requests_per_second: float = 1.0,
+                 rate_limiter: Optional[HostRateLimiter] = None,
+                 http_cache: Optional[HttpCache] = None,
+                 post_store: Optional[PostStore] = None,
+                 parser_backend: Optional[str] = None,
+                 subscriber_pipeline: Optional[SubscriberCountPipeline] = None,
+                 executor: Optional[Executor] = None,
+                 snapshot_store: Optional[SnapshotStore] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 transport: Optional[Transport] = None,
+                 capture_sink: Optional[CaptureSink] = None,
+                 metrics_registry: Optional[MetricsRegistry] = default_registry,
+                 extractor_pool: Optional[ExtractorPool] = None):
         self.api_key = api_key
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Cache-Control': 'no-cache, no-store, must-revalidate',
-            'Pragma': 'no-cache',
-            'Expires': '0'
-        })
+        # Concurrency for post engagement fetches (1 = serial) and the
+        # per-host politeness rate shared by every worker
+        self.max_workers = max(1, max_workers)
+        # requests_per_second is the starting rate; it adapts to throttling and latency
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(requests_per_second)
+        # Retries with exponential backoff for 429/5xx responses and connection errors
+        self.retry_policy = retry_policy or RetryPolicy()
+        # Optional on-disk cache; feeds, homepages and posts are revalidated
+        # with conditional GETs instead of being re-downloaded
+        self.http_cache = http_cache
+        # Previously analyzed posts for incremental runs (created on first use)
+        self.post_store = post_store
+        # BeautifulSoup backend for HTML pages: lxml when installed, else html.parser
+        self.parser_backend = html_backend(parser_backend)
+        # Subscriber-count strategies, shared process-wide so winners are tried first
+        self.subscriber_pipeline = subscriber_pipeline or default_pipeline
+        self.subscriber_count_strategy: Optional[str] = None
+        # Shared fetch pool (batch runs); without one each run makes its own
+        self.executor = executor
+        # Optional engagement history; every successful analysis is recorded
+        self.snapshot_store = snapshot_store
+        # Pooled keep-alive HTTP client; pass one Transport to many collectors
+        # to share connections (pool sized for this collector's concurrency)
+        self.transport = transport or Transport(pool_size=self.max_workers + 1)
+        self.session = self.transport.session
+        # Opt-in sampled page captures for debugging (off by default)
+        self.capture_sink = capture_sink
+        # Phase timings of the current run (reset by analyze_publication) and
+        # the process-wide registry they are mirrored into
+        self.metrics_registry = metrics_registry
+        self.stats = PhaseStats(metrics_registry)
+        # Optional worker processes for parsing/extraction (pipeline mode);
+        # without one, pages are parsed in the fetching thread
+        self.extractor_pool = extractor_pool
         
+        self.base_url, self.publication_name = self.parse_publication_input(publication_input)
+        # Identity for stores and caches; publication_name is only the first
+        # host label, which custom domains share ('www')
+        self.publication_key = self.publication_key_for(self.base_url)
+    
+    @staticmethod
+    def parse_publication_input(publication_input: str) -> Tuple[str, str]:
+        """(base_url, publication_name) for a publication URL, feed URL or bare name."""
         # Handle different input formats
         if publication_input.startswith('http'):
             # Full URL provided
             if publication_input.endswith('/'):
                 publication_input = publication_input[:-1]
             if publication_input.endswith('/feed'):
-                self.base_url = publication_input.replace('/feed', '')
+                base_url = publication_input.replace('/feed', '')
             else:
-                self.base_url = publication_input
+                base_url = publication_input
             # Extract publication name from URL
-            self.publication_name = self.base_url.split('//')[-1].split('.')[0]
-        else:
-            # Just publication name provided
-            self.publication_name = publication_input
-            self.base_url = f"https://{publication_input}.substack.com"
+            return base_url, base_url.split('//')[-1].split('.')[0]
+        # Just publication name provided
+        return f"https://{publication_input}.substack.com", publication_input
+    
+    @classmethod
+    def publication_key_for(cls, publication_input: str) -> str:
+        """Lowercase host (and path, if any) of a publication, e.g. 'example.substack.com'."""
+        url = urlsplit(cls.parse_publication_input(publication_input)[0])
+        return f"{url.netloc}{url.path}".lower()
+    
+    def _get(self, url: str, resource_type: Optional[str] = None, **kwargs) -> requests.Response:
+        """Issue a GET through the transport, respecting the per-host rate limit.
+
+        When an HTTP cache is configured and a resource_type ('feed', 'homepage',
+        'post', 'api') is given, the response is served from or revalidated
+        against the cache.
+        """
+        def send(extra_headers: Dict[str, str]) -> requests.Response:
+            if extra_headers:
+                kwargs['headers'] = {**kwargs.get('headers', {}), **extra_headers}
+            return self._send_with_retries(url, **kwargs)
+
+        if self.http_cache is None or resource_type is None:
+            return send({})
+        return self.http_cache.fetch(url, resource_type, send)
+    
+    def _send_with_retries(self, url: str, **kwargs) -> requests.Response:
+        """GET through the rate limiter, retrying throttled, 5xx and failed requests with backoff.
+
+        Every outcome is reported to the rate limiter so it can adapt. The
+        last response is returned even if it is still an error status.
+        """
+        policy = self.retry_policy
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(url)
+            started = time.monotonic()
+            try:
+                response = self.transport.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.rate_limiter.record(url, None, time.monotonic() - started)
+                self.stats.count('http_errors', error=type(e).__name__)
+                if attempt >= policy.max_retries:
+                    raise
+                delay = policy.backoff(attempt)
+                logger.info("%s for %s, retry %s in %.1fs", type(e).__name__, url, attempt + 1, delay)
+            else:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                self.rate_limiter.record(url, response.status_code, time.monotonic() - started, retry_after)
+                self.stats.count('http_responses', status=response.status_code)
+                if not policy.should_retry(response.status_code, attempt):
+                    return response
+                response.close()
+                delay = policy.backoff(attempt, retry_after)
+                logger.info("HTTP %s for %s, retry %s in %.1fs", response.status_code, url, attempt + 1, delay)
+            self.stats.count('http_retries')
+            time.sleep(delay)
+            attempt += 1
     
     def fetch_posts(self, limit: int = None) -> List[Dict]:
         """Fetch posts from the publication RSS feed."""
         try:
-            url = f"{self.base_url}/feed"
-            response = requests.get(url)
-            response.raise_for_status()
-            posts = self._parse_rss_feed(response.text)
-            
-            # If limit is specified, return only that many posts
-            if limit is not None:
-                return posts[:limit]
-            else:
-                # Return all posts
-                return posts
+            # If limit is specified, the download stops once that many posts are read
+            # (the feed is parsed while it streams, so this covers both)
+            with self.stats.time('feed_fetch'):
+                return list(self.iter_posts(limit))
         except Exception as e:
-            print(f"Error fetching posts: {e}")
+            logger.warning("Error fetching posts: %s", e)
             return []
     
+    def iter_posts(self, limit: int = None) -> Iterator[Dict]:
+        """Stream posts from the RSS feed, yielding each one as soon as its item is parsed.
+
+        The feed is fed to an incremental XML parser chunk by chunk, and the
+        connection is closed as soon as limit posts have been produced.
+        """
+        if limit is not None and limit <= 0:
+            return
+        url = f"{self.base_url}/feed"
+        response = self._get(url, resource_type='feed', stream=True)
+        try:
+            response.raise_for_status()
+            produced = 0
+            for post in self._iter_rss_items(response.iter_content(chunk_size=RSS_CHUNK_SIZE)):
+                yield post
+                produced += 1
+                if limit is not None and produced >= limit:
+                    return
+        finally:
+            response.close()
+    
+    def _iter_rss_items(self, chunks: Iterable) -> Iterator[Dict]:
+        """Incrementally parse RSS chunks (bytes or str) into post dicts."""
+        parser = ElementTree.XMLPullParser(events=('end',))
+        for chunk in chunks:
+            parser.feed(chunk)
+            yield from self._rss_posts_from_events(parser)
+        parser.close()
+        yield from self._rss_posts_from_events(parser)
+    
+    @staticmethod
+    def _rss_posts_from_events(parser) -> Iterator[Dict]:
+        for _, element in parser.read_events():
+            if element.tag.rpartition('}')[2] != 'item':
+                continue
+            # First descendant per local name, like bs4's item.find() in xml mode
+            fields = {}
+            for child in element.iter():
+                name = child.tag.rpartition('}')[2]
+                if name in RSS_FIELDS and name not in fields and child is not element:
+                    fields[name] = ''.join(child.itertext())
+            yield {key: fields.get(name, "") for name, key in RSS_FIELDS.items()}
+            # Items are not needed once yielded; keep memory flat on big feeds
+            element.clear()
+    
+    def iter_archive(self, limit: int = None, page_size: int = ARCHIVE_PAGE_SIZE) -> Iterator[Dict]:
+        """Page through the JSON archive endpoint, yielding raw archive items newest first."""
+        offset = 0
+        while limit is None or offset < limit:
+            batch = page_size if limit is None else min(page_size, limit - offset)
+            with self.stats.time('archive_fetch'):
+                response = self._get(archive_url(self.base_url, offset, batch), resource_type='archive',
+                                     headers={'Accept': 'application/json'})
+                response.raise_for_status()
+                items = response.json()
+            if not isinstance(items, list):
+                raise ValueError("Unexpected archive response")
+            yield from items
+            if len(items) < batch:
+                return
+            offset += len(items)
+
+    def fetch_archive(self, limit: int = None) -> List[Dict]:
+        """All archive items (or the newest limit), fetched page by page."""
+        return list(self.iter_archive(limit))
+
+    def _iter_archive_engagements(self, items: List[Dict], posts: List[Dict], max_workers: int
+                                  ) -> Iterator[Tuple[int, Dict]]:
+        """(index, engagement) from archive items, scraping post pages only for items with missing fields.
+
+        Posts complete in the JSON come first, then the scraped ones as they finish.
+        """
+        values = [archive_values(item) for item in items]
+        fallback_indices = [i for i, item_values in enumerate(values) if missing_fields(item_values)]
+        complete = len(posts) - len(fallback_indices)
+        logger.info("Archive run: %s posts complete from JSON, %s need the post page", complete, len(fallback_indices))
+        self.stats.count('archive_posts', len(posts))
+        self.stats.count('archive_fallbacks', len(fallback_indices))
+
+        fallback = set(fallback_indices)
+        for i, item_values in enumerate(values):
+            if i not in fallback:
+                yield i, archive_engagement(item_values)
+        for j, scraped in self._iter_engagements([posts[i] for i in fallback_indices], max_workers):
+            i = fallback_indices[j]
+            yield i, archive_engagement(values[i], scraped)
+
+    def _on_fetch_pool(self, fetch: Callable, *args):
+        """Run fetch(*args) on the shared executor when there is one and wait for it.
+
+        Batch coordinators call this rather than fetching in their own
+        thread, so the request counts against the pool's global cap.
+        """
+        if self.executor is None:
+            return fetch(*args)
+        return self.executor.submit(fetch, *args).result()
+
     def _parse_rss_feed(self, rss_content: str) -> List[Dict]:
         """Parse RSS feed content to extract post data."""
-        from bs4 import BeautifulSoup
-        
-        soup = BeautifulSoup(rss_content, "xml")
-        posts = []
-        
-        for item in soup.find_all("item"):
-            post = {
-                "title": item.find("title").text if item.find("title") else "",
-                "link": item.find("link").text if item.find("link") else "",
-                "description": item.find("description").text if item.find("description") else "",
-                "pub_date": item.find("pubDate").text if item.find("pubDate") else "",
-                "author": item.find("author").text if item.find("author") else "",
-            }
-            posts.append(post)
-        
-        return posts
+        return list(self._iter_rss_items([rss_content]))
     
     def get_publication_info(self) -> Dict:
         """Get basic publication information using HTML scraping."""
         try:
-            print(f"[DEBUG] Fetching publication page: {self.base_url}")
-            # Add cache-busting parameter to get fresh data
-            import time
-            cache_buster = int(time.time() * 1000)
-            url_with_cache_buster = f"{self.base_url}?t={cache_buster}"
-            
-            response = self.session.get(url_with_cache_buster)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
+            logger.debug("Fetching publication page: %s", self.base_url)
+            with self.stats.time('homepage_fetch'):
+                response = self._get(self.base_url, resource_type='homepage')
+                response.raise_for_status()
             
-            # Save HTML for debugging (optional)
-            debug_filename = f"debug_{self.publication_name}_page_{cache_buster}.html"
-            with open(debug_filename, 'w', encoding='utf-8') as f:
-                f.write(response.text)
-            print(f"[DEBUG] Saved HTML content to {debug_filename}")
+            # Keep a sampled copy for debugging when capture is enabled
+            if self.capture_sink is not None:
+                self.capture_sink.capture('homepage', self.publication_name, response.text)
             
-            # Extract publication details
-            title = soup.find('title')
-            title_text = title.text if title else f"{self.publication_name} | Substack"
-            
-            # Try to find subscriber count with comprehensive scraping
-            subscriber_count = self._extract_subscriber_count(soup)
+            strategy_order = (self.subscriber_pipeline.portable_order(self.publication_key)
+                              if self.extractor_pool is not None else None)
+            if strategy_order is not None:
+                # Pipeline mode: parse and extract in a worker process
+                with self.stats.time('extraction'):
+                    title_text, subscriber_count, self.subscriber_count_strategy = self.extractor_pool.homepage(
+                        response.content, response.encoding, self.parser_backend,
+                        self.publication_name, strategy_order).result()
+                if self.subscriber_count_strategy:
+                    self.subscriber_pipeline.record_win(self.publication_key, self.subscriber_count_strategy)
+                title_text = title_text or f"{self.publication_name} | Substack"
+            else:
+                with self.stats.time('parse'):
+                    soup = parse_html(response.text, self.parser_backend)
+                
+                # Extract publication details
+                title = soup.find('title')
+                title_text = title.text if title else f"{self.publication_name} | Substack"
+                
+                # Try to find subscriber count with comprehensive scraping
+                with self.stats.time('extraction'):
+                    subscriber_count = self._extract_subscriber_count(soup, response.text)
             
             # If subscriber count not found, try alternative methods
             if subscriber_count is None:
-                print(f"[INFO] Subscriber count not found in HTML. Trying alternative methods...")
+                logger.info("Subscriber count not found in HTML. Trying alternative methods...")
                 # Try the API method as fallback
-                subscriber_count = self._get_subscriber_count_from_api()
+                with self.stats.time('api_fetch'):
+                    subscriber_count = self._get_subscriber_count_from_api()
                 
             if subscriber_count is None:
-                print(f"[INFO] Subscriber count not publicly available for this publication")
+                logger.info("Subscriber count not publicly available for this publication")
             
             return {
                 'name': title_text,
@@ -116,7 +334,7 @@ class SubstackDataCollector:
                 'last_updated': datetime.now().isoformat()
             }
         except Exception as e:
-            print(f"Error fetching publication info: {e}")
+            logger.warning("Error fetching publication info: %s", e)
             return {
                 'name': f"{self.publication_name} | Substack",
                 'url': self.base_url,
@@ -127,657 +345,524 @@ class SubstackDataCollector:
     def _get_subscriber_count_from_api(self) -> Optional[int]:
         """Get subscriber count from Substack's public search API."""
         try:
-            api_url = "https://substack.com/api/v1/publication/search"
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'application/json',
-                'Origin': 'https://substack.com',
-                'Referer': 'https://substack.com/discover'
-            }
-            params = {
-                'query': self.publication_name,
-                'limit': 20  # Get more results to find the right publication
-            }
-            
-            print(f"[DEBUG] Querying Substack API for publication: {self.publication_name}")
-            response = requests.get(api_url, headers=headers, params=params)
+            url, headers = self._subscriber_search_request()
+            logger.debug("Querying Substack API for publication: %s", self.publication_name)
+            response = self._get(url, resource_type='api', headers=headers)
             response.raise_for_status()
-            data = response.json()
-            
-            # Find the matching publication
-            if 'publications' in data and data['publications']:
-                for pub in data['publications']:
-                    # Match by subdomain or name (more flexible matching)
-                    subdomain = pub.get('subdomain', '').lower()
-                    pub_name = pub.get('name', '').lower()
-                    pub_url = pub.get('url', '').lower()
-                    
-                    # More flexible matching
-                    if (subdomain == self.publication_name.lower() or 
-                        self.publication_name.lower() in pub_name or
-                        self.publication_name.lower() in pub_url or
-                        self.base_url.lower() in pub_url):
-                        
-                        subscriber_count = pub.get('subscriber_count')
-                        if subscriber_count is not None and subscriber_count > 0:
-                            print(f"[SUCCESS] Found subscriber count from API: {subscriber_count}")
-                            return int(subscriber_count)
-                        else:
-                            print(f"[INFO] Found publication but subscriber_count is null or zero")
-                            continue
-                
-                print(f"[INFO] Publication '{self.publication_name}' not found in API results")
-            else:
-                print(f"[INFO] No publications found in API response")
-            
-            return None
-        except Exception as e:
-            print(f"[ERROR] Error fetching subscriber count from API: {e}")
-            return None
-    
-    def _extract_subscriber_count_from_js(self, html_content: str) -> Optional[int]:
-        """Extract subscriber count from JavaScript data in the HTML."""
-        try:
-            import re
-            import json
-            
-            # Look for the window.__NEXT_DATA__ or similar JavaScript data
-            # Pattern to find subscriber count in the JSON data
-            patterns = [
-                r'"subscriber_count":\s*(\d+)',
-                r'"subscribers":\s*(\d+)',
-                r'"total_subscribers":\s*(\d+)',
-                r'"subscriberCount":\s*(\d+)',
-                r'"subscriber_count":\s*"(\d+)"',
-                r'"subscribers":\s*"(\d+)"',
-                r'"total_subscribers":\s*"(\d+)"',
-                r'"subscriberCount":\s*"(\d+)"'
-            ]
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, html_content, re.IGNORECASE)
-                if matches:
-                    # Get the first match and convert to int
-                    count = int(matches[0])
-                    print(f"[DEBUG] Found subscriber count: {count}")
-                    return count
-            
-            # Try to find in window.__NEXT_DATA__ specifically
-            next_data_match = re.search(r'window\.__NEXT_DATA__\s*=\s*({.*?});', html_content, re.DOTALL)
-            if next_data_match:
-                try:
-                    next_data = json.loads(next_data_match.group(1))
-                    # Navigate through the JSON structure to find subscriber count
-                    if 'props' in next_data and 'pageProps' in next_data['props']:
-                        page_props = next_data['props']['pageProps']
-                        if 'publication' in page_props and 'subscriber_count' in page_props['publication']:
-                            count = page_props['publication']['subscriber_count']
-                            print(f"[DEBUG] Found subscriber count in __NEXT_DATA__: {count}")
-                            return int(count)
-                except (json.JSONDecodeError, KeyError, ValueError) as e:
-                    print(f"[DEBUG] Error parsing __NEXT_DATA__: {e}")
-                    pass
-            
-            print("[DEBUG] No subscriber count found in JavaScript data - this is normal for many Substack publications")
-            print("[DEBUG] Substack often doesn't expose subscriber counts publicly for privacy reasons")
-            return None
-            
+            return self._subscriber_count_from_search(response.json())
         except Exception as e:
-            print(f"[DEBUG] Error extracting subscriber count from JS: {e}")
+            logger.error("Error fetching subscriber count from API: %s", e)
             return None
-    
-    def _extract_subscriber_count(self, soup: BeautifulSoup) -> Optional[int]:
-        """Extract subscriber count from the publication page with comprehensive scraping."""
-        subscriber_count = None
-        
-        print(f"[DEBUG] Searching for subscriber count in {self.base_url}")
-        
-        # Method 1: Look for Substack-specific subscriber elements
-        # Common Substack patterns for subscriber count
-        subscriber_patterns = [
-            r'(\d+)\s*subscribers?',
-            r'(\d+)\s*readers?',
-            r'(\d+)\s*members?',
-            r'(\d+)\s*people\s+subscribed',
-            r'(\d+)\s*subscribed'
-        ]
-        
-        # Search in all text content
-        page_text = soup.get_text()
-        for pattern in subscriber_patterns:
-            matches = re.findall(pattern, page_text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    count = int(match)
-                    if count > 0 and count < 1000000:  # Reasonable range
-                        subscriber_count = count
-                        print(f"[DEBUG] Found subscriber count via text pattern: {count}")
-                        break
-                except ValueError:
-                    continue
-            if subscriber_count:
-                break
-        
-        # Method 2: Look for specific HTML elements with subscriber data
-        if not subscriber_count:
-            # Look for elements with data attributes
-            data_elements = soup.find_all(attrs={'data-subscriber-count': True})
-            for element in data_elements:
-                try:
-                    count = int(element.get('data-subscriber-count'))
-                    if count > 0:
-                        subscriber_count = count
-                        print(f"[DEBUG] Found subscriber count via data attribute: {count}")
-                        break
-                except (ValueError, TypeError):
-                    continue
-        
-        # Method 3: Look for specific CSS classes that might contain subscriber count
-        if not subscriber_count:
-            class_patterns = [
-                'subscriber-count', 'subscriberCount', 'subscribers',
-                'reader-count', 'readerCount', 'readers',
-                'member-count', 'memberCount', 'members'
-            ]
-            
-            for class_pattern in class_patterns:
-                elements = soup.find_all(class_=re.compile(class_pattern, re.IGNORECASE))
-                for element in elements:
-                    text = element.get_text()
-                    match = re.search(r'(\d+)', text)
-                    if match:
-                        try:
-                            count = int(match.group(1))
-                            if count > 0 and count < 1000000:
-                                subscriber_count = count
-                                print(f"[DEBUG] Found subscriber count via class {class_pattern}: {count}")
-                                break
-                        except ValueError:
-                            continue
-                if subscriber_count:
-                    break
-        
-        # Method 4: Look for JavaScript variables or data
-        if not subscriber_count:
-            script_tags = soup.find_all('script')
-            for script in script_tags:
-                if script.string:
-                    # Look for subscriber count in JavaScript variables
-                    js_patterns = [
-                        r'subscriberCount["\']?\s*[:=]\s*(\d+)',
-                        r'subscribers["\']?\s*[:=]\s*(\d+)',
-                        r'readerCount["\']?\s*[:=]\s*(\d+)',
-                        r'memberCount["\']?\s*[:=]\s*(\d+)',
-                        r'"subscriber_count"\s*:\s*(\d+)',
-                        r'"subscribers"\s*:\s*(\d+)'
-                    ]
-                    
-                    for pattern in js_patterns:
-                        matches = re.findall(pattern, script.string, re.IGNORECASE)
-                        for match in matches:
-                            try:
-                                count = int(match)
-                                if count > 0 and count < 1000000:
-                                    subscriber_count = count
-                                    print(f"[DEBUG] Found subscriber count via JavaScript: {count}")
-                                    break
-                            except ValueError:
-                                continue
-                        if subscriber_count:
-                            break
-                    if subscriber_count:
-                        break
-        
-        # Method 5: Look for meta tags with subscriber information
-        if not subscriber_count:
-            meta_tags = soup.find_all('meta')
-            for meta in meta_tags:
-                name = meta.get('name', '').lower()
-                property_attr = meta.get('property', '').lower()
-                content = meta.get('content', '')
+
+    def _subscriber_search_request(self) -> Tuple[str, Dict[str, str]]:
+        """URL and headers of the public search API query for this publication."""
+        api_url = "https://substack.com/api/v1/publication/search"
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Accept': 'application/json',
+            'Origin': 'https://substack.com',
+            'Referer': 'https://substack.com/discover'
+        }
+        params = {
+            'query': self.publication_name,
+            'limit': 20  # Get more results to find the right publication
+        }
+        return f"{api_url}?{urlencode(params)}", headers
+
+    def _subscriber_count_from_search(self, data: Dict) -> Optional[int]:
+        """Pick this publication's subscriber count out of a search API response."""
+        # Find the matching publication
+        if 'publications' in data and data['publications']:
+            for pub in data['publications']:
+                # Match by subdomain or name (more flexible matching)
+                subdomain = pub.get('subdomain', '').lower()
+                pub_name = pub.get('name', '').lower()
+                pub_url = pub.get('url', '').lower()
                 
-                if any(keyword in name or keyword in property_attr for keyword in ['subscriber', 'reader', 'member']):
-                    match = re.search(r'(\d+)', content)
-                    if match:
-                        try:
-                            count = int(match.group(1))
-                            if count > 0 and count < 1000000:
-                                subscriber_count = count
-                                print(f"[DEBUG] Found subscriber count via meta tag: {count}")
-                                break
-                        except ValueError:
-                            continue
-        
-        # Method 6: Look for JSON-LD structured data
-        if not subscriber_count:
-            json_scripts = soup.find_all('script', type='application/ld+json')
-            for script in json_scripts:
-                try:
-                    data = json.loads(script.string)
-                    if isinstance(data, dict):
-                        # Look for subscriber count in various possible keys
-                        for key in ['subscriberCount', 'subscribers', 'memberCount', 'readers', 'subscriber_count']:
-                            if key in data and isinstance(data[key], (int, str)):
-                                try:
-                                    count = int(data[key])
-                                    if count > 0 and count < 1000000:
-                                        subscriber_count = count
-                                        print(f"[DEBUG] Found subscriber count via JSON-LD: {count}")
-                                        break
-                                except ValueError:
-                                    continue
-                        if subscriber_count:
-                            break
-                except (json.JSONDecodeError, TypeError):
-                    continue
-        
-        # Method 7: Look for specific Substack UI elements
-        if not subscriber_count:
-            # Look for common Substack UI patterns
-            ui_selectors = [
-                '[data-testid*="subscriber"]',
-                '[data-testid*="reader"]',
-                '[data-testid*="member"]',
-                '.subscriber-count',
-                '.reader-count',
-                '.member-count'
-            ]
+                # More flexible matching
+                if (subdomain == self.publication_name.lower() or 
+                    self.publication_name.lower() in pub_name or
+                    self.publication_name.lower() in pub_url or
+                    self.base_url.lower() in pub_url):
+                    
+                    subscriber_count = pub.get('subscriber_count')
+                    if subscriber_count is not None and subscriber_count > 0:
+                        logger.info("Found subscriber count from API: %s", subscriber_count)
+                        return int(subscriber_count)
+                    else:
+                        logger.info("Found publication but subscriber_count is null or zero")
+                        continue
             
-            for selector in ui_selectors:
-                elements = soup.select(selector)
-                for element in elements:
-                    text = element.get_text()
-                    match = re.search(r'(\d+)', text)
-                    if match:
-                        try:
-                            count = int(match.group(1))
-                            if count > 0 and count < 1000000:
-                                subscriber_count = count
-                                print(f"[DEBUG] Found subscriber count via UI selector {selector}: {count}")
-                                break
-                        except ValueError:
-                            continue
-                    if subscriber_count:
-                        break
-                if subscriber_count:
-                    break
-        
-        # Method 8: Try to extract from JSON data in the HTML
-        if not subscriber_count:
-            subscriber_count = self._extract_subscriber_count_from_json(str(soup))
-            if subscriber_count:
-                print(f"[DEBUG] Found subscriber count via JSON data: {subscriber_count}")
+            logger.info("Publication '%s' not found in API results", self.publication_name)
+        else:
+            logger.info("No publications found in API response")
+        
+        return None
+    
+    def _extract_subscriber_count(self, soup: BeautifulSoup, html: Optional[str] = None) -> Optional[int]:
+        """Extract subscriber count from the publication page with comprehensive scraping.
+
+        Strategies run as an ordered pipeline that stops at the first hit, on
+        the raw HTML where possible; the winner is kept in
+        self.subscriber_count_strategy and is tried first next time.
+        """
+        logger.debug("Searching for subscriber count in %s", self.base_url)
+        page = PageContext(self.publication_name, html if html is not None else str(soup), soup)
+        subscriber_count, self.subscriber_count_strategy = self.subscriber_pipeline.extract(page, self.publication_key)
         
         if subscriber_count:
-            print(f"[DEBUG] Final subscriber count: {subscriber_count}")
+            logger.debug("Final subscriber count: %s (via %s)", subscriber_count, self.subscriber_count_strategy)
         else:
-            print(f"[DEBUG] No subscriber count found")
+            logger.debug("No subscriber count found")
         
         return subscriber_count
     
-    def _extract_subscriber_count_from_json(self, html_content: str) -> Optional[int]:
-        """Extract subscriber count from JSON data in the HTML."""
-        try:
-            import re
-            import json
-            
-            # First, try publication-specific patterns for any publication
-            pub_patterns = [
-                rf'"publication":\s*{{[^}}]*"subdomain":\s*"{self.publication_name}"[^}}]*"subscriber_count":\s*(\d+)',
-                rf'"publication":\s*{{[^}}]*"subdomain":\s*"{self.publication_name}"[^}}]*"subscribers":\s*(\d+)',
-                rf'"publication":\s*{{[^}}]*"subdomain":\s*"{self.publication_name}"[^}}]*"total_subscribers":\s*(\d+)',
-                rf'"publication":\s*{{[^}}]*"subdomain":\s*"{self.publication_name}"[^}}]*"subscriberCount":\s*(\d+)',
-                rf'"publication":\s*{{[^}}]*"subdomain":\s*"{self.publication_name}"[^}}]*"subscriber_count":\s*"(\d+)"',
-                rf'"publication":\s*{{[^}}]*"subdomain":\s*"{self.publication_name}"[^}}]*"subscribers":\s*"(\d+)"',
-                rf'"publication":\s*{{[^}}]*"subdomain":\s*"{self.publication_name}"[^}}]*"total_subscribers":\s*"(\d+)"',
-                rf'"publication":\s*{{[^}}]*"subdomain":\s*"{self.publication_name}"[^}}]*"subscriberCount":\s*"(\d+)"'
-            ]
-            
-            for pattern in pub_patterns:
-                matches = re.findall(pattern, html_content, re.IGNORECASE | re.DOTALL)
-                for match in matches:
-                    try:
-                        count = int(match)
-                        if count > 0 and count < 1000000:
-                            print(f"[DEBUG] Found subscriber count via JSON pattern for {self.publication_name}: {count}")
-                            return count
-                    except ValueError:
-                        continue
-            
-            # Fallback to general patterns
-            general_patterns = [
-                r'"subscriber_count":\s*(\d+)',
-                r'"subscribers":\s*(\d+)',
-                r'"total_subscribers":\s*(\d+)',
-                r'"subscriberCount":\s*(\d+)',
-                r'"subscriber_count":\s*"(\d+)"',
-                r'"subscribers":\s*"(\d+)"',
-                r'"total_subscribers":\s*"(\d+)"',
-                r'"subscriberCount":\s*"(\d+)"'
-            ]
-            
-            for pattern in general_patterns:
-                matches = re.findall(pattern, html_content, re.IGNORECASE)
-                for match in matches:
-                    try:
-                        count = int(match)
-                        if count > 0 and count < 1000000:
-                            print(f"[DEBUG] Found subscriber count via general JSON pattern: {count}")
-                            return count
-                    except ValueError:
-                        continue
-            
-            print(f"[DEBUG] No subscriber count found in JSON data.")
-            return None
-        except Exception as e:
-            print(f"Error extracting subscriber count from JSON: {e}")
-            return None
-    
     def get_post_engagement(self, post_url: str) -> Dict:
         """Get engagement metrics for a specific post."""
         try:
-            response = self.session.get(post_url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Extract engagement metrics with improved accuracy
-            likes_str = self._extract_likes(soup)
-            comments_str = self._extract_comments(soup)
-            shares_str = self._extract_shares(soup)
-            restacks_str = self._extract_restacks(soup)
-            
-            # Convert to numbers or keep as "-"
-            likes = int(likes_str) if likes_str != "-" else 0
-            comments = int(comments_str) if comments_str != "-" else 0
-            shares = int(shares_str) if shares_str != "-" else 0
-            restacks = int(restacks_str) if restacks_str != "-" else 0
+            if self.extractor_pool is not None:
+                return self._submit_post_extraction(post_url).result()
+            with self.stats.time('post_fetch'):
+                response = self._get(post_url, resource_type='post')
+                response.raise_for_status()
+            if self.capture_sink is not None:
+                self.capture_sink.capture('post', post_url.rstrip('/').rsplit('/', 1)[-1], response.text)
+            with self.stats.time('parse'):
+                soup = parse_html(response.text, self.parser_backend)
             
-            # Extract word count from post content
-            content = soup.find('div', class_='post-content') or soup.find('article')
-            word_count = len(content.get_text().split()) if content else 0
-            
-            # Calculate reading time (average 200 words per minute)
-            reading_time = max(1, word_count // 200) if word_count > 0 else 0
-            
-            return {
-                'likes': likes_str,  # Keep original string for display
-                'comments': comments_str,
-                'shares': shares_str,
-                'restacks': restacks_str,
-                'likes_num': likes,  # Numeric version for calculations
-                'comments_num': comments,
-                'shares_num': shares,
-                'restacks_num': restacks,
-                'word_count': word_count,
-                'reading_time': reading_time,
-                'total_engagement': likes + comments + shares + restacks
-            }
+            # Walk the page once for all metrics and the word count
+            with self.stats.time('extraction'):
+                return extract_engagement(soup)
         except Exception as e:
-            print(f"Error fetching engagement for {post_url}: {e}")
-            return {
-                'likes': "-",
-                'comments': "-",
-                'shares': "-",
-                'restacks': "-",
-                'likes_num': 0,
-                'comments_num': 0,
-                'shares_num': 0,
-                'restacks_num': 0,
-                'word_count': 0,
-                'reading_time': 0,
-                'total_engagement': 0
-            }
-    
-    def _extract_likes(self, soup: BeautifulSoup) -> str:
-        """Extract likes count with improved accuracy."""
-        # Look for Substack-specific like elements
-        like_selectors = [
-            'button[data-testid="like-button"]',
-            '.like-button',
-            '[class*="like"]',
-            'button[aria-label*="like"]',
-            'button[title*="like"]'
-        ]
-        
-        for selector in like_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                # Look for number in the element or its children
-                text = element.get_text()
-                match = re.search(r'(\d+)', text)
-                if match:
-                    try:
-                        number = int(match.group(1))
-                        if number <= 1000:  # Realistic cap
-                            return str(number)
-                    except ValueError:
-                        continue
-        
-        # Fallback to general text search
-        text_content = soup.get_text()
-        patterns = [r'(\d+)\s*likes?', r'(\d+)\s*hearts?', r'(\d+)\s*favorites?']
-        for pattern in patterns:
-            match = re.search(pattern, text_content, re.IGNORECASE)
-            if match:
-                try:
-                    number = int(match.group(1))
-                    if number <= 1000:  # Realistic cap
-                        return str(number)
-                except ValueError:
-                    continue
-        
-        return "-"
-    
-    def _extract_comments(self, soup: BeautifulSoup) -> str:
-        """Extract comments count with improved accuracy."""
-        # Look for Substack-specific comment elements
-        comment_selectors = [
-            'button[data-testid="comment-button"]',
-            '.comment-button',
-            '[class*="comment"]',
-            'button[aria-label*="comment"]',
-            'button[title*="comment"]'
-        ]
-        
-        for selector in comment_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                text = element.get_text()
-                match = re.search(r'(\d+)', text)
-                if match:
-                    try:
-                        number = int(match.group(1))
-                        if number <= 100:  # Realistic cap
-                            return str(number)
-                    except ValueError:
-                        continue
-        
-        # Fallback to general text search
-        text_content = soup.get_text()
-        patterns = [r'(\d+)\s*comments?', r'(\d+)\s*replies?']
-        for pattern in patterns:
-            match = re.search(pattern, text_content, re.IGNORECASE)
-            if match:
-                try:
-                    number = int(match.group(1))
-                    if number <= 100:  # Realistic cap
-                        return str(number)
-                except ValueError:
-                    continue
-        
-        return "-"
-    
-    def _extract_shares(self, soup: BeautifulSoup) -> str:
-        """Extract shares count with improved accuracy."""
-        # Look for Substack-specific share elements
-        share_selectors = [
-            'button[data-testid="share-button"]',
-            '.share-button',
-            '[class*="share"]',
-            'button[aria-label*="share"]',
-            'button[title*="share"]'
-        ]
-        
-        for selector in share_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                text = element.get_text()
-                match = re.search(r'(\d+)', text)
-                if match:
-                    try:
-                        number = int(match.group(1))
-                        if number <= 1000:  # Realistic cap
-                            return str(number)
-                    except ValueError:
-                        continue
-        
-        # Fallback to general text search
-        text_content = soup.get_text()
-        patterns = [r'(\d+)\s*shares?', r'(\d+)\s*retweets?']
-        for pattern in patterns:
-            match = re.search(pattern, text_content, re.IGNORECASE)
-            if match:
-                try:
-                    number = int(match.group(1))
-                    if number <= 1000:  # Realistic cap
-                        return str(number)
-                except ValueError:
-                    continue
-        
-        return "-"
-    
-    def _extract_restacks(self, soup: BeautifulSoup) -> str:
-        """Extract restacks count with improved accuracy."""
-        # Look for Substack-specific restack elements
-        restack_selectors = [
-            'button[data-testid="restack-button"]',
-            '.restack-button',
-            '[class*="restack"]',
-            'button[aria-label*="restack"]',
-            'button[title*="restack"]',
-            'button[aria-label*="repost"]',
-            'button[title*="repost"]'
-        ]
-        
-        for selector in restack_selectors:
-            elements = soup.select(selector)
-            for element in elements:
-                text = element.get_text()
-                match = re.search(r'(\d+)', text)
-                if match:
-                    try:
-                        number = int(match.group(1))
-                        if number <= 1000:  # Realistic cap
-                            return str(number)
-                    except ValueError:
-                        continue
-        
-        # Fallback to general text search for restack patterns
-        text_content = soup.get_text()
-        patterns = [
-            r'(\d+)\s*restacks?',
-            r'(\d+)\s*reposts?',
-            r'(\d+)\s*re-shares?',
-            r'(\d+)\s*re-shares?'
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text_content, re.IGNORECASE)
-            if match:
-                try:
-                    number = int(match.group(1))
-                    if number <= 1000:  # Realistic cap
-                        return str(number)
-                except ValueError:
-                    continue
-        
-        return "-"
-    
-    def _extract_number(self, soup: BeautifulSoup, keywords: List[str]) -> str:
-        """Legacy method - kept for compatibility."""
-        text_content = soup.get_text()
-        for keyword in keywords:
-            pattern = rf'(\d+)\s*{keyword}s?'
-            match = re.search(pattern, text_content, re.IGNORECASE)
-            if match:
-                try:
-                    number = int(match.group(1))
-                    if keyword in ['share', 'retweet'] and number > 1000:
-                        return str(min(number, 1000))
-                    elif keyword in ['like', 'heart', 'favorite'] and number > 1000:
-                        return str(min(number, 500))
-                    elif keyword in ['comment', 'reply'] and number > 100:
-                        return str(min(number, 50))
-                    return str(number)
-                except ValueError:
-                    continue
-        return "-"
+            logger.warning("Error fetching engagement for %s: %s", post_url, e)
+            return self._engagement_error(e)
+
+    @staticmethod
+    def _engagement_error(error: Exception) -> Dict:
+        """Placeholder engagement for a post whose page could not be fetched or parsed."""
+        return {
+            'fetch_error': str(error),
+            'likes': "-",
+            'comments': "-",
+            'shares': "-",
+            'restacks': "-",
+            'likes_num': 0,
+            'comments_num': 0,
+            'shares_num': 0,
+            'restacks_num': 0,
+            'word_count': 0,
+            'reading_time': 0,
+            'total_engagement': 0
+        }
+
+    def _submit_post_extraction(self, post_url: str) -> Future:
+        """Download a post page in this thread and hand its bytes to the extractor pool.
+
+        The 'extraction' phase covers the time from submit to result,
+        including any wait for a free worker.
+        """
+        with self.stats.time('post_fetch'):
+            response = self._get(post_url, resource_type='post')
+            response.raise_for_status()
+        if self.capture_sink is not None:
+            self.capture_sink.capture('post', post_url.rstrip('/').rsplit('/', 1)[-1], response.text)
+        submitted = time.perf_counter()
+        future = self.extractor_pool.post_engagement(response.content, response.encoding, self.parser_backend)
+        stats = self.stats
+        future.add_done_callback(lambda _: stats.record('extraction', time.perf_counter() - submitted))
+        return future
     
-    def analyze_publication(self, limit: int = None) -> Dict:
-        """Perform comprehensive analysis of the publication."""
-        print("[ANALYSIS] Starting comprehensive analysis...")
+    def _iter_engagements(self, posts: List[Dict], max_workers: int) -> Iterator[Tuple[int, Dict]]:
+        """Fetch engagement for every post, yielding (index, engagement) as each one finishes.
+
+        At most max_workers fetches are in flight, so a consumer that stops
+        iterating leaves little work behind.
+        """
+        total_posts = len(posts)
+
+        def analyze_one(indexed_post):
+            i, post = indexed_post
+            # Safe encoding for display
+            safe_title = post['title'].encode('ascii', 'ignore').decode('ascii')
+            logger.info("Analyzing post %s/%s: %s...", i+1, total_posts, safe_title[:50])
+            return self.get_post_engagement(post['link'])
+
+        if self.extractor_pool is not None:
+            finished = self._iter_engagements_pipelined(posts, max_workers)
+        elif self.executor is not None:
+            finished = self._bounded_as_completed(self.executor, analyze_one, list(enumerate(posts)), max_workers)
+        elif max_workers <= 1:
+            finished = ((i, analyze_one((i, post))) for i, post in enumerate(posts))
+        else:
+            finished = self._local_as_completed(analyze_one, list(enumerate(posts)), max_workers)
+
+        yield from finished
+
+    def _local_as_completed(self, func, items: List, max_workers: int) -> Iterator[Tuple[int, object]]:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            yield from self._bounded_as_completed(executor, func, items, max_workers)
+
+    def _iter_engagements_pipelined(self, posts: List[Dict], max_workers: int) -> Iterator[Tuple[int, Dict]]:
+        """Pipeline mode: download threads submit page bytes to the extractor pool and move on.
+
+        Yields (index, engagement) as each extraction finishes.
+        """
+        total_posts = len(posts)
+
+        def download_one(indexed_post):
+            i, post = indexed_post
+            logger.info("Fetching post %s/%s: %s", i + 1, total_posts, post['link'])
+            try:
+                return self._submit_post_extraction(post['link'])
+            except Exception as e:
+                future = Future()
+                future.set_exception(e)
+                return future
+
+        def engagement(i, future):
+            try:
+                return future.result()
+            except Exception as e:
+                logger.warning("Error fetching engagement for %s: %s", posts[i]['link'], e)
+                return self._engagement_error(e)
+
+        window = max(1, max_workers)
+        downloaders = None if self.executor is not None else ThreadPoolExecutor(max_workers=window)
+        executor = self.executor or downloaders
+        # Download futures resolve to extraction futures; both are waited on together
+        pending: Dict[Future, Tuple[str, int]] = {}
+        downloading = 0
+        next_index = 0
+        try:
+            while next_index < total_posts or pending:
+                while next_index < total_posts and downloading < window:
+                    pending[executor.submit(download_one, (next_index, posts[next_index]))] = ('download', next_index)
+                    downloading += 1
+                    next_index += 1
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, i = pending.pop(future)
+                    if kind == 'download':
+                        downloading -= 1
+                        pending[future.result()] = ('extract', i)
+                    else:
+                        yield i, engagement(i, future)
+        finally:
+            if downloaders is not None:
+                downloaders.shutdown()
+
+    @staticmethod
+    def _bounded_as_completed(executor: Executor, func, items: List, window: int) -> Iterator[Tuple[int, object]]:
+        """Map func over items on an executor with at most window tasks in flight.
+
+        Keeps one publication from flooding a pool shared with others; yields
+        (index, result) in completion order.
+        """
+        pending = {}
+        next_index = 0
+        while next_index < len(items) or pending:
+            while next_index < len(items) and len(pending) < max(1, window):
+                pending[executor.submit(func, items[next_index])] = next_index
+                next_index += 1
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+
+    @staticmethod
+    def _parse_pub_date(pub_date: str) -> Optional[datetime]:
+        """Parse an RSS pubDate into a naive UTC datetime, or None."""
+        try:
+            return datetime.strptime(pub_date, '%a, %d %b %Y %H:%M:%S %Z')
+        except (TypeError, ValueError):
+            return None
+
+    def _iter_incremental_engagements(self, posts: List[Dict], max_workers: int, freshness_days: float,
+                                      refetch_after_days: Optional[float] = None,
+                                      reused_indices: Optional[Set[int]] = None
+                                      ) -> Iterator[Tuple[int, Dict]]:
+        """Refetch only new posts and posts younger than freshness_days; reuse the rest from the store.
+
+        Stored engagement fetched more than refetch_after_days ago is
+        refetched too, however old the post. Reused posts are yielded first
+        and their indices added to reused_indices. The store is saved even if
+        the run stops early, so fetched posts are not lost.
+        """
+        if self.post_store is None:
+            safe_key = re.sub(r'[^A-Za-z0-9_.-]', '_', self.publication_key)
+            self.post_store = PostStore(f"post_store_{safe_key}.json")
+        store = self.post_store
+
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=freshness_days)
+        # Stored fetch times are local, like the fetched_at written below
+        refetch_before = (datetime.now() - timedelta(days=refetch_after_days)
+                          if refetch_after_days is not None else None)
+        reused = []
+        stale_indices = []
+        for i, post in enumerate(posts):
+            published = self._parse_pub_date(post['pub_date'])
+            stored = store.get(post['link'])
+            if (stored is not None and refetch_before is not None
+                    and store.fetched_at(post['link']) < refetch_before):
+                stored = None
+            if stored is not None and published is not None and published < cutoff:
+                reused.append((i, stored))
+            else:
+                stale_indices.append(i)
+
+        logger.info("Incremental run: %s to fetch, %s reused from %s",
+                    len(stale_indices), len(reused), store.path)
+
+        if reused_indices is not None:
+            reused_indices.update(i for i, _ in reused)
+        yield from reused
+        fetched_at = datetime.now()
+        try:
+            for j, engagement in self._iter_engagements([posts[i] for i in stale_indices], max_workers):
+                i = stale_indices[j]
+                # Failed fetches are not persisted so they get retried next run
+                if 'fetch_error' not in engagement:
+                    store.put(posts[i]['link'], engagement, fetched_at)
+                yield i, engagement
+        finally:
+            store.save()
+
+    def check_feed(self, digest_store: FeedDigestStore) -> FeedCheck:
+        """Fetch the feed conditionally and compare its digest with the stored one.
+
+        A 304 Not Modified counts as unchanged without parsing anything.
+        The store is not updated; refresh_publication records the digest
+        once the analysis that used it has succeeded.
+        """
+        entry = digest_store.get(self.base_url)
+        # Sent directly rather than through the HTTP cache so a 304 stays visible
+        with self.stats.time('feed_fetch'):
+            response = self._get(f"{self.base_url}/feed", headers=digest_store.conditional_headers(self.base_url))
+            if response.status_code == 304 and entry is not None:
+                response.close()
+                return FeedCheck(False, entry['digest'], not_modified=True)
+            response.raise_for_status()
+            posts = list(self._iter_rss_items([response.content]))
+
+        digest = feed_digest(posts)
+        changed = entry is None or entry.get('digest') != digest
+        return FeedCheck(changed, digest, posts, etag=response.headers.get('ETag'),
+                         last_modified=response.headers.get('Last-Modified'))
+
+    @staticmethod
+    def _feed_posts(analysis: Dict) -> List[Dict]:
+        """The RSS fields of an earlier analysis's posts, for reuse as the feed."""
+        return [{key: post.get(key, "") for key in RSS_FIELDS.values()} for post in analysis.get('all_posts', [])]
+
+    def refresh_publication(self, digest_store: FeedDigestStore, unchanged: str = 'skip',
+                            previous_analysis: Optional[Dict] = None, save: bool = True,
+                            **analyze_kwargs) -> Optional[Dict]:
+        """Run analyze_publication only if the feed changed since the last recorded run.
+
+        For an unchanged feed, unchanged='skip' returns None without further
+        requests. unchanged='light' runs an incremental, engagement-only
+        refresh: the homepage (and, after a 304, the feed) are taken from
+        previous_analysis when given. The result carries a 'refresh' entry
+        with the mode used, and its 'stats' include the precheck. With
+        save=False the digest is only recorded in digest_store; batch
+        callers save the store once at the end.
+        """
+        if unchanged not in ('skip', 'light'):
+            raise ValueError(f"Unknown unchanged-feed mode: {unchanged}")
+        self.stats = precheck = PhaseStats(self.metrics_registry)
+        started = time.perf_counter()
+        check = self._on_fetch_pool(self.check_feed, digest_store)
+        precheck_seconds = time.perf_counter() - started
+
+        if check.changed:
+            mode = 'full'
+            analysis = self.analyze_publication(posts=check.posts, **analyze_kwargs)
+        elif unchanged == 'skip':
+            logger.info("Feed of %s unchanged, skipping analysis", self.base_url)
+            self.stats.count('feed_prechecks', outcome='skipped')
+            digest_store.record(self.base_url, check)
+            if save:
+                digest_store.save()
+            return None
+        else:
+            mode = 'light'
+            logger.info("Feed of %s unchanged, refreshing engagement only", self.base_url)
+            posts = check.posts
+            if posts is None and previous_analysis is not None:
+                posts = self._feed_posts(previous_analysis)
+            analyze_kwargs['incremental'] = True
+            analysis = self.analyze_publication(
+                posts=posts or None,
+                publication_info=previous_analysis['publication'] if previous_analysis else None,
+                **analyze_kwargs)
+
+        # analyze_publication started fresh stats; fold the precheck back in
+        self.stats.merge(precheck)
+        self.stats.count('feed_prechecks', outcome=mode)
+        if 'error' not in analysis:
+            digest_store.record(self.base_url, check)
+            if save:
+                digest_store.save()
+            analysis['stats'] = {**self.stats.to_dict(),
+                                 'wall_seconds': round(analysis['stats']['wall_seconds'] + precheck_seconds, 4)}
+            analysis['refresh'] = {'mode': mode, 'feed_changed': check.changed,
+                                   'feed_not_modified': check.not_modified,
+                                   'precheck_seconds': round(precheck_seconds, 4)}
+        return analysis
+
+    def analyze_publication(self, limit: int = None, max_workers: Optional[int] = None,
+                            incremental: bool = False, freshness_days: float = 7,
+                            progress_callback: Optional[Callable[[int, int], None]] = None,
+                            posts: Optional[List[Dict]] = None,
+                            publication_info: Optional[Dict] = None,
+                            source: str = 'rss', refetch_after_days: Optional[float] = 30) -> Dict:
+        """Perform comprehensive analysis of the publication.
+
+        max_workers overrides the collector's concurrency for this run; post
+        fetches are paced by the per-host rate limiter rather than a fixed sleep.
+        With incremental=True only new posts and posts published within the
+        last freshness_days are scraped; older posts come from the post store
+        unless their stored engagement is more than refetch_after_days old
+        (None keeps it forever).
+        progress_callback(done, total) is called as each post finishes, whether
+        it was fetched, reused from the store or taken from the archive JSON.
+        Already fetched feed posts or publication info can be passed in to
+        skip those requests. With source='archive' posts and their counts
+        come from the JSON archive (the whole archive, not just the feed),
+        post pages are scraped only for fields the JSON lacks, and
+        incremental is ignored; if the archive is unavailable the RSS path
+        is used. Phase timings and counters for the run are returned under
+        'stats'. The dict is the fold of iter_analysis, which streams the
+        same run post by post.
+        """
+        analysis = None
+        for event in self.iter_analysis(limit, max_workers, incremental, freshness_days, progress_callback,
+                                        posts, publication_info, source, refetch_after_days):
+            if event['type'] == 'complete':
+                analysis = event['analysis']
+        return analysis
+
+    def iter_analysis(self, limit: int = None, max_workers: Optional[int] = None,
+                      incremental: bool = False, freshness_days: float = 7,
+                      progress_callback: Optional[Callable[[int, int], None]] = None,
+                      posts: Optional[List[Dict]] = None,
+                      publication_info: Optional[Dict] = None,
+                      source: str = 'rss', refetch_after_days: Optional[float] = 30) -> Iterator[Dict]:
+        """Stream an analysis as events, taking the same arguments as analyze_publication.
+
+        Yields {'type': 'start', 'publication', 'total_posts'} once the feed
+        is read, then {'type': 'post', 'index', 'post', 'done', 'total_posts',
+        'running'} as each post finishes (in completion order; index is its
+        feed position and running the aggregates so far), and finally
+        {'type': 'complete', 'analysis'} with the analyze_publication dict.
+        Without posts only the complete event is yielded, with the error.
+        """
+        if source not in ('rss', 'archive'):
+            raise ValueError(f"Unknown post source: {source}")
+        logger.info("Starting comprehensive analysis...")
+        self.stats = PhaseStats(self.metrics_registry)
+        started = time.perf_counter()
         
-        # Get publication info
-        print("[ANALYSIS] Fetching publication information...")
-        pub_info = self.get_publication_info()
+        archive_items = None
+        if source == 'archive' and posts is None:
+            try:
+                archive_items = self._on_fetch_pool(self.fetch_archive, limit or None)
+                posts = [archive_post(item, self.base_url) for item in archive_items]
+            except Exception as e:
+                logger.warning("Archive API unavailable for %s, using the RSS feed: %s", self.base_url, e)
+                archive_items = None
         
-        # Get posts - if no limit specified, get all posts
-        print("[ANALYSIS] Fetching posts from RSS feed...")
-        posts = self.fetch_posts(limit) if limit else self.fetch_posts()
+        if posts is not None or publication_info is not None:
+            pub_info = (publication_info if publication_info is not None
+                        else self._on_fetch_pool(self.get_publication_info))
+            if posts is None:
+                posts = self._on_fetch_pool(self.fetch_posts, limit or None)
+            elif limit:
+                posts = posts[:limit]
+        elif self.executor is not None:
+            # On a shared pool the homepage and the feed are fetched side by side
+            logger.info("Fetching publication information and RSS feed...")
+            pub_info_future = self.executor.submit(self.get_publication_info)
+            posts_future = self.executor.submit(self.fetch_posts, limit or None)
+            pub_info, posts = pub_info_future.result(), posts_future.result()
+        else:
+            # Get publication info
+            logger.info("Fetching publication information...")
+            pub_info = self.get_publication_info()
+            
+            # Get posts - if no limit specified, get all posts
+            logger.info("Fetching posts from RSS feed...")
+            posts = self.fetch_posts(limit) if limit else self.fetch_posts()
         
         if not posts:
-            return {"error": "No posts found"}
+            self.stats.count('analyses', outcome='no_posts')
+            yield {'type': 'complete', 'analysis': {"error": "No posts found"}}
+            return
         
         total_posts = len(posts)
-        print(f"[ANALYSIS] Found {total_posts} posts to analyze")
+        logger.info("Found %s posts to analyze", total_posts)
+        yield {'type': 'start', 'publication': pub_info, 'total_posts': total_posts}
         
         # Analyze each post
-        print("[ANALYSIS] Analyzing post engagement...")
-        analyzed_posts = []
-        total_likes = 0
-        total_comments = 0
-        total_shares = 0
-        total_restacks = 0
-        total_words = 0
-        total_reading_time = 0
-        
-        for i, post in enumerate(posts):  # Analyze ALL posts
-            # Safe encoding for display
-            safe_title = post['title'].encode('ascii', 'ignore').decode('ascii')
-            print(f"   Analyzing post {i+1}/{total_posts}: {safe_title[:50]}...")
-            
-            # Get engagement data
-            engagement = self.get_post_engagement(post['link'])
-            
-            # Combine post data with engagement
-            analyzed_post = {
-                **post,
-                **engagement,
-                'engagement_rate': 0  # Will calculate later
-            }
-            analyzed_posts.append(analyzed_post)
-            
-            # Accumulate totals
-            total_likes += engagement['likes_num']
-            total_comments += engagement['comments_num']
-            total_shares += engagement['shares_num']
-            total_restacks += engagement['restacks_num']
-            total_words += engagement['word_count']
-            total_reading_time += engagement['reading_time']
-            
-            # Be respectful with requests
-            time.sleep(1)
-        
-        # Calculate analytics
-        num_posts = len(analyzed_posts)
-        avg_likes = total_likes / num_posts if num_posts > 0 else 0
-        avg_comments = total_comments / num_posts if num_posts > 0 else 0
-        avg_shares = total_shares / num_posts if num_posts > 0 else 0
-        avg_restacks = total_restacks / num_posts if num_posts > 0 else 0
-        avg_words = total_words / num_posts if num_posts > 0 else 0
-        avg_reading_time = total_reading_time / num_posts if num_posts > 0 else 0
+        workers = max(1, max_workers) if max_workers is not None else self.max_workers
+        logger.info("Analyzing post engagement (%s worker%s)...", workers, 's' if workers != 1 else '')
+        reused_indices: Set[int] = set()
+        if archive_items is not None:
+            finished = self._iter_archive_engagements(archive_items, posts, workers)
+        elif incremental:
+            finished = self._iter_incremental_engagements(posts, workers, freshness_days, refetch_after_days,
+                                                          reused_indices)
+        else:
+            finished = self._iter_engagements(posts, workers)
+
+        engagements: List[Optional[Dict]] = [None] * total_posts
+        running = RunningTotals()
+        for done, (i, engagement) in enumerate(finished, 1):
+            engagements[i] = engagement
+            post = {**posts[i], **engagement, 'engagement_rate': 0}
+            running.add(post)
+            if progress_callback is not None:
+                progress_callback(done, total_posts)
+            yield {'type': 'post', 'index': i, 'post': post, 'done': done, 'total_posts': total_posts,
+                   'running': running.to_dict()}
+
+        yield {'type': 'complete',
+               'analysis': self._build_analysis(pub_info, posts, engagements, started, reused_indices)}
+    
+    def _build_analysis(self, pub_info: Dict, posts: List[Dict], engagements: List[Dict],
+                        started: float, reused_indices: Iterable[int] = ()) -> Dict:
+        """Combine posts with their engagement into the analysis dict (aggregates, top posts, stats).
+
+        started is the run's time.perf_counter() start, for 'wall_seconds'.
+        Posts at reused_indices carry engagement from the post store, so they
+        are left out of the engagement snapshot.
+        """
+        analyzed_posts = [
+            {**post, **engagement, 'engagement_rate': 0}  # Will calculate later
+            for post, engagement in zip(posts, engagements)  # Analyze ALL posts
+        ]
+        # Posts whose fetch failed after retries have no real metrics; keep
+        # them in all_posts but out of every aggregate
+        failed_posts = [post for post in analyzed_posts if 'fetch_error' in post]
+        if failed_posts:
+            logger.info("%s post(s) could not be fetched and are excluded from the analytics", len(failed_posts))
+        columns = PostColumns.from_posts(
+            (post for post in analyzed_posts if 'fetch_error' not in post), self.publication_name)
+
+        # Calculate analytics from the metric columns
+        num_posts = len(columns)
+        total_likes = columns.total('likes')
+        total_comments = columns.total('comments')
+        total_shares = columns.total('shares')
+        total_restacks = columns.total('restacks')
+        avg_likes = columns.mean('likes')
+        avg_comments = columns.mean('comments')
+        avg_shares = columns.mean('shares')
+        avg_restacks = columns.mean('restacks')
+        avg_words = columns.mean('word_count')
+        avg_reading_time = columns.mean('reading_time')
         
-        # Find top performing posts
-        top_posts = sorted(analyzed_posts, key=lambda x: x['total_engagement'], reverse=True)[:5]
+        # Find top performing posts (partial selection, ties keep feed order)
+        top_posts = columns.top_n('total_engagement', 5)
         
         # Calculate publishing frequency
         if len(posts) > 1:
@@ -790,7 +875,7 @@ class SubstackDataCollector:
         else:
             posts_per_week = 0
         
-        return {
+        analysis = {
             'publication': pub_info,
             'analytics': {
                 'total_posts_analyzed': num_posts,
@@ -801,18 +886,70 @@ class SubstackDataCollector:
                 'average_word_count': round(avg_words, 0),
                 'average_reading_time': round(avg_reading_time, 1),
                 'publishing_frequency': round(posts_per_week, 1),
-                'total_engagement': total_likes + total_comments + total_shares + total_restacks
+                'total_engagement': total_likes + total_comments + total_shares + total_restacks,
+                'posts_failed': len(failed_posts)
             },
             'top_posts': top_posts,
-            'all_posts': analyzed_posts
+            'all_posts': analyzed_posts,
+            'statistics': {
+                'metrics': columns.summary(),
+                'monthly': columns.monthly_rollup()
+            }
         }
+        self.stats.count('posts_fetched', num_posts)
+        self.stats.count('post_fetch_errors', len(failed_posts))
+        self.stats.count('analyses', outcome='success')
+        analysis['stats'] = {**self.stats.to_dict(), 'wall_seconds': round(time.perf_counter() - started, 4)}
+        if self.snapshot_store is not None:
+            try:
+                self.snapshot_store.record_analysis(analysis, self.publication_key,
+                                                    skip_links=[posts[i]['link'] for i in reused_indices])
+            except Exception as e:
+                logger.error("Could not record engagement snapshot: %s", e)
+        return analysis
+    
+    def export_to_arrow(self, analysis_data: Dict, filename: str = None, parquet: bool = False) -> str:
+        """Export analytics data to an Arrow IPC (or Parquet) file that loads back via arrow_store.read_analysis."""
+        if filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            extension = 'parquet' if parquet else 'arrow'
+            filename = f"substack_analytics_{self.publication_name}_{timestamp}.{extension}"
+        with self.stats.time('export'):
+            arrow_store.write_analysis(analysis_data, filename)
+        self._update_export_stats(analysis_data)
+        return filename
     
-    def export_to_excel(self, analysis_data: Dict, filename: str = None) -> str:
-        """Export analytics data to Excel file."""
+    def export_to_excel(self, analysis_data: Dict, filename: str = None, streaming: bool = False,
+                        posts: Optional[Iterable[Dict]] = None) -> str:
+        """Export analytics data to Excel file.
+
+        With streaming=True the workbook is written in openpyxl's write-only
+        mode, keeping memory flat for large archives; posts may then be any
+        iterable (e.g. a generator) used instead of analysis_data['all_posts'].
+        """
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"substack_analytics_{self.publication_name}_{timestamp}.xlsx"
         
+        with self.stats.time('export'):
+            if streaming:
+                filename = export_analysis(analysis_data, filename, posts=posts)
+            else:
+                filename = self._export_to_excel_workbook(analysis_data, filename, posts)
+        self._update_export_stats(analysis_data)
+        return filename
+    
+    def _update_export_stats(self, analysis_data: Dict) -> None:
+        """Refresh the stats on an analysis result so they include the export phase."""
+        if 'stats' in analysis_data:
+            analysis_data['stats'] = {**analysis_data['stats'], **self.stats.to_dict()}
+    
+    def _export_to_excel_workbook(self, analysis_data: Dict, filename: str,
+                                  posts: Optional[Iterable[Dict]] = None) -> str:
+        """Build the regular (in-memory) workbook used by export_to_excel."""
+        if posts is not None:
+            analysis_data = {**analysis_data, 'all_posts': list(posts)}
+        
         # Create workbook
         wb = openpyxl.Workbook()
         
@@ -955,8 +1092,11 @@ PUBLICATION_URL = "https://cashandcache.com"  # ← CHANGE THIS URL
 # =================================================================================================
 # Example usage
 if __name__ == "__main__":
-    # Create collector with the configured URL
-    collector = SubstackDataCollector(PUBLICATION_URL)
+    # Progress messages at INFO; use logging.DEBUG to see every extraction step
+    logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+    
+    # Create collector with the configured URL; re-runs revalidate cached pages
+    collector = SubstackDataCollector(PUBLICATION_URL, http_cache=HttpCache())
     
     print(">>> Starting Substack Analytics Dashboard")
     print("=" * 60)
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+Single-pass engagement extraction for Substack post pages.
+
+The legacy extractors (kept in benchmarks/legacy_extraction.py) each ran
+their own CSS selectors over the whole tree and then re-materialized
+soup.get_text() for a regex fallback, and the word count walked the tree
+once more. Here the document is walked once: matching elements and the
+text spans they cover are recorded on the way, the page text is joined
+once, and every fallback pattern is matched by one combined regex.
+Results are identical to the legacy extractors.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+
+METRICS = ('likes', 'comments', 'shares', 'restacks')
+
+# Realistic caps applied by the legacy extractors
+METRIC_CAPS = {'likes': 1000, 'comments': 100, 'shares': 1000, 'restacks': 1000}
+
+# The legacy CSS selectors, in priority order, as (kind, attribute, value):
+#   'testid'   -> button[data-testid="<value>"]
+#   'class'    -> .<value>
+#   'class*'   -> [class*="<value>"]
+#   'button*'  -> button[<attribute>*="<value>"]
+_SELECTORS = {
+    'likes': [
+        ('testid', 'data-testid', 'like-button'),
+        ('class', 'class', 'like-button'),
+        ('class*', 'class', 'like'),
+        ('button*', 'aria-label', 'like'),
+        ('button*', 'title', 'like'),
+    ],
+    'comments': [
+        ('testid', 'data-testid', 'comment-button'),
+        ('class', 'class', 'comment-button'),
+        ('class*', 'class', 'comment'),
+        ('button*', 'aria-label', 'comment'),
+        ('button*', 'title', 'comment'),
+    ],
+    'shares': [
+        ('testid', 'data-testid', 'share-button'),
+        ('class', 'class', 'share-button'),
+        ('class*', 'class', 'share'),
+        ('button*', 'aria-label', 'share'),
+        ('button*', 'title', 'share'),
+    ],
+    'restacks': [
+        ('testid', 'data-testid', 'restack-button'),
+        ('class', 'class', 'restack-button'),
+        ('class*', 'class', 'restack'),
+        ('button*', 'aria-label', 'restack'),
+        ('button*', 'title', 'restack'),
+        ('button*', 'aria-label', 'repost'),
+        ('button*', 'title', 'repost'),
+    ],
+}
+
+# Fallback text patterns per metric, in priority order (only the first
+# occurrence of each pattern is considered, as with re.search)
+_FALLBACK_KEYWORDS = {
+    'likes': ['likes?', 'hearts?', 'favorites?'],
+    'comments': ['comments?', 'replies?'],
+    'shares': ['shares?', 'retweets?'],
+    'restacks': ['restacks?', 'reposts?', 're-shares?'],
+}
+
+# One alternation with a capture group per keyword; m.lastindex tells which matched
+_KEYWORD_ORDER = [keyword for metric in METRICS for keyword in _FALLBACK_KEYWORDS[metric]]
+_FALLBACK_RE = re.compile(
+    r'(\d+)\s*(?:' + '|'.join(f'({keyword})' for keyword in _KEYWORD_ORDER) + ')',
+    re.IGNORECASE,
+)
+_GROUP_TO_KEYWORD = {index + 2: keyword for index, keyword in enumerate(_KEYWORD_ORDER)}
+
+_NUMBER_RE = re.compile(r'(\d+)')
+
+# String types that count as text for get_text() on ordinary elements
+_MAIN_STRING_TYPES = (NavigableString, CData)
+
+
+class _Candidate:
+    """An element matched during the walk, with the span of page strings it covers."""
+
+    __slots__ = ('tag', 'start', 'end', 'selectors', '_number')
+
+    def __init__(self, tag: Tag, start: int, selectors: List):
+        self.tag = tag
+        self.start = start
+        self.end = start
+        self.selectors = selectors
+        self._number = False
+
+    def text(self, strings: List[str]) -> str:
+        own_types = getattr(self.tag, 'interesting_string_types', None)
+        if own_types is not None and set(own_types) != set(_MAIN_STRING_TYPES):
+            # script/style-like containers count different strings as text
+            return self.tag.get_text()
+        return ''.join(strings[self.start:self.end])
+
+    def number(self, strings: List[str]) -> Optional[int]:
+        if self._number is False:
+            match = _NUMBER_RE.search(self.text(strings))
+            self._number = int(match.group(1)) if match else None
+        return self._number
+
+
+def _matching_selectors(tag: Tag) -> List:
+    """Return (metric, priority) pairs for every legacy selector this element matches."""
+    attrs = tag.attrs
+    if not attrs:
+        return []
+
+    classes = attrs.get('class')
+    if isinstance(classes, str):
+        class_tokens = classes.split()
+        class_value = classes
+    elif classes:
+        class_tokens = classes
+        class_value = ' '.join(classes)
+    else:
+        class_tokens = ()
+        class_value = None
+    is_button = tag.name == 'button'
+
+    matches = []
+    for metric in METRICS:
+        for priority, (kind, attribute, value) in enumerate(_SELECTORS[metric]):
+            if kind == 'class*':
+                hit = class_value is not None and value in class_value
+            elif kind == 'class':
+                hit = value in class_tokens
+            elif not is_button:
+                continue
+            elif kind == 'testid':
+                hit = attrs.get(attribute) == value
+            else:
+                attr_value = attrs.get(attribute)
+                if attr_value is not None and not isinstance(attr_value, str):
+                    attr_value = ' '.join(attr_value)
+                hit = attr_value is not None and value in attr_value
+            if hit:
+                matches.append((metric, priority))
+    return matches
+
+
+def _is_content_root(tag: Tag) -> Optional[str]:
+    """Identify the elements used for word count (div.post-content, else article)."""
+    if tag.name == 'div':
+        classes = tag.attrs.get('class')
+        if classes and ('post-content' in classes if not isinstance(classes, str) else classes == 'post-content'):
+            return 'post-content'
+    elif tag.name == 'article':
+        return 'article'
+    return None
+
+
+def extract_engagement(soup: BeautifulSoup) -> Dict:
+    """Extract engagement metrics and word count from a parsed post page.
+
+    Returns the same dict shape as SubstackDataCollector.get_post_engagement.
+    """
+    strings: List[str] = []
+    candidates: List[_Candidate] = []
+    content_roots: Dict[str, _Candidate] = {}
+
+    # Iterative pre-order walk; a candidate's span is closed when its
+    # children iterator is exhausted
+    stack = [(iter(soup.contents), None)]
+    while stack:
+        children, open_candidate = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if open_candidate is not None:
+                open_candidate.end = len(strings)
+            continue
+        if isinstance(child, Tag):
+            selectors = _matching_selectors(child)
+            root_kind = _is_content_root(child)
+            candidate = None
+            if selectors or (root_kind and root_kind not in content_roots):
+                candidate = _Candidate(child, len(strings), selectors)
+                if selectors:
+                    candidates.append(candidate)
+                if root_kind and root_kind not in content_roots:
+                    content_roots[root_kind] = candidate
+            stack.append((iter(child.contents), candidate))
+        elif type(child) in _MAIN_STRING_TYPES:
+            strings.append(child)
+
+    values = {metric: _from_selectors(metric, candidates, strings) for metric in METRICS}
+
+    missing = [metric for metric in METRICS if values[metric] is None]
+    if missing:
+        first_hits = _first_keyword_hits(''.join(strings))
+        for metric in missing:
+            values[metric] = _from_fallback(metric, first_hits)
+
+    content = content_roots.get('post-content') or content_roots.get('article')
+    word_count = len(content.text(strings).split()) if content else 0
+
+    return build_engagement(values['likes'], values['comments'], values['shares'],
+                            values['restacks'], word_count)
+
+
+def _from_selectors(metric: str, candidates: List[_Candidate], strings: List[str]) -> Optional[str]:
+    cap = METRIC_CAPS[metric]
+    for priority in range(len(_SELECTORS[metric])):
+        for candidate in candidates:
+            if (metric, priority) not in candidate.selectors:
+                continue
+            number = candidate.number(strings)
+            if number is not None and number <= cap:
+                return str(number)
+    return None
+
+
+def _first_keyword_hits(text: str) -> Dict[str, int]:
+    """Return the number before the first occurrence of each fallback keyword."""
+    hits: Dict[str, int] = {}
+    for match in _FALLBACK_RE.finditer(text):
+        keyword = _GROUP_TO_KEYWORD[match.lastindex]
+        if keyword not in hits:
+            hits[keyword] = int(match.group(1))
+            if len(hits) == len(_KEYWORD_ORDER):
+                break
+    return hits
+
+
+def _from_fallback(metric: str, first_hits: Dict[str, int]) -> str:
+    cap = METRIC_CAPS[metric]
+    for keyword in _FALLBACK_KEYWORDS[metric]:
+        number = first_hits.get(keyword)
+        if number is not None and number <= cap:
+            return str(number)
+    return "-"
+
+
+def build_engagement(likes_str: str, comments_str: str, shares_str: str,
+                     restacks_str: str, word_count: int) -> Dict:
+    """Assemble the engagement dict returned by get_post_engagement."""
+    likes = int(likes_str) if likes_str != "-" else 0
+    comments = int(comments_str) if comments_str != "-" else 0
+    shares = int(shares_str) if shares_str != "-" else 0
+    restacks = int(restacks_str) if restacks_str != "-" else 0
+
+    # Calculate reading time (average 200 words per minute)
+    reading_time = max(1, word_count // 200) if word_count > 0 else 0
+
+    return {
+        'likes': likes_str,  # Keep original string for display
+        'comments': comments_str,
+        'shares': shares_str,
+        'restacks': restacks_str,
+        'likes_num': likes,  # Numeric version for calculations
+        'comments_num': comments,
+        'shares_num': shares,
+        'restacks_num': restacks,
+        'word_count': word_count,
+        'reading_time': reading_time,
+        'total_engagement': likes + comments + shares + restacks
+    }
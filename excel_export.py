@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming Excel export using openpyxl's write-only workbook.
+
+Rows are appended one at a time and flushed to disk, so exporting a large
+archive keeps memory flat and posts can come straight from a generator.
+Column widths follow the same rule as SubstackDataCollector.export_to_excel
+(longest value + 2, capped at 50) but are measured while rows are buffered.
+A write-only sheet has to declare its widths before its first row, so only
+the first width_sample_rows rows are measured; sheets no longer than that
+get exactly the widths of the regular export.
+"""
+
+from datetime import datetime
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+MAX_COLUMN_WIDTH = 50
+WIDTH_SAMPLE_ROWS = 1000
+
+POSTS_HEADERS = ["Title", "Published Date", "Likes", "Comments", "Shares", "Restacks",
+                 "Word Count", "Reading Time (min)", "Total Engagement", "Link"]
+TOP_POSTS_HEADERS = ["Rank", "Title", "Total Engagement", "Likes", "Comments", "Shares", "Restacks",
+                     "Word Count", "Reading Time (min)", "Published Date"]
+
+
+class ColumnWidths:
+    """Running maximum of str(value) length per column."""
+
+    def __init__(self):
+        self.max_lengths: List[int] = []
+
+    def update(self, row: List) -> None:
+        lengths = self.max_lengths
+        for i, value in enumerate(row):
+            length = len(str(value))
+            if i == len(lengths):
+                lengths.append(length)
+            elif length > lengths[i]:
+                lengths[i] = length
+
+    def widths(self) -> List[int]:
+        return [min(length + 2, MAX_COLUMN_WIDTH) for length in self.max_lengths]
+
+
+def _styled_header(sheet, headers: List, center: bool) -> List[WriteOnlyCell]:
+    cells = []
+    for header in headers:
+        cell = WriteOnlyCell(sheet, value=header)
+        cell.font = Font(bold=True, color="FFFFFF")
+        cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        if center:
+            cell.alignment = Alignment(horizontal="center", vertical="center")
+        cells.append(cell)
+    return cells
+
+
+def write_sheet(workbook, title: str, headers: List, rows: Iterable[List], center_header: bool = False,
+                width_sample_rows: int = WIDTH_SAMPLE_ROWS) -> int:
+    """Append a styled header and rows to a new write-only sheet; returns the number of data rows."""
+    sheet = workbook.create_sheet(title)
+    rows = iter(rows)
+    sample = list(islice(rows, width_sample_rows))
+
+    widths = ColumnWidths()
+    widths.update(headers)
+    for row in sample:
+        widths.update(row)
+    for col_idx, width in enumerate(widths.widths(), 1):
+        sheet.column_dimensions[get_column_letter(col_idx)].width = width
+
+    sheet.append(_styled_header(sheet, headers, center_header))
+    count = 0
+    for row in chain(sample, rows):
+        sheet.append(row)
+        count += 1
+    return count
+
+
+def post_rows(posts: Iterable[Dict]) -> Iterator[List]:
+    """Rows of the "All Posts" sheet."""
+    for post in posts:
+        yield [post['title'], post['pub_date'], post['likes'], post['comments'], post['shares'],
+               post['restacks'], post['word_count'], post['reading_time'], post['total_engagement'],
+               post['link']]
+
+
+def top_post_rows(posts: Iterable[Dict]) -> Iterator[List]:
+    """Rows of the "Top Posts" sheet."""
+    for rank, post in enumerate(posts, 1):
+        yield [rank, post['title'], post['total_engagement'], post['likes'], post['comments'],
+               post['shares'], post['restacks'], post['word_count'], post['reading_time'], post['pub_date']]
+
+
+def export_analysis(analysis_data: Dict, filename: str, posts: Optional[Iterable[Dict]] = None,
+                    width_sample_rows: int = WIDTH_SAMPLE_ROWS) -> str:
+    """Write the four analytics sheets with a write-only workbook.
+
+    posts defaults to analysis_data['all_posts'] and may be any iterable,
+    including a generator of analyzed posts that is consumed once.
+    """
+    wb = openpyxl.Workbook(write_only=True)
+
+    pub = analysis_data['publication']
+    write_sheet(wb, "Publication Overview", ["Property", "Value"], [
+        ["Publication Name", pub['name']],
+        ["URL", pub['url']],
+        ["Subscriber Count", pub['subscriber_count'] or "Not publicly available (privacy setting)"],
+        ["Last Updated", pub['last_updated']],
+        ["Analysis Date", datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
+    ])
+
+    analytics = analysis_data['analytics']
+    write_sheet(wb, "Analytics Summary", ["Metric", "Value"], [
+        ["Posts Analyzed", analytics['total_posts_analyzed']],
+        ["Average Likes per Post", analytics['average_likes_per_post']],
+        ["Average Comments per Post", analytics['average_comments_per_post']],
+        ["Average Shares per Post", analytics['average_shares_per_post']],
+        ["Average Restacks per Post", analytics['average_restacks_per_post']],
+        ["Average Word Count", analytics['average_word_count']],
+        ["Average Reading Time (minutes)", analytics['average_reading_time']],
+        ["Publishing Frequency (posts/week)", analytics['publishing_frequency']],
+        ["Total Engagement", analytics['total_engagement']],
+    ])
+
+    if posts is None:
+        posts = analysis_data['all_posts']
+    write_sheet(wb, "All Posts", POSTS_HEADERS, post_rows(posts), center_header=True,
+                width_sample_rows=width_sample_rows)
+    write_sheet(wb, "Top Posts", TOP_POSTS_HEADERS, top_post_rows(analysis_data['top_posts']),
+                center_header=True)
+
+    wb.save(filename)
+    return filename
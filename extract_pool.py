@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Process pool for HTML parsing and extraction.
+
+With many concurrent downloads, BeautifulSoup parsing and the extractors
+hold the GIL and keep one core busy while the rest idle. An ExtractorPool
+moves that work into worker processes: download threads submit the raw
+response bytes and get back only the small result (an engagement dict, or
+a homepage's title and subscriber count), so soups never cross process
+boundaries. At most max_pending pages wait for a worker; further submits
+block the download thread until one finishes, which bounds memory when
+downloads outpace extraction.
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
+from engagement_extractor import extract_engagement
+from parser_backend import parse_html
+from subscriber_extractor import STRATEGIES, PageContext, SubscriberCountPipeline
+
+
+def _decode(content: bytes, encoding: Optional[str]) -> Union[str, bytes]:
+    # Without a declared charset the parser sniffs the bytes itself
+    return content.decode(encoding, errors='replace') if encoding else content
+
+
+def extract_post_engagement(content: bytes, encoding: Optional[str], parser_backend: str) -> Dict:
+    """Worker: engagement dict for a post page."""
+    return extract_engagement(parse_html(_decode(content, encoding), parser_backend))
+
+
+def extract_homepage(content: bytes, encoding: Optional[str], parser_backend: str, publication_name: str,
+                     strategy_order: List[str]) -> Tuple[Optional[str], Optional[int], Optional[str]]:
+    """Worker: (page title, subscriber count, winning strategy) for a homepage."""
+    html = content.decode(encoding or 'utf-8', errors='replace')
+    soup = parse_html(html, parser_backend)
+    title = soup.find('title')
+    builtin = dict(STRATEGIES)
+    pipeline = SubscriberCountPipeline([(name, builtin[name]) for name in strategy_order])
+    count, strategy = pipeline.extract(PageContext(publication_name, html, soup))
+    return (title.text if title else None), count, strategy
+
+
+class ExtractorPool:
+    """Worker processes for parsing and extraction, shared by collectors."""
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None, mp_context=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.max_workers
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=mp_context)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    def submit(self, func, *args) -> Future:
+        """Submit a worker call, waiting while max_pending calls are already queued or running."""
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def post_engagement(self, content: bytes, encoding: Optional[str], parser_backend: str) -> Future:
+        return self.submit(extract_post_engagement, content, encoding, parser_backend)
+
+    def homepage(self, content: bytes, encoding: Optional[str], parser_backend: str, publication_name: str,
+                 strategy_order: List[str]) -> Future:
+        return self.submit(extract_homepage, content, encoding, parser_backend, publication_name, strategy_order)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Feed change detection for batch refreshes.
+
+A publication's feed is summarized as a digest of its item links and
+pubDates. FeedDigestStore keeps the digest of the last analyzed feed
+together with the feed's ETag / Last-Modified validators, so a precheck
+costs one conditional GET (usually a 304) instead of a homepage scrape and
+a fetch of every post page.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def feed_digest(posts: List[Dict]) -> str:
+    """Digest of the feed items' links and pubDates; independent of item order."""
+    entries = sorted(f"{post.get('link', '')}\t{post.get('pub_date', '')}" for post in posts)
+    return hashlib.sha256('\n'.join(entries).encode('utf-8')).hexdigest()
+
+
+class FeedCheck:
+    """Outcome of a feed precheck.
+
+    posts holds the parsed feed when it was downloaded (None on a 304), so
+    the analysis that follows does not fetch the feed again.
+    """
+
+    def __init__(self, changed: bool, digest: Optional[str], posts: Optional[List[Dict]] = None,
+                 etag: Optional[str] = None, last_modified: Optional[str] = None,
+                 not_modified: bool = False):
+        self.changed = changed
+        self.digest = digest
+        self.posts = posts
+        self.etag = etag
+        self.last_modified = last_modified
+        self.not_modified = not_modified
+
+
+class FeedDigestStore:
+    """JSON file of the last analyzed feed digest and validators per publication."""
+
+    def __init__(self, path: str = 'feed_digests.json'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable feed digest store %s: %s", path, e)
+
+    @staticmethod
+    def _key(publication: str) -> str:
+        return publication.lower()
+
+    def get(self, publication: str) -> Optional[Dict]:
+        """Stored entry ('digest', 'etag', 'last_modified', 'post_count', 'checked_at'), or None."""
+        with self._lock:
+            entry = self._entries.get(self._key(publication))
+            return dict(entry) if entry else None
+
+    def conditional_headers(self, publication: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for the stored feed validators."""
+        entry = self.get(publication) or {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def record(self, publication: str, check: FeedCheck, checked_at: Optional[datetime] = None) -> None:
+        """Remember a check's digest and validators, keeping stored values a 304 did not resend."""
+        key = self._key(publication)
+        with self._lock:
+            entry = dict(self._entries.get(key, {}))
+            entry['digest'] = check.digest
+            if check.etag:
+                entry['etag'] = check.etag
+            if check.last_modified:
+                entry['last_modified'] = check.last_modified
+            if check.posts is not None:
+                entry['post_count'] = len(check.posts)
+            entry['checked_at'] = (checked_at or datetime.now()).isoformat(timespec='seconds')
+            self._entries[key] = entry
+
+    def forget(self, publication: str) -> None:
+        with self._lock:
+            self._entries.pop(self._key(publication), None)
+
+    def save(self) -> None:
+        """Write the store to disk atomically."""
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
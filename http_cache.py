@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent HTTP response cache for the Substack collector.
+
+Bodies are stored on disk keyed by URL together with their ETag /
+Last-Modified validators. Fresh entries (younger than the TTL for their
+resource type) are served without touching the network; stale ones are
+revalidated with a conditional GET and reused on 304 Not Modified.
+Streamed responses are written to the cache as the caller reads them, and
+only stored once the whole body has been read.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import requests
+from requests.utils import stream_decode_response_unicode
+from requests.structures import CaseInsensitiveDict
+
+# Seconds an entry is served without revalidation, per resource type
+DEFAULT_TTLS = {
+    'feed': 15 * 60,
+    'homepage': 60 * 60,
+    'post': 6 * 60 * 60,
+    'archive': 15 * 60,
+    'api': 24 * 60 * 60,
+}
+
+# Response headers worth keeping with a cached body
+_STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control')
+
+
+class HttpCache:
+    """Size-bounded, LRU-evicted on-disk cache of GET responses."""
+
+    def __init__(self, cache_dir: str = '.http_cache', max_bytes: int = 200 * 1024 * 1024,
+                 ttls: Optional[Dict[str, float]] = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._lock = threading.Lock()
+        # key -> [body size, last access time]; the access time doubles as the LRU order
+        self._index: Dict[str, list] = {}
+        self._total_bytes = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self) -> None:
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.body'):
+                continue
+            key = name[:-len('.body')]
+            body_path = os.path.join(self.cache_dir, name)
+            if not os.path.exists(self._meta_path(key)):
+                continue
+            stat = os.stat(body_path)
+            self._index[key] = [stat.st_size, stat.st_mtime]
+            self._total_bytes += stat.st_size
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.body")
+
+    def _read(self, key: str):
+        try:
+            with open(self._meta_path(key), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(self._body_path(key), 'rb') as f:
+                body = f.read()
+            return meta, body
+        except (OSError, ValueError):
+            return None
+
+    def _touch(self, key: str) -> None:
+        now = time.time()
+        if key in self._index:
+            self._index[key][1] = now
+        try:
+            os.utime(self._body_path(key), (now, now))
+        except OSError:
+            pass
+
+    def _remove(self, key: str) -> None:
+        size, _ = self._index.pop(key, (0, 0))
+        self._total_bytes -= size
+        for path in (self._meta_path(key), self._body_path(key)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _evict(self) -> None:
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key, _ in sorted(self._index.items(), key=lambda item: item[1][1]):
+            self._remove(key)
+            if self._total_bytes <= self.max_bytes:
+                break
+
+    @staticmethod
+    def _meta(url: str, response: requests.Response) -> Dict:
+        return {
+            'url': url,
+            'status_code': response.status_code,
+            'encoding': response.encoding,
+            'headers': {name: response.headers[name] for name in _STORED_HEADERS if name in response.headers},
+            'stored_at': time.time(),
+        }
+
+    def _temp_path(self) -> str:
+        fd, path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        return path
+
+    def _commit(self, key: str, meta: Dict, body_tmp: str, size: int) -> None:
+        """Move a fully written body into place and index it; the files are written outside the lock."""
+        meta_tmp = self._temp_path()
+        with open(meta_tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        with self._lock:
+            if key in self._index:
+                self._remove(key)
+            os.replace(body_tmp, self._body_path(key))
+            os.replace(meta_tmp, self._meta_path(key))
+            self._index[key] = [size, time.time()]
+            self._total_bytes += size
+            self._evict()
+
+    def _store(self, key: str, url: str, response: requests.Response) -> None:
+        body_tmp = self._temp_path()
+        with open(body_tmp, 'wb') as f:
+            f.write(response.content)
+        self._commit(key, self._meta(url, response), body_tmp, len(response.content))
+
+    def _tee(self, key: str, url: str, response: requests.Response) -> None:
+        """Store a streamed response as its body is read; a partly read body is discarded."""
+        meta = self._meta(url, response)
+        iter_content = response.iter_content
+
+        def read_chunks(chunk_size):
+            body_tmp = self._temp_path()
+            size = 0
+            complete = False
+            try:
+                with open(body_tmp, 'wb') as f:
+                    for chunk in iter_content(chunk_size):
+                        f.write(chunk)
+                        size += len(chunk)
+                        yield chunk
+                complete = True
+            finally:
+                if complete:
+                    self._commit(key, meta, body_tmp, size)
+                else:
+                    os.remove(body_tmp)
+
+        def teeing_iter_content(chunk_size=1, decode_unicode=False):
+            chunks = read_chunks(chunk_size)
+            return stream_decode_response_unicode(chunks, response) if decode_unicode else chunks
+
+        # response.content reads through iter_content too, so every way of reading the body is covered
+        response.iter_content = teeing_iter_content
+
+    def _revalidated(self, key: str, meta: Dict, response: requests.Response) -> None:
+        # A 304 may carry updated validators; keep the newest ones
+        for name in ('ETag', 'Last-Modified', 'Cache-Control'):
+            if name in response.headers:
+                meta['headers'][name] = response.headers[name]
+        meta['stored_at'] = time.time()
+        with open(self._meta_path(key), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        self._touch(key)
+
+    @staticmethod
+    def _build_response(url: str, meta: Dict, body: bytes) -> requests.Response:
+        """Rebuild a requests.Response from a cached entry."""
+        response = requests.Response()
+        response.status_code = meta.get('status_code', 200)
+        response.reason = 'OK'
+        response.url = url
+        response.headers = CaseInsensitiveDict(meta.get('headers', {}))
+        response.encoding = meta.get('encoding')
+        response._content = body
+        response._content_consumed = True
+        response.from_cache = True
+        return response
+
+    def fetch(self, url: str, resource_type: str,
+              send: Callable[[Dict[str, str]], requests.Response]) -> requests.Response:
+        """Return the response for url, going to the network via send(headers) only when needed."""
+        key = self._key(url)
+        ttl = self.ttls.get(resource_type, 0)
+
+        with self._lock:
+            indexed = key in self._index
+        cached = self._read(key) if indexed else None
+        if cached is not None:
+            meta, body = cached
+            if time.time() - meta.get('stored_at', 0) < ttl:
+                with self._lock:
+                    self._touch(key)
+                return self._build_response(url, meta, body)
+
+        headers = {}
+        if cached is not None:
+            meta, _ = cached
+            if 'ETag' in meta['headers']:
+                headers['If-None-Match'] = meta['headers']['ETag']
+            if 'Last-Modified' in meta['headers']:
+                headers['If-Modified-Since'] = meta['headers']['Last-Modified']
+
+        response = send(headers)
+
+        if response.status_code == 304 and cached is not None:
+            response.close()
+            meta, body = cached
+            with self._lock:
+                self._revalidated(key, meta, response)
+            return self._build_response(url, meta, body)
+        if response.status_code == 200:
+            # A stream=True response has not been read yet
+            if response._content is False:
+                self._tee(key, url, response)
+            else:
+                self._store(key, url, response)
+        return response
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
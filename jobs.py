@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+Background analysis jobs for the web dashboard.
+
+Analyses run on a bounded worker pool instead of inside the HTTP request.
+Each job reports progress (posts done / total) and the running aggregates
+of the posts analyzed so far while it runs, and identical in-flight
+requests for the same publication share one job. Every job also keeps a
+bounded event log (start, per-post results with running totals, final
+status) that live subscribers such as the dashboard's SSE endpoint follow.
+"""
+
+import threading
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from data_collector import SubstackDataCollector
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+# Events kept per job for live subscribers; older ones are dropped
+MAX_JOB_EVENTS = 1000
+
+
+class EventBuffer:
+    """Bounded, numbered event log written by one job and followed by any number of readers.
+
+    Appending never blocks: once max_events are buffered the oldest are
+    dropped, so a slow reader cannot hold up the analysis or grow memory.
+    A reader that falls that far behind is told how many events it missed.
+    """
+
+    def __init__(self, max_events: int = MAX_JOB_EVENTS):
+        self._events: deque = deque(maxlen=max(1, max_events))
+        self._next_id = 0
+        self._closed = False
+        self._changed = threading.Condition()
+
+    def append(self, kind: str, data: Dict) -> None:
+        with self._changed:
+            self._events.append((self._next_id, kind, data))
+            self._next_id += 1
+            self._changed.notify_all()
+
+    def close(self) -> None:
+        """Mark the log complete; readers stop once they have caught up."""
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+
+    def read(self, after: int = -1, timeout: Optional[float] = None) -> Tuple[List[Tuple[int, str, Dict]], int, bool]:
+        """Events numbered above after, waiting up to timeout for one to arrive.
+
+        Returns (events, missed, closed): missed counts events after `after`
+        that were already dropped; closed is True once the log is complete
+        and the reader has seen all of it.
+        """
+        with self._changed:
+            if self._next_id - 1 <= after and not self._closed:
+                self._changed.wait(timeout)
+            first_id = self._events[0][0] if self._events else self._next_id
+            missed = max(0, first_id - (after + 1))
+            events = [event for event in self._events if event[0] > after]
+            return events, missed, self._closed and not events
+
+
+
+class AnalysisJob:
+    """State of one background analysis."""
+
+    def __init__(self, publication_url: str, publication_key: str):
+        self.id = uuid.uuid4().hex
+        self.publication_url = publication_url
+        self.publication_key = publication_key
+        self.status = QUEUED
+        self.posts_done = 0
+        self.posts_total = None
+        # Aggregates of the posts analyzed so far (see iter_analysis)
+        self.running: Optional[Dict] = None
+        self.events = EventBuffer()
+        self.result: Optional[Dict] = None
+        self.excel_file: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def update_progress(self, done: int, total: int) -> None:
+        self.posts_done = done
+        self.posts_total = total
+
+    def to_dict(self, include_result: bool = False) -> Dict:
+        data = {
+            'job_id': self.id,
+            'publication_url': self.publication_url,
+            'status': self.status,
+            'progress': {'posts_done': self.posts_done, 'posts_total': self.posts_total},
+            'running': self.running,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error,
+        }
+        if include_result:
+            data['data'] = self.result
+            data['excel_file'] = self.excel_file
+        return data
+
+
+def run_analysis_job(collector: SubstackDataCollector, job: AnalysisJob) -> Tuple[Dict, Optional[str]]:
+    """Default job body: analyze the publication and export it to Excel."""
+    analysis = None
+    for event in collector.iter_analysis(progress_callback=job.update_progress):
+        if event['type'] == 'start':
+            job.events.append('start', {'publication': event['publication'], 'total_posts': event['total_posts']})
+        elif event['type'] == 'post':
+            job.running = event['running']
+            job.events.append('post', {key: event[key] for key in ('index', 'post', 'done', 'total_posts', 'running')})
+        else:
+            analysis = event['analysis']
+    if 'error' in analysis:
+        return analysis, None
+    return analysis, collector.export_to_excel(analysis)
+
+
+class JobManager:
+    """Run analyses on a bounded pool, deduplicating in-flight jobs per publication."""
+
+    def __init__(self, max_workers: int = 2, max_finished_jobs: int = 100,
+                 collector_factory: Callable[[str], SubstackDataCollector] = SubstackDataCollector,
+                 runner: Callable[[SubstackDataCollector, AnalysisJob], Tuple[Dict, Optional[str]]] = run_analysis_job,
+                 on_result: Optional[Callable[[SubstackDataCollector, Dict], None]] = None):
+        self.collector_factory = collector_factory
+        self.runner = runner
+        # Called with (collector, analysis) after each successful job
+        self.on_result = on_result
+        self.max_finished_jobs = max_finished_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis-job')
+        self._lock = threading.Lock()
+        self._jobs: 'OrderedDict[str, AnalysisJob]' = OrderedDict()
+        self._in_flight: Dict[str, AnalysisJob] = {}
+
+    def submit(self, publication_url: str) -> Tuple[AnalysisJob, bool]:
+        """Queue an analysis; returns (job, created), reusing an in-flight job for the same publication.
+
+        The collector is only built, on the worker, for a new job.
+        """
+        key = SubstackDataCollector.publication_key_for(publication_url)
+        with self._lock:
+            existing = self._in_flight.get(key)
+            if existing is not None:
+                return existing, False
+            job = AnalysisJob(publication_url, key)
+            self._jobs[job.id] = job
+            self._in_flight[key] = job
+            self._prune()
+        self._executor.submit(self._run, job)
+        return job, True
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: AnalysisJob) -> None:
+        job.status = RUNNING
+        job.started_at = datetime.now().isoformat()
+        job.events.append('status', job.to_dict())
+        try:
+            collector = self.collector_factory(job.publication_url)
+            result, excel_file = self.runner(collector, job)
+            if 'error' in result:
+                job.error = result['error']
+                job.status = FAILED
+            else:
+                job.result, job.excel_file = result, excel_file
+                if self.on_result is not None:
+                    self.on_result(collector, result)
+                job.status = DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = datetime.now().isoformat()
+            with self._lock:
+                if self._in_flight.get(job.publication_key) is job:
+                    del self._in_flight[job.publication_key]
+            # The final event has the summary, not the full analysis
+            final = job.to_dict()
+            if job.result is not None:
+                final['analytics'] = job.result.get('analytics')
+                final['excel_file'] = job.excel_file
+            job.events.append('status', final)
+            job.events.close()
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond max_finished_jobs (lock held)."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
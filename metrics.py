@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Phase timers and counters for the collector, with Prometheus text export.
+
+PhaseStats collects per-run timings (feed fetch, archive fetch, homepage
+fetch, subscriber API fetch, post fetch, parse, extraction, export) and
+counters. It is attached to each analysis result as analysis['stats'].
+Every observation is also forwarded to a process-wide MetricsRegistry,
+which renders Prometheus-style counters and histograms for the
+dashboard's /metrics endpoint.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+PHASES = ('feed_fetch', 'archive_fetch', 'homepage_fetch', 'api_fetch', 'post_fetch', 'parse', 'extraction',
+          'export')
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+
+class _Histogram:
+    __slots__ = ('counts', 'count', 'sum')
+
+    def __init__(self, size: int):
+        self.counts = [0] * (size + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms rendered in the Prometheus text format."""
+
+    def __init__(self, namespace: str = 'substack', buckets=DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+        self._help: Dict[str, str] = {}
+
+    def inc(self, name: str, value: float = 1, description: str = '', **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+            if description:
+                self._help.setdefault(name, description)
+
+    def observe(self, name: str, value: float, description: str = '', **labels) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(len(self.buckets))
+            histogram.counts[bisect_left(self.buckets, value)] += 1
+            histogram.count += 1
+            histogram.sum += value
+            if description:
+                self._help.setdefault(name, description)
+
+    def counter_value(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_labels(labels), 0)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                full = f'{self.namespace}_{name}'
+                lines.append(f'# HELP {full} {self._help.get(name, name)}')
+                lines.append(f'# TYPE {full} counter')
+                for labels, value in sorted(self._counters[name].items()):
+                    lines.append(f'{full}{_format_labels(labels)} {value:g}')
+            for name in sorted(self._histograms):
+                full = f'{self.namespace}_{name}'
+                lines.append(f'# HELP {full} {self._help.get(name, name)}')
+                lines.append(f'# TYPE {full} histogram')
+                for labels, histogram in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + (float('inf'),), histogram.counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else f'{bound:g}'
+                        lines.append(f'{full}_bucket{_format_labels(labels, ("le", le))} {cumulative}')
+                    lines.append(f'{full}_sum{_format_labels(labels)} {histogram.sum:.6f}')
+                    lines.append(f'{full}_count{_format_labels(labels)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+# Shared by every collector in the process; served by the dashboard's /metrics
+default_registry = MetricsRegistry()
+
+
+class PhaseStats:
+    """Per-run phase timings and counters, mirrored into a MetricsRegistry."""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = default_registry):
+        self.registry = registry
+        self._lock = threading.Lock()
+        # phase -> [count, total seconds, max seconds]
+        self._phases: Dict[str, list] = {}
+        self._counters: Dict[str, int] = {}
+
+    @contextmanager
+    def time(self, phase: str) -> Iterator[None]:
+        """Time the enclosed block as one occurrence of phase."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started)
+
+    def record(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._phases.setdefault(phase, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+        if self.registry is not None:
+            self.registry.observe('phase_seconds', seconds, description='Time spent per collector phase', phase=phase)
+
+    def count(self, name: str, value: int = 1, **labels) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+        if self.registry is not None:
+            self.registry.inc(f'{name}_total', value, **labels)
+
+    def merge(self, other: 'PhaseStats') -> None:
+        """Add another run's phases and counters (already mirrored into the registry)."""
+        with other._lock:
+            phases = {phase: list(entry) for phase, entry in other._phases.items()}
+            counters = dict(other._counters)
+        with self._lock:
+            for phase, (count, total, longest) in phases.items():
+                entry = self._phases.setdefault(phase, [0, 0.0, 0.0])
+                entry[0] += count
+                entry[1] += total
+                entry[2] = max(entry[2], longest)
+            for name, value in counters.items():
+                self._counters[name] = self._counters.get(name, 0) + value
+
+    def to_dict(self) -> Dict:
+        """JSON-friendly summary: per-phase count/total/mean/max seconds plus counters."""
+        with self._lock:
+            phases = {
+                phase: {
+                    'count': count,
+                    'total_seconds': round(total, 4),
+                    'mean_seconds': round(total / count, 4) if count else 0,
+                    'max_seconds': round(longest, 4),
+                }
+                for phase, (count, total, longest) in self._phases.items()
+            }
+            return {'phases': phases, 'counters': dict(self._counters)}
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+HTML/XML parser backend selection for BeautifulSoup.
+
+Every extractor in the collector uses the BeautifulSoup tree API, so the
+backends are bs4 tree builders: lxml's C parser is preferred and the pure
+Python html.parser is only used when lxml is not installed.
+"""
+
+from typing import Optional
+
+from bs4 import BeautifulSoup, FeatureNotFound
+from bs4.builder import builder_registry
+
+# In order of preference
+HTML_BACKENDS = ('lxml', 'html.parser')
+XML_BACKENDS = ('lxml-xml',)
+
+
+def _first_available(backends) -> Optional[str]:
+    for backend in backends:
+        if builder_registry.lookup(backend) is not None:
+            return backend
+    return None
+
+
+def html_backend(preferred: Optional[str] = None) -> str:
+    """Return the HTML backend to use, honouring preferred when it is installed."""
+    if preferred is not None:
+        if builder_registry.lookup(preferred) is None:
+            raise FeatureNotFound(f"HTML parser backend '{preferred}' is not installed")
+        return preferred
+    return _first_available(HTML_BACKENDS)
+
+
+def parse_html(markup, backend: Optional[str] = None) -> BeautifulSoup:
+    """Parse an HTML page with the fastest available (or the requested) backend."""
+    return BeautifulSoup(markup, html_backend(backend))
+
+
+def parse_xml(markup) -> BeautifulSoup:
+    """Parse an XML document (RSS feed); requires lxml."""
+    backend = _first_available(XML_BACKENDS)
+    if backend is None:
+        raise FeatureNotFound("XML parsing requires lxml (pip install lxml)")
+    return BeautifulSoup(markup, backend)
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar representation of analyzed posts.
+
+Each metric is stored as a compact array.array column, so aggregates,
+percentiles, top-N selection and per-month rollups run over flat numeric
+buffers instead of iterating merged post dicts. Columns from several
+publications can be concatenated for cross-publication statistics.
+"""
+
+import heapq
+import math
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+# Column name -> (post dict key, array typecode)
+METRIC_COLUMNS = {
+    'likes': ('likes_num', 'q'),
+    'comments': ('comments_num', 'q'),
+    'shares': ('shares_num', 'q'),
+    'restacks': ('restacks_num', 'q'),
+    'word_count': ('word_count', 'q'),
+    'reading_time': ('reading_time', 'd'),
+    'total_engagement': ('total_engagement', 'q'),
+}
+
+SUMMARY_PERCENTILES = (25, 50, 75, 90)
+
+_PUB_DATE_FORMAT = '%a, %d %b %Y %H:%M:%S %Z'
+
+
+def _timestamp(pub_date: str) -> float:
+    """RSS pubDate as a UTC epoch timestamp, or NaN if missing/unparseable."""
+    try:
+        parsed = datetime.strptime(pub_date, _PUB_DATE_FORMAT)
+    except (TypeError, ValueError):
+        return math.nan
+    return parsed.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _percentile_of_sorted(values: List, q: float) -> float:
+    """Linear-interpolated percentile (q in 0..100) of already sorted values."""
+    position = (len(values) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class PostColumns:
+    """Post metrics as parallel array columns, with the source posts kept for lookups."""
+
+    def __init__(self):
+        self.columns: Dict[str, array] = {name: array(code) for name, (_, code) in METRIC_COLUMNS.items()}
+        self.timestamps = array('d')
+        # Index into self.publications for every row
+        self.publication_ids = array('H')
+        self.publications: List[str] = []
+        self.posts: List[Dict] = []
+
+    @classmethod
+    def from_posts(cls, posts: Iterable[Dict], publication: str = '') -> 'PostColumns':
+        columns = cls()
+        columns.extend(posts, publication)
+        return columns
+
+    @classmethod
+    def concat(cls, parts: Iterable['PostColumns']) -> 'PostColumns':
+        """Combine several PostColumns (e.g. one per publication) into one."""
+        combined = cls()
+        for part in parts:
+            offset = {}
+            for i, name in enumerate(part.publications):
+                if name not in combined.publications:
+                    combined.publications.append(name)
+                offset[i] = combined.publications.index(name)
+            for name, column in part.columns.items():
+                combined.columns[name].extend(column)
+            combined.timestamps.extend(part.timestamps)
+            combined.publication_ids.extend(offset[i] for i in part.publication_ids)
+            combined.posts.extend(part.posts)
+        return combined
+
+    def __len__(self) -> int:
+        return len(self.posts)
+
+    def _publication_id(self, publication: str) -> int:
+        if publication not in self.publications:
+            self.publications.append(publication)
+        return self.publications.index(publication)
+
+    def extend(self, posts: Iterable[Dict], publication: str = '') -> None:
+        """Append analyzed posts (merged post + engagement dicts)."""
+        publication_id = self._publication_id(publication)
+        for post in posts:
+            for name, (key, _) in METRIC_COLUMNS.items():
+                self.columns[name].append(post[key])
+            self.timestamps.append(_timestamp(post.get('pub_date')))
+            self.publication_ids.append(publication_id)
+            self.posts.append(post)
+
+    def column(self, metric: str) -> array:
+        return self.columns[metric]
+
+    def total(self, metric: str):
+        return sum(self.columns[metric])
+
+    def mean(self, metric: str) -> float:
+        column = self.columns[metric]
+        return sum(column) / len(column) if column else 0
+
+    def percentile(self, metric: str, q: float) -> float:
+        column = self.columns[metric]
+        return _percentile_of_sorted(sorted(column), q) if column else 0
+
+    def median(self, metric: str) -> float:
+        return self.percentile(metric, 50)
+
+    def top_indices(self, metric: str, n: int) -> List[int]:
+        """Row indices of the n largest values, ties in row order (like a stable descending sort)."""
+        column = self.columns[metric]
+        return heapq.nlargest(n, range(len(column)), key=column.__getitem__)
+
+    def top_n(self, metric: str, n: int) -> List[Dict]:
+        """The n posts with the largest metric value, without sorting every post."""
+        return [self.posts[i] for i in self.top_indices(metric, n)]
+
+    def for_publication(self, publication: str) -> 'PostColumns':
+        """Rows belonging to one publication."""
+        subset = PostColumns()
+        if publication not in self.publications:
+            return subset
+        wanted = self.publications.index(publication)
+        subset.extend((post for post, pid in zip(self.posts, self.publication_ids) if pid == wanted), publication)
+        return subset
+
+    def summary(self, percentiles=SUMMARY_PERCENTILES) -> Dict[str, Dict]:
+        """Per-metric total, mean, min, max and percentiles (one sort per column)."""
+        stats = {}
+        for name, column in self.columns.items():
+            if not column:
+                stats[name] = {'total': 0, 'mean': 0, 'min': 0, 'max': 0, 'median': 0,
+                               **{f'p{q}': 0 for q in percentiles}}
+                continue
+            ordered = sorted(column)
+            total = sum(column)
+            stats[name] = {
+                'total': total,
+                'mean': round(total / len(column), 2),
+                'min': ordered[0],
+                'max': ordered[-1],
+                'median': _percentile_of_sorted(ordered, 50),
+                **{f'p{q}': round(_percentile_of_sorted(ordered, q), 2) for q in percentiles},
+            }
+        return stats
+
+    def monthly_rollup(self, metrics: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """Posts and metric totals per 'YYYY-MM' of publication date (undated posts are skipped)."""
+        metrics = list(metrics or ('likes', 'comments', 'shares', 'restacks', 'total_engagement', 'word_count'))
+        columns = [self.columns[name] for name in metrics]
+        months: Dict[str, Dict] = {}
+        month_of_day: Dict[int, str] = {}
+        for i, ts in enumerate(self.timestamps):
+            if ts != ts:  # NaN: no publication date
+                continue
+            day = int(ts // 86400)
+            month = month_of_day.get(day)
+            if month is None:
+                month = month_of_day[day] = datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m')
+            bucket = months.get(month)
+            if bucket is None:
+                bucket = months[month] = {'posts': 0, **{name: 0 for name in metrics}}
+            bucket['posts'] += 1
+            for name, column in zip(metrics, columns):
+                bucket[name] += column[i]
+        return {month: months[month] for month in sorted(months)}
+
+
+def columns_from_analyses(analyses: Dict[str, Dict]) -> PostColumns:
+    """Columns over the posts of several analyze_publication results, keyed by publication."""
+    combined = PostColumns()
+    for publication, analysis in analyses.items():
+        if 'error' not in analysis:
+            combined.extend(analysis['all_posts'], publication)
+    return combined
+
+
+class RunningTotals:
+    """Aggregates updated one analyzed post at a time, for streamed partial results.
+
+    Follows the final analytics: failed posts are counted but kept out of
+    the sums and averages.
+    """
+
+    def __init__(self):
+        self.posts_done = 0
+        self.posts_failed = 0
+        self.sums = dict.fromkeys(METRIC_COLUMNS, 0)
+
+    def add(self, post: Dict) -> None:
+        """Fold in one analyzed post (merged post + engagement dict)."""
+        self.posts_done += 1
+        if 'fetch_error' in post:
+            self.posts_failed += 1
+            return
+        for name, (key, _) in METRIC_COLUMNS.items():
+            self.sums[name] += post[key]
+
+    def to_dict(self) -> Dict:
+        analyzed = self.posts_done - self.posts_failed
+
+        def mean(metric: str) -> float:
+            return self.sums[metric] / analyzed if analyzed else 0
+
+        return {
+            'posts_done': self.posts_done,
+            'total_posts_analyzed': analyzed,
+            'posts_failed': self.posts_failed,
+            'average_likes_per_post': round(mean('likes'), 1),
+            'average_comments_per_post': round(mean('comments'), 1),
+            'average_shares_per_post': round(mean('shares'), 1),
+            'average_restacks_per_post': round(mean('restacks'), 1),
+            'average_word_count': round(mean('word_count'), 0),
+            'average_reading_time': round(mean('reading_time'), 1),
+            'total_engagement': sum(self.sums[name] for name in ('likes', 'comments', 'shares', 'restacks')),
+        }
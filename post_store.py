@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Local store of previously analyzed posts, used for incremental analysis.
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PostStore:
+    """JSON file of post engagement keyed by post link, with fetch timestamps."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._posts: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._posts = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable post store %s: %s", path, e)
+
+    def __contains__(self, link: str) -> bool:
+        return link in self._posts
+
+    def __len__(self) -> int:
+        return len(self._posts)
+
+    def get(self, link: str) -> Optional[Dict]:
+        """Return the stored engagement dict for a post, or None."""
+        entry = self._posts.get(link)
+        return dict(entry['engagement']) if entry else None
+
+    def fetched_at(self, link: str) -> Optional[datetime]:
+        """Return when the stored engagement for a post was fetched."""
+        entry = self._posts.get(link)
+        return datetime.fromisoformat(entry['fetched_at']) if entry else None
+
+    def put(self, link: str, engagement: Dict, fetched_at: Optional[datetime] = None) -> None:
+        """Record freshly fetched engagement for a post."""
+        with self._lock:
+            self._posts[link] = {
+                'engagement': engagement,
+                'fetched_at': (fetched_at or datetime.now()).isoformat(),
+            }
+
+    def save(self) -> None:
+        """Write the store to disk atomically."""
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._posts, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Per-host request throttling for the Substack collector.
+
+HostRateLimiter spaces requests at a fixed rate; AdaptiveRateLimiter is a
+token bucket per host that slows down on throttling and speeds back up
+while the server keeps answering quickly.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+class HostRateLimiter:
+    """Space out request starts to the same host, shared safely across threads."""
+
+    def __init__(self, requests_per_second: float = 1.0):
+        self.requests_per_second = requests_per_second
+        self._lock = threading.Lock()
+        self._next_slot: Dict[str, float] = {}
+
+    @staticmethod
+    def host_for(url: str) -> str:
+        """Return the host part of a URL (or the value itself if it is already a host)."""
+        return urlparse(url).netloc or url
+
+    def acquire(self, url: str) -> None:
+        """Block until a request to this URL's host is allowed to start."""
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    def reserve(self, url: str) -> float:
+        """Claim the next slot for this URL's host and return how long to wait for it.
+
+        Does not sleep, so asyncio callers can await the delay instead.
+        """
+        if not self.requests_per_second or self.requests_per_second <= 0:
+            return 0.0
+
+        host = self.host_for(url)
+        interval = 1.0 / self.requests_per_second
+
+        # Reserve the next free slot under the lock, then sleep outside it so
+        # other hosts (and later slots for this host) are not held up.
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + interval
+        return slot - now
+
+    def record(self, url: str, status_code: Optional[int] = None, latency: Optional[float] = None,
+               retry_after: Optional[float] = None) -> None:
+        """Report the outcome of a request; the fixed-rate limiter ignores it."""
+
+
+class _Bucket:
+    __slots__ = ('rate', 'tokens', 'updated')
+
+    def __init__(self, rate: float, tokens: float, updated: float):
+        self.rate = rate
+        self.tokens = tokens
+        self.updated = updated
+
+
+class AdaptiveRateLimiter(HostRateLimiter):
+    """Token bucket per host whose rate follows server feedback.
+
+    Each success adds increase_step requests/second up to the maximum rate
+    (additive increase). A 429/503, a failed connection or a response slower
+    than latency_target multiplies the rate by decrease_factor (multiplicative
+    decrease). Retry-After pauses the host for that long.
+    """
+
+    def __init__(self, requests_per_second: float = 1.0, max_requests_per_second: Optional[float] = None,
+                 min_requests_per_second: float = 0.05, burst: float = 1.0,
+                 increase_step: Optional[float] = None, decrease_factor: float = 0.5,
+                 latency_target: float = 5.0):
+        super().__init__(requests_per_second)
+        self.max_requests_per_second = max_requests_per_second or requests_per_second * 8
+        self.min_requests_per_second = min(min_requests_per_second, requests_per_second or min_requests_per_second)
+        self.burst = max(1.0, burst)
+        self.increase_step = increase_step if increase_step is not None else (requests_per_second or 0) / 10
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+        self._buckets: Dict[str, _Bucket] = {}
+
+    def _bucket(self, host: str, now: float) -> _Bucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = _Bucket(self.requests_per_second, self.burst, now)
+        return bucket
+
+    def rate_for(self, url: str) -> float:
+        """Current requests/second allowed for this URL's host."""
+        with self._lock:
+            bucket = self._buckets.get(self.host_for(url))
+            return bucket.rate if bucket else self.requests_per_second
+
+    def reserve(self, url: str) -> float:
+        """Take a token for this URL's host and return how long to wait for the bucket to refill."""
+        if not self.requests_per_second or self.requests_per_second <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._bucket(self.host_for(url), now)
+            # Refill (updated may lie in the future while the host is paused)
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            bucket.updated = now
+            # Tokens may go negative: that is the debt later callers queue behind
+            bucket.tokens -= 1
+            return -bucket.tokens / bucket.rate if bucket.tokens < 0 else 0.0
+
+    def record(self, url: str, status_code: Optional[int] = None, latency: Optional[float] = None,
+               retry_after: Optional[float] = None) -> None:
+        if not self.requests_per_second or self.requests_per_second <= 0:
+            return
+
+        throttled = status_code is None or status_code in (429, 503)
+        slow = latency is not None and latency > self.latency_target
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._bucket(self.host_for(url), now)
+            if throttled or slow:
+                bucket.rate = max(self.min_requests_per_second, bucket.rate * self.decrease_factor)
+            elif status_code < 400:
+                bucket.rate = min(self.max_requests_per_second, bucket.rate + self.increase_step)
+            if retry_after:
+                # Empty the bucket and start refilling only once the pause is over
+                bucket.tokens = min(bucket.tokens, 0)
+                bucket.updated = max(bucket.updated, now + retry_after)
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Local HTTP server that replays a route table, for the tests and benchmarks.
+
+It speaks keep-alive HTTP/1.1, gzips bodies when the client accepts it
+(like Substack does) and can add a fixed delay per request to emulate
+network latency. Every request is recorded, so tests can check what the
+collector sent. Unknown paths get a 404.
+"""
+
+import gzip
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+
+class ReplayResponse:
+    """A route's answer when it needs a status or headers; headers are sent as given."""
+
+    def __init__(self, body: Union[bytes, str] = b'', status: int = 200,
+                 content_type: str = 'text/html; charset=utf-8', headers: Optional[Dict[str, str]] = None):
+        self.body = body.encode('utf-8') if isinstance(body, str) else body
+        self.status = status
+        self.content_type = content_type
+        self.headers = headers or {}
+
+
+class ReplayRequest:
+    """A recorded request, as passed to callable routes."""
+
+    def __init__(self, handler: BaseHTTPRequestHandler):
+        url = urlsplit(handler.path)
+        self.path = url.path
+        self.query = parse_qs(url.query)
+        self.headers = handler.headers
+        self.client_address = handler.client_address
+        self.base_url = f"http://{handler.headers['Host']}"
+
+
+# A route answers with (content type, body), a bare body, a ReplayResponse,
+# or a callable taking the ReplayRequest and returning one of those
+Answer = Union[Tuple[str, bytes], bytes, str, ReplayResponse]
+Route = Union[Answer, Callable[[ReplayRequest], Answer]]
+Routes = Dict[str, Route]
+
+
+def _as_response(answer: Optional[Answer]) -> Optional[ReplayResponse]:
+    if answer is None or isinstance(answer, ReplayResponse):
+        return answer
+    if isinstance(answer, tuple):
+        content_type, body = answer
+        return ReplayResponse(body, content_type=content_type)
+    return ReplayResponse(answer)
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without TCP_NODELAY the
+    # client's delayed ACK adds ~40 ms to every keep-alive request
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        replay: 'ReplayServer' = self.server.replay
+        request = ReplayRequest(self)
+        replay._enter(request)
+        try:
+            if replay.latency:
+                time.sleep(replay.latency)
+            route = replay.routes.get(request.path, replay.routes.get('*'))
+            response = _as_response(route(request) if callable(route) else route)
+            if response is None:
+                self.send_error(404)
+                return
+            self._send(replay, response)
+        finally:
+            replay._leave()
+
+    def _send(self, replay: 'ReplayServer', response: ReplayResponse) -> None:
+        self.send_response(response.status)
+        body = response.body
+        has_body = response.status not in (204, 304)
+        if has_body:
+            self.send_header('Content-Type', response.content_type)
+            if ('Content-Encoding' not in response.headers
+                    and 'gzip' in self.headers.get('Accept-Encoding', '')):
+                body = replay._compressed(body)
+                self.send_header('Content-Encoding', 'gzip')
+        for name, value in response.headers.items():
+            self.send_header(name, value)
+        if has_body:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if has_body:
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ReplayServer:
+    """Serve routes on 127.0.0.1 from a background thread; use as a context manager.
+
+    routes maps a URL path (without the query string) to a Route; a '*'
+    route answers every other path. Requests are recorded in requests and
+    counted per path in hits; peak is the most requests ever handled at once.
+    """
+
+    def __init__(self, routes: Optional[Routes] = None, latency: float = 0.0, port: int = 0):
+        self.routes: Routes = dict(routes or {})
+        self.latency = latency
+        self.requests: List[ReplayRequest] = []
+        self.hits: Counter = Counter()
+        self.peak = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._gzipped: Dict[bytes, bytes] = {}
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), _ReplayHandler)
+        self._server.daemon_threads = True
+        self._server.replay = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def _enter(self, request: ReplayRequest) -> None:
+        with self._lock:
+            self.requests.append(request)
+            self.hits[request.path] += 1
+            self._in_flight += 1
+            self.peak = max(self.peak, self._in_flight)
+
+    def _leave(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _compressed(self, body: bytes) -> bytes:
+        # Bodies are shared between routes, so compress each one only once
+        with self._lock:
+            cached = self._gzipped.get(body)
+        if cached is None:
+            cached = gzip.compress(body, compresslevel=6)
+            with self._lock:
+                self._gzipped[body] = cached
+        return cached
+
+    def set_routes(self, routes: Routes) -> None:
+        with self._lock:
+            self.routes = routes
+            self._gzipped.clear()
+
+    def start(self) -> 'ReplayServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='replay-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite time series of engagement snapshots.
+
+Every analysis run records one row per post (likes, comments, shares,
+restacks, word count) and one row for the publication's subscriber count.
+All of a run's rows are inserted in a single transaction. The query helpers
+compute deltas and growth rates from stored snapshots, so the dashboard can
+show trends without touching the network.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+SNAPSHOT_METRICS = ('likes_num', 'comments_num', 'shares_num', 'restacks_num', 'word_count')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    publication TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    subscriber_count INTEGER,
+    posts_analyzed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_publication_time ON runs (publication, fetched_at);
+
+CREATE TABLE IF NOT EXISTS post_snapshots (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    publication TEXT NOT NULL,
+    link TEXT NOT NULL,
+    title TEXT,
+    fetched_at TEXT NOT NULL,
+    likes_num INTEGER NOT NULL,
+    comments_num INTEGER NOT NULL,
+    shares_num INTEGER NOT NULL,
+    restacks_num INTEGER NOT NULL,
+    word_count INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_post_snapshots_publication_link_time
+    ON post_snapshots (publication, link, fetched_at);
+CREATE INDEX IF NOT EXISTS idx_post_snapshots_publication_time ON post_snapshots (publication, fetched_at);
+"""
+
+
+def _timestamp(value: Optional[datetime]) -> str:
+    # Microseconds keep two runs in the same second from sharing a key
+    return (value or datetime.now()).isoformat(timespec='microseconds')
+
+
+def _days_between(start: str, end: str) -> float:
+    return (datetime.fromisoformat(end) - datetime.fromisoformat(start)).total_seconds() / 86400
+
+
+class SnapshotStore:
+    """Engagement snapshots per post and subscriber counts per run, in one SQLite file."""
+
+    def __init__(self, path: str = 'engagement_history.db'):
+        self.path = path
+        self._lock = threading.Lock()
+        # Shared by the dashboard's worker threads; access is serialized by _lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def record_analysis(self, analysis: Dict, publication: Optional[str] = None,
+                        fetched_at: Optional[datetime] = None,
+                        skip_links: Iterable[str] = ()) -> int:
+        """Store one snapshot per analyzed post plus the subscriber count; returns the run id.
+
+        Posts whose engagement fetch failed are skipped, so outages do not
+        show up as drops to zero, and so are skip_links (posts whose
+        engagement was reused from an earlier run rather than fetched now).
+        """
+        publication = (publication or analysis['publication']['name']).lower()
+        fetched_at = _timestamp(fetched_at)
+        # One row per link; a post listed twice keeps its last entry
+        skip_links = set(skip_links)
+        posts = {post['link']: post for post in analysis.get('all_posts', [])
+                 if 'fetch_error' not in post and post['link'] not in skip_links}
+        rows = [
+            (publication, link, post.get('title'), fetched_at, *(post[m] for m in SNAPSHOT_METRICS))
+            for link, post in posts.items()
+        ]
+        # A key collision raises and rolls back the whole run instead of
+        # overwriting an earlier run's snapshots
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (publication, fetched_at, subscriber_count, posts_analyzed) VALUES (?, ?, ?, ?)",
+                (publication, fetched_at, analysis['publication'].get('subscriber_count'), len(rows)))
+            run_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO post_snapshots (run_id, publication, link, title, fetched_at, "
+                "likes_num, comments_num, shares_num, restacks_num, word_count) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, *row) for row in rows])
+        return run_id
+
+    def _query(self, sql: str, params=()) -> List[Dict]:
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def runs(self, publication: str, since: Optional[datetime] = None) -> List[Dict]:
+        """Recorded runs for a publication, oldest first."""
+        return self._query(
+            "SELECT id, fetched_at, subscriber_count, posts_analyzed FROM runs "
+            "WHERE publication = ? AND fetched_at >= ? ORDER BY fetched_at, id",
+            (publication.lower(), _timestamp(since) if since else ''))
+
+    def post_history(self, publication: str, link: str) -> List[Dict]:
+        """Every snapshot of one post, oldest first."""
+        return self._query(
+            "SELECT fetched_at, " + ", ".join(SNAPSHOT_METRICS) + " FROM post_snapshots "
+            "WHERE publication = ? AND link = ? ORDER BY fetched_at",
+            (publication.lower(), link))
+
+    def post_deltas(self, publication: str, since: Optional[datetime] = None,
+                    limit: Optional[int] = None) -> List[Dict]:
+        """Per-post change between the first and latest snapshot since a time, biggest engagement gain first.
+
+        Each row has the post's link and title, the first/last fetch times,
+        '<metric>' (latest value) and '<metric>_delta' for every metric, and
+        'engagement_delta' / 'engagement_per_day' over likes, comments,
+        shares and restacks.
+        """
+        first = ", ".join(f"f.{m} AS first_{m}" for m in SNAPSHOT_METRICS)
+        last = ", ".join(f"l.{m} AS {m}" for m in SNAPSHOT_METRICS)
+        rows = self._query(
+            "WITH bounds AS ("
+            "  SELECT link, MIN(fetched_at) AS first_at, MAX(fetched_at) AS last_at FROM post_snapshots"
+            "  WHERE publication = ? AND fetched_at >= ? GROUP BY link) "
+            f"SELECT b.link, l.title, b.first_at, b.last_at, {first}, {last} FROM bounds b "
+            "JOIN post_snapshots f ON f.publication = ? AND f.link = b.link AND f.fetched_at = b.first_at "
+            "JOIN post_snapshots l ON l.publication = ? AND l.link = b.link AND l.fetched_at = b.last_at",
+            (publication.lower(), _timestamp(since) if since else '', publication.lower(), publication.lower()))
+
+        deltas = []
+        for row in rows:
+            delta = {'link': row['link'], 'title': row['title'],
+                     'first_fetched_at': row['first_at'], 'last_fetched_at': row['last_at']}
+            for metric in SNAPSHOT_METRICS:
+                delta[metric] = row[metric]
+                delta[f'{metric}_delta'] = row[metric] - row[f'first_{metric}']
+            delta['engagement_delta'] = sum(delta[f'{m}_delta'] for m in SNAPSHOT_METRICS[:4])
+            days = _days_between(row['first_at'], row['last_at'])
+            delta['engagement_per_day'] = round(delta['engagement_delta'] / days, 2) if days > 0 else 0
+            deltas.append(delta)
+        deltas.sort(key=lambda d: d['engagement_delta'], reverse=True)
+        return deltas[:limit] if limit is not None else deltas
+
+    def subscriber_growth(self, publication: str, since: Optional[datetime] = None) -> Dict:
+        """Subscriber counts over time with the change and growth rates between first and latest run."""
+        points = [{'fetched_at': run['fetched_at'], 'subscriber_count': run['subscriber_count']}
+                  for run in self.runs(publication, since) if run['subscriber_count'] is not None]
+        growth = {'points': points, 'delta': 0, 'growth_rate': 0, 'per_day': 0}
+        if len(points) > 1:
+            first, last = points[0], points[-1]
+            growth['delta'] = last['subscriber_count'] - first['subscriber_count']
+            if first['subscriber_count']:
+                growth['growth_rate'] = round(growth['delta'] / first['subscriber_count'], 4)
+            days = _days_between(first['fetched_at'], last['fetched_at'])
+            if days > 0:
+                growth['per_day'] = round(growth['delta'] / days, 2)
+        return growth
+
+    def engagement_totals(self, publication: str, since: Optional[datetime] = None) -> List[Dict]:
+        """Summed post metrics per run, oldest first, for engagement-over-time charts."""
+        sums = ", ".join(f"SUM(s.{m}) AS {m}" for m in SNAPSHOT_METRICS)
+        return self._query(
+            f"SELECT r.fetched_at, COUNT(s.link) AS posts, {sums} FROM runs r "
+            "LEFT JOIN post_snapshots s ON s.run_id = r.id "
+            "WHERE r.publication = ? AND r.fetched_at >= ? GROUP BY r.id ORDER BY r.fetched_at, r.id",
+            (publication.lower(), _timestamp(since) if since else ''))
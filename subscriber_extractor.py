@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+"""
+Subscriber-count extraction as an ordered pipeline of precompiled strategies.
+
+Each strategy mirrors one of the "methods" of the legacy extractor (kept
+in benchmarks/legacy_extraction.py). Strategies run in order
+and stop at the first hit; the embedded-JSON strategy scans the raw page
+HTML instead of re-serializing the soup. The pipeline remembers which
+strategy won for each publication and tries the most successful ones
+first next time.
+"""
+
+import json
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+# Counts outside (0, MAX_COUNT) are treated as false positives
+MAX_COUNT = 1000000
+
+_NUMBER_RE = re.compile(r'(\d+)')
+
+_TEXT_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(\d+)\s*subscribers?',
+    r'(\d+)\s*readers?',
+    r'(\d+)\s*members?',
+    r'(\d+)\s*people\s+subscribed',
+    r'(\d+)\s*subscribed',
+)]
+
+_CLASS_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    'subscriber-count', 'subscriberCount', 'subscribers',
+    'reader-count', 'readerCount', 'readers',
+    'member-count', 'memberCount', 'members',
+)]
+# Any element matching one of the class patterns; narrows the tree to one scan
+_ANY_CLASS_PATTERN = re.compile('|'.join(p.pattern for p in _CLASS_PATTERNS), re.IGNORECASE)
+
+_JS_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'subscriberCount["\']?\s*[:=]\s*(\d+)',
+    r'subscribers["\']?\s*[:=]\s*(\d+)',
+    r'readerCount["\']?\s*[:=]\s*(\d+)',
+    r'memberCount["\']?\s*[:=]\s*(\d+)',
+    r'"subscriber_count"\s*:\s*(\d+)',
+    r'"subscribers"\s*:\s*(\d+)',
+)]
+
+_META_KEYWORDS = ('subscriber', 'reader', 'member')
+
+_JSON_LD_KEYS = ('subscriberCount', 'subscribers', 'memberCount', 'readers', 'subscriber_count')
+
+_UI_SELECTORS = (
+    '[data-testid*="subscriber"]',
+    '[data-testid*="reader"]',
+    '[data-testid*="member"]',
+    '.subscriber-count',
+    '.reader-count',
+    '.member-count',
+)
+
+# JSON keys in priority order: bare numbers first, then quoted numbers
+_JSON_COUNT_KEYS = ('subscriber_count', 'subscribers', 'total_subscribers', 'subscriberCount')
+_JSON_COUNT_PATTERNS = (
+    [re.compile(rf'"{key}":\s*(\d+)', re.IGNORECASE) for key in _JSON_COUNT_KEYS]
+    + [re.compile(rf'"{key}":\s*"(\d+)"', re.IGNORECASE) for key in _JSON_COUNT_KEYS]
+)
+_PUBLICATION_OBJECT_RE = re.compile(r'"publication":\s*{', re.IGNORECASE)
+
+
+def _in_range(count: int) -> bool:
+    return 0 < count < MAX_COUNT
+
+
+def _first_in_range(pattern, text: str) -> Optional[int]:
+    for match in pattern.finditer(text):
+        count = int(match.group(1))
+        if _in_range(count):
+            return count
+    return None
+
+
+class PageContext:
+    """A fetched publication page, with the derived views strategies need computed once."""
+
+    def __init__(self, publication_name: str, html: str, soup: BeautifulSoup):
+        self.publication_name = publication_name
+        self.html = html
+        self.soup = soup
+        self._text = None
+        self._subdomain_re = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.soup.get_text()
+        return self._text
+
+    @property
+    def subdomain_re(self):
+        if self._subdomain_re is None:
+            self._subdomain_re = re.compile(
+                rf'"subdomain":\s*"{re.escape(self.publication_name)}"', re.IGNORECASE)
+        return self._subdomain_re
+
+
+def text_pattern(page: PageContext) -> Optional[int]:
+    """Method 1: "<n> subscribers"-style phrases in the page text."""
+    for pattern in _TEXT_PATTERNS:
+        count = _first_in_range(pattern, page.text)
+        if count:
+            return count
+    return None
+
+
+def data_attribute(page: PageContext) -> Optional[int]:
+    """Method 2: data-subscriber-count attributes."""
+    for element in page.soup.find_all(attrs={'data-subscriber-count': True}):
+        try:
+            count = int(element.get('data-subscriber-count'))
+            if count > 0:
+                return count
+        except (ValueError, TypeError):
+            continue
+    return None
+
+
+def _class_matches(pattern, classes) -> bool:
+    if isinstance(classes, str):
+        return bool(pattern.search(classes))
+    return any(pattern.search(value) for value in classes) or bool(pattern.search(' '.join(classes)))
+
+
+def css_class(page: PageContext) -> Optional[int]:
+    """Method 3: elements whose class looks like a subscriber/reader/member count."""
+    candidates = page.soup.find_all(class_=_ANY_CLASS_PATTERN)
+    if not candidates:
+        return None
+    numbers = {}
+    for pattern in _CLASS_PATTERNS:
+        for element in candidates:
+            if not _class_matches(pattern, element.get('class', [])):
+                continue
+            if id(element) not in numbers:
+                match = _NUMBER_RE.search(element.get_text())
+                numbers[id(element)] = int(match.group(1)) if match else None
+            count = numbers[id(element)]
+            if count is not None and _in_range(count):
+                return count
+    return None
+
+
+def script_variable(page: PageContext) -> Optional[int]:
+    """Method 4: subscriber counts assigned in inline JavaScript."""
+    for script in page.soup.find_all('script'):
+        if not script.string:
+            continue
+        for pattern in _JS_PATTERNS:
+            count = _first_in_range(pattern, script.string)
+            if count:
+                return count
+    return None
+
+
+def meta_tag(page: PageContext) -> Optional[int]:
+    """Method 5: <meta> tags named after subscribers, readers or members."""
+    for meta in page.soup.find_all('meta'):
+        name = meta.get('name', '').lower()
+        property_attr = meta.get('property', '').lower()
+        if any(keyword in name or keyword in property_attr for keyword in _META_KEYWORDS):
+            match = _NUMBER_RE.search(meta.get('content', ''))
+            if match and _in_range(int(match.group(1))):
+                return int(match.group(1))
+    return None
+
+
+def json_ld(page: PageContext) -> Optional[int]:
+    """Method 6: JSON-LD structured data."""
+    for script in page.soup.find_all('script', type='application/ld+json'):
+        try:
+            data = json.loads(script.string)
+        except (json.JSONDecodeError, TypeError):
+            continue
+        if not isinstance(data, dict):
+            continue
+        for key in _JSON_LD_KEYS:
+            if key in data and isinstance(data[key], (int, str)):
+                try:
+                    count = int(data[key])
+                except ValueError:
+                    continue
+                if _in_range(count):
+                    return count
+    return None
+
+
+def ui_selector(page: PageContext) -> Optional[int]:
+    """Method 7: Substack UI elements for subscriber counts."""
+    for selector in _UI_SELECTORS:
+        for element in page.soup.select(selector):
+            match = _NUMBER_RE.search(element.get_text())
+            if match and _in_range(int(match.group(1))):
+                return int(match.group(1))
+    return None
+
+
+def _publication_objects(html: str):
+    """Yield (start, end) of each "publication": {...} object, ending at its first closing brace."""
+    # Occurrences come in order, so the next closing brace only moves forward
+    brace = -1
+    for match in _PUBLICATION_OBJECT_RE.finditer(html):
+        if brace < match.end():
+            brace = html.find('}', match.end())
+            if brace == -1:
+                brace = len(html)
+        yield match.end(), brace
+
+
+def embedded_json(page: PageContext) -> Optional[int]:
+    """Method 8: subscriber counts in JSON embedded in the raw HTML.
+
+    Instead of [^}]* regexes that rescan the page from every "publication"
+    key, each pattern is matched once over the page and its hits are
+    assigned to publication objects by position.
+    """
+    html = page.html
+    subdomains = [(m.start(), m.end()) for m in page.subdomain_re.finditer(html)]
+    scoped = []
+    if subdomains:
+        subdomain_starts = [start for start, _ in subdomains]
+        for start, end in _publication_objects(html):
+            i = bisect_left(subdomain_starts, start)
+            if i < len(subdomains) and subdomains[i][0] < end:
+                # Counts must come after this object's first matching subdomain
+                scoped.append((subdomains[i][1], end))
+
+    for pattern in _JSON_COUNT_PATTERNS if scoped else ():
+        hits = [(m.start(), int(m.group(1))) for m in pattern.finditer(html)]
+        hit_starts = [start for start, _ in hits]
+        for after, end in scoped:
+            # The legacy pattern's greedy [^}]* picked the last count in the object
+            j = bisect_left(hit_starts, end) - 1
+            if j >= 0 and hit_starts[j] >= after and _in_range(hits[j][1]):
+                return hits[j][1]
+
+    for pattern in _JSON_COUNT_PATTERNS:
+        count = _first_in_range(pattern, html)
+        if count:
+            return count
+    return None
+
+
+# Default order, matching the legacy method numbering
+STRATEGIES: List[Tuple[str, Callable[[PageContext], Optional[int]]]] = [
+    ('text_pattern', text_pattern),
+    ('data_attribute', data_attribute),
+    ('css_class', css_class),
+    ('script_variable', script_variable),
+    ('meta_tag', meta_tag),
+    ('json_ld', json_ld),
+    ('ui_selector', ui_selector),
+    ('embedded_json', embedded_json),
+]
+
+
+class SubscriberCountPipeline:
+    """Run strategies in order, stop at the first hit and learn which ones win per publication.
+
+    Wins are keyed by the collector's publication_key (its host), so custom
+    domains sharing a first label keep their own orderings.
+    """
+
+    def __init__(self, strategies=None):
+        self.strategies = list(strategies or STRATEGIES)
+        self._lock = threading.Lock()
+        self.wins: Dict[str, Counter] = {}
+
+    def ordered_strategies(self, publication_key: str) -> List[Tuple[str, Callable]]:
+        """Strategies for this publication, previous winners first (ties keep the default order)."""
+        with self._lock:
+            wins = self.wins.get(publication_key, Counter())
+        return sorted(self.strategies, key=lambda strategy: -wins[strategy[0]])
+
+    def portable_order(self, publication_key: str) -> Optional[List[str]]:
+        """Strategy names in try order, or None if a custom strategy cannot be looked up by name.
+
+        Extractor worker processes rebuild the pipeline from these names.
+        """
+        builtin = dict(STRATEGIES)
+        ordered = self.ordered_strategies(publication_key)
+        if any(builtin.get(name) is not strategy for name, strategy in ordered):
+            return None
+        return [name for name, _ in ordered]
+
+    def record_win(self, publication_key: str, name: str) -> None:
+        with self._lock:
+            self.wins.setdefault(publication_key, Counter())[name] += 1
+
+    def extract(self, page: PageContext, publication_key: Optional[str] = None) -> Tuple[Optional[int], Optional[str]]:
+        """Return (subscriber_count, winning strategy name), or (None, None).
+
+        The win is recorded under publication_key, or the page's
+        publication_name when none is given.
+        """
+        publication_key = publication_key or page.publication_name
+        for name, strategy in self.ordered_strategies(publication_key):
+            count = strategy(page)
+            if count:
+                self.record_win(publication_key, name)
+                return count, name
+        return None, None
+
+
+# Shared by every collector in the process so winners carry over between runs
+default_pipeline = SubscriberCountPipeline()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the stored-analysis cache used by the dashboard (no network access).
+"""
+
+import threading
+import time
+
+import pytest
+
+from analysis_store import AnalysisCache, AnalysisStore
+
+
+class _Analyzer:
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, publication_name):
+        self.release.wait(5)
+        self.calls.append(publication_name)
+        return {'publication': {'name': publication_name}, 'run': len(self.calls)}
+
+
+def test_miss_analyzes_once_then_serves_from_memory_and_disk(tmp_path):
+    analyzer = _Analyzer()
+    cache = AnalysisCache(analyzer, store=AnalysisStore(str(tmp_path)), ttl_seconds=60)
+
+    assert cache.get('LedgerLines')['run'] == 1
+    assert cache.get('ledgerlines')['run'] == 1
+    assert analyzer.calls == ['ledgerlines']
+
+    # A new process picks the stored analysis up without scraping
+    restarted = AnalysisCache(analyzer, store=AnalysisStore(str(tmp_path)), ttl_seconds=60)
+    assert restarted.get('ledgerlines')['run'] == 1
+    assert analyzer.calls == ['ledgerlines']
+
+
+def test_concurrent_misses_share_one_analysis(tmp_path):
+    analyzer = _Analyzer()
+    analyzer.release.clear()
+    cache = AnalysisCache(analyzer, store=AnalysisStore(str(tmp_path)), ttl_seconds=60)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get('ledgerlines'))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+
+    analyzer.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert analyzer.calls == ['ledgerlines']
+    assert [result['run'] for result in results] == [1] * 5
+
+
+def test_stale_entry_is_served_while_one_refresh_runs_in_background(tmp_path):
+    analyzer = _Analyzer()
+    cache = AnalysisCache(analyzer, store=AnalysisStore(str(tmp_path)), ttl_seconds=0.05)
+    cache.get('ledgerlines')
+    time.sleep(0.1)
+
+    analyzer.release.clear()
+    started = time.perf_counter()
+    assert cache.get('ledgerlines')['run'] == 1
+    assert cache.get('ledgerlines')['run'] == 1
+    assert time.perf_counter() - started < 0.5
+    assert not cache.refresh_in_background('ledgerlines')
+
+    analyzer.release.set()
+    cache.shutdown(wait=True)
+    assert len(analyzer.calls) == 2
+    assert AnalysisStore(str(tmp_path)).load('ledgerlines')[0]['run'] == 2
+
+
+def test_errors_are_not_cached(tmp_path):
+    cache = AnalysisCache(lambda name: {'error': 'No posts found'}, store=AnalysisStore(str(tmp_path)))
+
+    assert cache.get('empty') == {'error': 'No posts found'}
+    assert AnalysisStore(str(tmp_path)).load('empty') is None
+
+
+def test_store_reads_analyses_saved_in_the_other_format(tmp_path):
+    pytest.importorskip('pyarrow')
+    analysis = {'publication': {'name': 'ledgerlines'}, 'all_posts': [], 'run': 1}
+    AnalysisStore(str(tmp_path), file_format='json').save('ledgerlines', analysis)
+
+    store = AnalysisStore(str(tmp_path))
+    assert store.file_format == 'arrow'
+    assert store.load('ledgerlines')[0]['run'] == 1
+    store.save('ledgerlines', {**analysis, 'run': 2})
+    # The Arrow file written by the migrated store wins over the old JSON one
+    assert (tmp_path / 'ledgerlines.arrow').exists()
+    assert AnalysisStore(str(tmp_path)).load('ledgerlines')[0]['run'] == 2
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the JSON archive enumeration engine against the local replay server.
+"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from archive_api import archive_engagement, archive_post, archive_values
+from data_collector import SubstackDataCollector
+from replay_server import ReplayResponse
+
+POST = b"""<html><body><button data-testid="like-button"><span>12</span></button>
+<article><p>Five words in this post.</p></article></body></html>"""
+
+
+def _items(base, count):
+    items = []
+    for i in range(count):
+        item = {
+            'title': f"Post {i}", 'slug': f"post-{i}", 'canonical_url': f"{base}/p/post-{i}",
+            'subtitle': f"About {i}", 'post_date': f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}T10:00:00.000Z",
+            'publishedBylines': [{'name': "Author"}],
+            'reaction_count': i, 'comment_count': i % 5, 'restacks': 1, 'wordcount': 400 + i,
+        }
+        # Every tenth item lacks its word count, as paywalled posts can
+        if i % 10 == 0:
+            del item['wordcount']
+        items.append(item)
+    return items
+
+
+def _archive(request):
+    offset, limit = int(request.query['offset'][0]), int(request.query['limit'][0])
+    return ReplayResponse(json.dumps(_items(request.base_url, 120)[offset:offset + limit]),
+                          content_type='application/json')
+
+
+def _feed(request):
+    items = ''.join(f"<item><title>Post {i}</title><link>{request.base_url}/p/post-{i}</link>"
+                    f"<pubDate>Mon, 01 Jan 2024 10:00:00 GMT</pubDate></item>" for i in range(3))
+    return ReplayResponse(f'<rss><channel>{items}</channel></rss>', content_type='application/rss+xml')
+
+
+@pytest.fixture
+def archive_server(replay_server):
+    replay_server.routes = {
+        '/api/v1/archive': _archive,
+        '/feed': _feed,
+        '/': b'<html><body>1,234 subscribers</body></html>',
+        '*': lambda request: POST if request.path.startswith('/p/') else None,
+    }
+    return replay_server
+
+
+def _pages(server):
+    """(offset, limit) of every archive page requested."""
+    return [(int(request.query['offset'][0]), int(request.query['limit'][0]))
+            for request in server.requests if request.path == '/api/v1/archive']
+
+
+def test_archive_item_conversion():
+    item = {'title': "T", 'slug': "t", 'post_date': "2024-03-05T08:30:00.000Z",
+            'reactions': {'❤': 4}, 'comment_count': 2, 'restacks': 0}
+    assert archive_post(item, "https://x.substack.com") == {
+        'title': "T", 'link': "https://x.substack.com/p/t", 'description': "",
+        'pub_date': "Tue, 05 Mar 2024 08:30:00 GMT", 'author': "",
+    }
+    values = archive_values(item)
+    assert values == {'likes': 4, 'comments': 2, 'restacks': 0, 'word_count': None}
+
+    scraped = {'likes': "9", 'shares': "3", 'word_count': 1000}
+    engagement = archive_engagement(values, scraped)
+    # JSON counts win; only the missing word count (and shares) come from the page
+    assert engagement['likes'] == "4" and engagement['shares'] == "3"
+    assert engagement['word_count'] == 1000 and engagement['reading_time'] == 5
+    assert 'fetch_error' in archive_engagement(values, {'fetch_error': "boom"})
+
+
+def test_archive_pages_in_batches_and_scrapes_only_missing_fields(archive_server):
+    collector = SubstackDataCollector(archive_server.url, requests_per_second=0, max_workers=4, metrics_registry=None)
+    progress = []
+    analysis = collector.analyze_publication(source='archive', progress_callback=lambda d, t: progress.append((d, t)))
+
+    assert _pages(archive_server) == [(0, 50), (50, 50), (100, 50)]
+    # Only the 12 items without a word count needed their post page
+    assert sum(count for path, count in archive_server.hits.items() if path.startswith('/p/')) == 12
+    assert archive_server.hits['/feed'] == 0
+
+    posts = analysis['all_posts']
+    assert analysis['analytics']['total_posts_analyzed'] == 120
+    assert [post['title'] for post in posts[:2]] == ["Post 0", "Post 1"]
+    assert posts[1]['likes_num'] == 1 and posts[1]['word_count'] == 401 and posts[1]['shares'] == "-"
+    # Missing word count scraped from the page; likes still from the JSON
+    assert posts[10]['likes_num'] == 10 and posts[10]['word_count'] == 5
+    assert analysis['stats']['counters']['archive_fallbacks'] == 12
+    assert progress == [(done, 120) for done in range(1, 121)]
+
+
+def test_archive_limit_stops_paging(archive_server):
+    collector = SubstackDataCollector(archive_server.url, requests_per_second=0, metrics_registry=None)
+    assert len(collector.fetch_archive(limit=60)) == 60
+    assert _pages(archive_server) == [(0, 50), (50, 10)]
+
+
+def test_archive_pages_are_fetched_on_the_shared_executor(archive_server):
+    threads = set()
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix='shared-fetch') as executor:
+        collector = SubstackDataCollector(archive_server.url, requests_per_second=0, metrics_registry=None,
+                                          executor=executor)
+        get = collector._get
+
+        def recording_get(url, **kwargs):
+            if '/api/v1/archive' in url:
+                threads.add(threading.current_thread().name)
+            return get(url, **kwargs)
+        collector._get = recording_get
+        analysis = collector.analyze_publication(limit=60, source='archive')
+
+    assert analysis['analytics']['total_posts_analyzed'] == 60
+    assert threads and all(name.startswith('shared-fetch') for name in threads)
+
+
+def test_missing_archive_falls_back_to_rss(archive_server):
+    del archive_server.routes['/api/v1/archive']
+    collector = SubstackDataCollector(archive_server.url, requests_per_second=0, metrics_registry=None)
+    collector.retry_policy.max_retries = 0
+    analysis = collector.analyze_publication(source='archive')
+
+    assert analysis['analytics']['total_posts_analyzed'] == 3
+    assert archive_server.hits['/feed'] == 1
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the Arrow/Parquet analysis format.
+"""
+
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+
+import arrow_store
+from analysis_store import AnalysisStore
+from data_collector import SubstackDataCollector
+
+
+def _analysis(count):
+    posts = [{'title': f"Post {i}", 'link': f"https://ledgerlines.substack.com/p/{i}", 'description': "d",
+              'pub_date': "Mon, 01 Jan 2024 00:00:00 GMT", 'author': "A", 'likes': str(i), 'comments': "-",
+              'shares': "-", 'restacks': "-", 'likes_num': i, 'comments_num': 0, 'shares_num': 0,
+              'restacks_num': 0, 'word_count': 10 * i, 'reading_time': i // 20, 'total_engagement': i,
+              'engagement_rate': 0}
+             for i in range(count)]
+    posts[3]['fetch_error'] = "timed out"
+    return {
+        'publication': {'name': "ledgerlines", 'url': "https://ledgerlines.substack.com",
+                        'subscriber_count': 309, 'last_updated': "2024-01-01T00:00:00"},
+        'analytics': {'total_posts_analyzed': count, 'total_engagement': sum(range(count))},
+        'top_posts': sorted(posts, key=lambda p: p['total_engagement'], reverse=True)[:5],
+        'all_posts': posts,
+        'statistics': {'monthly': {'2024-01': {'posts': count}}},
+    }
+
+
+@pytest.mark.parametrize('parquet', [False, True])
+def test_export_round_trips_the_analysis(tmp_path, parquet):
+    analysis = _analysis(50)
+    collector = SubstackDataCollector("ledgerlines")
+    path = collector.export_to_arrow(analysis, str(tmp_path / ("a.parquet" if parquet else "a.arrow")))
+
+    assert arrow_store.read_analysis(path) == analysis
+
+
+def test_arrow_files_are_memory_mapped_without_copying(tmp_path):
+    path = arrow_store.write_analysis(_analysis(5000), str(tmp_path / "big.arrow"))
+
+    before = pa.total_allocated_bytes()
+    table = arrow_store.read_posts_table(path)
+    assert table.num_rows == 5000
+    assert pa.total_allocated_bytes() == before
+    assert arrow_store.read_metadata(table)['publication']['subscriber_count'] == 309
+
+
+def test_analysis_store_uses_arrow_files(tmp_path):
+    store = AnalysisStore(str(tmp_path))
+    analysis = _analysis(8)
+    store.save("LedgerLines", analysis)
+
+    assert store.file_format == 'arrow'
+    assert (tmp_path / "ledgerlines.arrow").exists()
+    loaded, _ = store.load("ledgerlines")
+    assert loaded == analysis
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the asyncio collector against the local replay server.
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip('httpx')
+
+from async_collector import AsyncSubstackCollector, analyze_publications
+from data_collector import SubstackDataCollector
+from replay_server import ReplayResponse
+from retry_policy import RetryPolicy
+from subscriber_extractor import SubscriberCountPipeline
+from transport import Transport
+
+
+def _throttled_once(body):
+    """Route answering 503 with Retry-After: 0 the first time, then body."""
+    calls = []
+
+    def route(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return ReplayResponse(b'busy', 503, 'text/plain', {'Retry-After': '0'})
+        return body
+    return route
+
+
+@pytest.fixture
+def site(fixture_site):
+    return fixture_site(extra_posts=8)
+
+
+def _counting(init, calls):
+    def counted(self, *args, **kwargs):
+        calls.append(self)
+        init(self, *args, **kwargs)
+    return counted
+
+
+def test_async_analysis_matches_the_sync_collector(site, comparable):
+    expected = SubstackDataCollector(site, requests_per_second=0, max_workers=4, metrics_registry=None,
+                                     retry_policy=RetryPolicy(max_retries=0),
+                                     subscriber_pipeline=SubscriberCountPipeline()).analyze_publication()
+
+    async def run():
+        progress = []
+        async with AsyncSubstackCollector(site, requests_per_second=0, metrics_registry=None,
+                                          retry_policy=RetryPolicy(max_retries=0),
+                                          subscriber_pipeline=SubscriberCountPipeline()) as collector:
+            analysis = await collector.analyze_publication(
+                progress_callback=lambda done, total: progress.append(done))
+        return analysis, progress
+
+    actual, progress = asyncio.run(run())
+    assert comparable(actual) == comparable(expected)
+    assert actual['publication']['subscriber_count'] is not None
+    assert 'fetch_error' in actual['all_posts'][3]
+    assert sorted(progress) == list(range(1, 13))
+    assert actual['stats']['phases']['post_fetch']['count'] == 12
+
+
+def test_semaphore_bounds_requests_in_flight(site, replay_server):
+    replay_server.latency = 0.05
+
+    async def run():
+        async with AsyncSubstackCollector(site, max_concurrency=3, requests_per_second=0,
+                                          metrics_registry=None, retry_policy=RetryPolicy(max_retries=0)) as collector:
+            return await collector.analyze_publication()
+
+    analysis = asyncio.run(run())
+    assert analysis['analytics']['total_posts_analyzed'] == 11
+    assert 1 < replay_server.peak <= 3
+
+
+def test_throttled_request_is_retried(site, replay_server):
+    replay_server.routes['/p/long'] = _throttled_once(replay_server.routes['/p/long'])
+
+    async def run():
+        async with AsyncSubstackCollector(site, requests_per_second=0, metrics_registry=None,
+                                          retry_policy=RetryPolicy(max_retries=2, backoff_base=0)) as collector:
+            engagement = await collector.get_post_engagement(f"{site}/p/long")
+            return engagement, collector.stats.to_dict()
+
+    engagement, stats = asyncio.run(run())
+    assert 'fetch_error' not in engagement
+    assert stats['counters']['http_retries'] == 1
+
+
+def test_many_publications_share_one_loop(site, monkeypatch):
+    transports = []
+    monkeypatch.setattr(Transport, '__init__', _counting(Transport.__init__, transports))
+
+    async def run():
+        return [item async for item in analyze_publications([site, site], max_concurrency=4, limit=2,
+                                                            requests_per_second=0, metrics_registry=None)]
+
+    results = asyncio.run(run())
+    assert [publication for publication, _ in results] == [site, site]
+    # The wrapped sync collectors never open a session per publication
+    assert len(transports) <= 1
+    assert all(analysis['analytics']['total_posts_analyzed'] == 2 for _, analysis in results)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for batch analysis over a shared fetch pool (no network access).
+"""
+
+import threading
+import time
+
+from batch_analyzer import BatchAnalyzer, analyze_publications
+from data_collector import SubstackDataCollector
+from feed_digest import FeedCheck, FeedDigestStore
+
+
+class _Tracker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+
+    def __enter__(self):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.in_flight -= 1
+
+
+def _fake_collector_factory(tracker, post_counts, delay=0.01):
+    class FakeCollector(SubstackDataCollector):
+        def get_publication_info(self):
+            with tracker:
+                time.sleep(delay)
+            return {'name': self.publication_name, 'url': self.base_url,
+                    'subscriber_count': None, 'last_updated': "2024-01-01T00:00:00"}
+
+        def fetch_posts(self, limit=None):
+            with tracker:
+                time.sleep(delay)
+            return [{'title': f"{self.publication_name} {i}", 'link': f"{self.base_url}/p/{i}",
+                     'description': "", 'pub_date': "", 'author': ""}
+                    for i in range(post_counts[self.publication_name])][:limit]
+
+        def get_post_engagement(self, post_url):
+            with tracker:
+                time.sleep(delay)
+            return {'likes': "1", 'comments': "-", 'shares': "-", 'restacks': "-",
+                    'likes_num': 1, 'comments_num': 0, 'shares_num': 0, 'restacks_num': 0,
+                    'word_count': 10, 'reading_time': 1, 'total_engagement': 1}
+
+    return FakeCollector
+
+
+def test_results_stream_in_completion_order_under_a_global_cap():
+    tracker = _Tracker()
+    post_counts = {'slow': 60, 'fast1': 2, 'fast2': 2, 'fast3': 2}
+    factory = _fake_collector_factory(tracker, post_counts)
+
+    with BatchAnalyzer(max_concurrency=4, per_publication_workers=2, requests_per_second=0,
+                       collector_factory=factory) as batch:
+        results = list(batch.analyze(['slow', 'fast1', 'fast2', 'fast3']))
+
+    names = [name for name, _ in results]
+    assert names[-1] == 'slow'
+    assert sorted(names) == sorted(post_counts)
+    assert tracker.peak <= 4
+    for name, analysis in results:
+        assert analysis['analytics']['total_posts_analyzed'] == post_counts[name]
+        assert [p['link'] for p in analysis['all_posts']] == [
+            f"https://{name}.substack.com/p/{i}" for i in range(post_counts[name])]
+
+
+def test_failures_are_reported_per_publication():
+    tracker = _Tracker()
+    factory = _fake_collector_factory(tracker, {'ok': 1})
+
+    results = dict(analyze_publications(['ok', 'missing'], max_concurrency=2, requests_per_second=0,
+                                        collector_factory=factory))
+
+    assert results['ok']['analytics']['total_posts_analyzed'] == 1
+    assert 'error' in results['missing']
+
+
+def test_refresh_prechecks_and_homepage_fetches_run_on_the_fetch_pool(tmp_path):
+    threads = []
+    fake_collector = _fake_collector_factory(_Tracker(), {'pub': 2})
+
+    class PrecheckingCollector(fake_collector):
+        def check_feed(self, digest_store):
+            threads.append(threading.current_thread().name)
+            return FeedCheck(True, "digest", self.fetch_posts())
+
+        def get_publication_info(self):
+            threads.append(threading.current_thread().name)
+            return super().get_publication_info()
+
+    with BatchAnalyzer(max_concurrency=2, requests_per_second=0, collector_factory=PrecheckingCollector) as batch:
+        results = list(batch.refresh(['pub'], FeedDigestStore(str(tmp_path / "digests.json"))))
+
+    assert results[0][1]['refresh']['mode'] == 'full'
+    assert len(threads) == 2
+    assert all(name.startswith('substack-fetch') for name in threads)
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Smoke tests for the offline benchmark suite (smallest tier, one repeat).
+"""
+
+import json
+import os
+import sys
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+
+from corpus import build_routes
+from replay_server import ReplayResponse, ReplayServer
+from run_benchmarks import compare, run_suite
+
+
+def test_replay_server_serves_corpus_with_gzip():
+    with ReplayServer() as server:
+        server.set_routes(build_routes('small', server.url))
+        response = requests.get(f"{server.url}/feed", headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.text.count('<item>') == 10
+        assert f"{server.url}/p/" in response.text
+        assert requests.get(f"{server.url}/missing").status_code == 404
+        assert len(server.requests) == 2
+
+
+def test_replay_server_answers_callable_routes_and_records_requests(replay_server):
+    replay_server.routes = {
+        '/echo': lambda request: ('text/plain', request.query['q'][0].encode()),
+        '/gone': ReplayResponse(status=304, headers={'ETag': '"v1"'}),
+    }
+    assert requests.get(f"{replay_server.url}/echo?q=hi").text == "hi"
+    gone = requests.get(f"{replay_server.url}/gone")
+    assert (gone.status_code, gone.headers['ETag']) == (304, '"v1"')
+    assert [request.path for request in replay_server.requests] == ['/echo', '/gone']
+    assert replay_server.hits['/echo'] == 1 and replay_server.peak == 1
+
+
+def test_suite_produces_comparable_json_results():
+    report = json.loads(json.dumps(run_suite(tiers=('small',), repeat=1, workers=2)))
+
+    names = {result['name'] for result in report['results']}
+    assert names == {'get_post_engagement', '_extract_subscriber_count', 'fetch_posts',
+                     'analyze_publication', 'export_to_excel'}
+    analysis = next(r for r in report['results'] if r['name'] == 'analyze_publication')
+    assert analysis['items'] == 10
+    assert analysis['latency_seconds']['median'] > 0
+    assert 'post_fetch' in analysis['phases']
+
+    assert compare(report, report) == []
+    slower = json.loads(json.dumps(report))
+    for result in slower['results']:
+        result['latency_seconds']['median'] *= 2
+    assert len(compare(slower, report, tolerance=0.5)) == len(report['results'])
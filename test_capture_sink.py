@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the opt-in page capture sink.
+"""
+
+import gzip
+import os
+import random
+import threading
+
+from capture_sink import CaptureSink
+from data_collector import SubstackDataCollector
+
+
+def test_collector_writes_no_debug_files_by_default(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    collector = SubstackDataCollector("ledgerlines", requests_per_second=0)
+    page = "<html><head><title>Ledger Lines</title></head><body>309 subscribers</body></html>"
+
+    class _Response:
+        text = page
+
+        def raise_for_status(self):
+            pass
+
+    collector._get = lambda url, resource_type=None, **kwargs: _Response()
+    assert collector.get_publication_info()['subscriber_count'] == 309
+    assert os.listdir(tmp_path) == []
+
+
+def test_sampled_captures_are_compressed_and_bounded(tmp_path):
+    page = "<html>" + "<p>paragraph</p>" * 2000 + "</html>"
+    probe = CaptureSink(str(tmp_path / "probe"), sample_rate=1)
+    probe.capture('post', "probe", page)
+    probe.close()
+    size = probe.total_bytes
+
+    budget = size * 5 + 100
+    sink = CaptureSink(str(tmp_path / "ring"), sample_rate=0.5, max_bytes=budget, rng=random.Random(1))
+    sampled = [sink.capture('post', f"post-{i}", page + str(i)) for i in range(40)]
+    sink.close()
+
+    files = sorted(os.listdir(tmp_path / "ring"))
+    assert 0 < sum(sampled) < 40
+    assert len(files) == 5 and sink.total_bytes <= budget
+    # The newest captures survive eviction
+    newest = max(i for i, kept in enumerate(sampled) if kept)
+    assert files[-1].endswith(f"_post_post-{newest}.html.gz")
+    with gzip.open(tmp_path / "ring" / files[-1], 'rt', encoding='utf-8') as f:
+        assert f.read() == page + str(newest)
+
+
+def test_disabled_sink_captures_nothing(tmp_path):
+    sink = CaptureSink(str(tmp_path), sample_rate=0)
+    assert not sink.capture('homepage', "x", "<html></html>")
+    sink.close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_restarted_writer_counts_existing_files_once(tmp_path):
+    sink = CaptureSink(str(tmp_path), sample_rate=1)
+    sink.capture('post', "first", "<html>one</html>")
+    sink.close()
+    sink.capture('post', "second", "<html>two</html>")
+    sink.close()
+
+    on_disk = sum(os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path))
+    assert len(os.listdir(tmp_path)) == 2
+    assert sink.total_bytes == on_disk
+
+
+def test_unusable_directory_does_not_hang_flush_or_close(tmp_path):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    sink = CaptureSink(str(blocker), sample_rate=1, max_pending=1)
+    sink.capture('post', "x", "<html></html>")
+
+    closer = threading.Thread(target=lambda: (sink.flush(), sink.close()), daemon=True)
+    closer.start()
+    closer.join(5)
+    assert not closer.is_alive()
+    assert sink.captured == 0
@@ -1,41 +1,70 @@
 # -*- coding: utf-8 -*-
 """
-Test script for the web dashboard
+Offline tests for the web dashboard's API endpoints, through Flask's test client.
 """
 
-import requests
-import time
-import subprocess
-import sys
-import os
-
-def test_dashboard():
-    """Test if the dashboard is working."""
-    print("Testing Substack Analytics Web Dashboard...")
-    print("=" * 50)
-    
-    # Wait a moment for the server to start
-    print("Waiting for server to start...")
-    time.sleep(3)
-    
-    try:
-        # Test the main page
-        response = requests.get('http://localhost:5000', timeout=10)
-        if response.status_code == 200:
-            print("✅ Dashboard is running successfully!")
-            print("🌐 Open your browser and go to: http://localhost:5000")
-            print("📊 You can now analyze any Substack publication visually!")
-            return True
-        else:
-            print(f"❌ Dashboard returned status code: {response.status_code}")
-            return False
-    except requests.exceptions.ConnectionError:
-        print("❌ Could not connect to dashboard. Make sure it's running.")
-        print("💡 Try running: python web_dashboard.py")
-        return False
-    except Exception as e:
-        print(f"❌ Error testing dashboard: {e}")
-        return False
-
-if __name__ == "__main__":
-    test_dashboard()
+import importlib
+
+import pytest
+
+from analysis_store import AnalysisCache
+from snapshot_store import SnapshotStore
+
+
+def _analysis(name):
+    return {'publication': {'name': name, 'subscriber_count': 100},
+            'all_posts': [{'title': "Post", 'link': f"https://{name}/p/post", 'likes_num': 5, 'comments_num': 1,
+                           'shares_num': 0, 'restacks_num': 0, 'word_count': 500}],
+            'analytics': {'total_posts_analyzed': 1}}
+
+
+@pytest.fixture
+def analyzed():
+    """Publication keys the dashboard ran a fresh analysis for."""
+    return []
+
+
+@pytest.fixture
+def dashboard(monkeypatch, tmp_path, analyzed):
+    web_dashboard = importlib.import_module('web_dashboard')
+
+    def analyze(key):
+        analyzed.append(key)
+        return {'error': "No posts found"} if key.startswith('empty') else _analysis(key)
+
+    monkeypatch.setattr(web_dashboard, 'analysis_cache', AnalysisCache(analyze))
+    monkeypatch.setattr(web_dashboard, 'snapshot_store', SnapshotStore(str(tmp_path / "history.db")))
+    yield web_dashboard
+    web_dashboard.analysis_cache.shutdown()
+
+
+def test_analytics_are_served_from_the_analysis_cache(dashboard, analyzed):
+    client = dashboard.app.test_client()
+
+    for _ in range(2):
+        response = client.get('/api/analytics/ledgerlines').get_json()
+        assert response['success'] and response['data']['analytics']['total_posts_analyzed'] == 1
+    # Custom domains are looked up by host
+    assert client.get('/api/analytics/www.foo.com').get_json()['success']
+    assert analyzed == ['ledgerlines.substack.com', 'www.foo.com']
+
+    assert client.get('/api/analytics/empty').get_json() == {'success': False, 'error': "No posts found"}
+
+
+def test_history_comes_from_stored_snapshots(dashboard, analyzed):
+    dashboard.snapshot_store.record_analysis(_analysis('ledgerlines.substack.com'), 'ledgerlines.substack.com')
+    response = dashboard.app.test_client().get('/api/history/ledgerlines?days=7').get_json()
+
+    assert response['success']
+    assert [p['subscriber_count'] for p in response['data']['subscriber_growth']['points']] == [100]
+    assert response['data']['engagement_totals'][0]['likes_num'] == 5
+    assert analyzed == []
+
+
+def test_job_endpoints_reject_bad_requests(dashboard):
+    client = dashboard.app.test_client()
+
+    assert client.post('/api/run_analysis', json={}).get_json() == {
+        'success': False, 'error': 'Publication URL is required'}
+    assert client.get('/api/jobs/unknown').status_code == 404
+    assert client.get('/api/jobs/unknown/result').status_code == 404
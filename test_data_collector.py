@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+Offline tests for SubstackDataCollector (no network access).
+"""
+
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from data_collector import SubstackDataCollector
+from post_store import PostStore
+from rate_limiter import HostRateLimiter
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def _fake_posts(count):
+    return [
+        {
+            'title': f"Post {i}",
+            'link': f"https://example.substack.com/p/post-{i}",
+            'description': "",
+            'pub_date': f"Mon, {1 + i % 28:02d} Jan 2024 10:00:00 GMT",
+            'author': "",
+        }
+        for i in range(count)
+    ]
+
+
+def _fake_engagement(post_url):
+    index = int(post_url.rsplit('-', 1)[1])
+    # Finish out of order when run concurrently
+    time.sleep(random.uniform(0, 0.01))
+    likes, comments = index * 3, index % 7
+    return {
+        'likes': str(likes), 'comments': str(comments), 'shares': "-", 'restacks': "1",
+        'likes_num': likes, 'comments_num': comments, 'shares_num': 0, 'restacks_num': 1,
+        'word_count': 100 * index, 'reading_time': max(1, index // 2),
+        'total_engagement': likes + comments + 1,
+    }
+
+
+def _offline_collector(publication_input="example", **kwargs):
+    collector = SubstackDataCollector(publication_input, requests_per_second=0, **kwargs)
+    posts = _fake_posts(25)
+    collector.fetch_posts = lambda limit=None: posts[:limit] if limit else posts
+    collector.get_publication_info = lambda: {
+        'name': "Example", 'url': collector.base_url,
+        'subscriber_count': None, 'last_updated': "2024-01-01T00:00:00",
+    }
+    collector.get_post_engagement = _fake_engagement
+    return collector
+
+
+def _without_stats(analysis):
+    """Analysis minus its run timings, which differ between otherwise identical runs."""
+    return {key: value for key, value in analysis.items() if key != 'stats'}
+
+
+def test_concurrent_analysis_matches_serial():
+    serial = _offline_collector().analyze_publication()
+    concurrent = _offline_collector(max_workers=8).analyze_publication()
+
+    assert [p['link'] for p in concurrent['all_posts']] == [p['link'] for p in serial['all_posts']]
+    assert _without_stats(concurrent) == _without_stats(serial)
+
+
+def test_max_workers_override_per_run():
+    collector = _offline_collector()
+    assert (_without_stats(collector.analyze_publication(limit=5, max_workers=4))
+            == _without_stats(collector.analyze_publication(limit=5)))
+
+
+def test_rate_limiter_spaces_requests_per_host():
+    limiter = HostRateLimiter(requests_per_second=50)
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.acquire("https://a.substack.com/p/x")
+    # Another host is not held up by the first one's schedule
+    before_other = time.monotonic()
+    limiter.acquire("https://b.substack.com/p/y")
+
+    assert before_other - start >= 4 / 50 - 0.005
+    assert time.monotonic() - before_other < 0.01
+
+
+def test_publication_key_tells_custom_domains_apart():
+    foo, bar = SubstackDataCollector("https://www.foo.com"), SubstackDataCollector("https://www.bar.com/feed")
+    assert foo.publication_name == bar.publication_name == "www"
+    assert (foo.publication_key, bar.publication_key) == ("www.foo.com", "www.bar.com")
+    assert SubstackDataCollector.publication_key_for("Example") == "example.substack.com"
+
+
+def test_incremental_analysis_reuses_stored_posts(tmp_path):
+    store_path = str(tmp_path / "store.json")
+    fetched = []
+
+    def counting_engagement(post_url):
+        fetched.append(post_url)
+        return _fake_engagement(post_url)
+
+    first = _offline_collector(post_store=PostStore(store_path))
+    first.get_post_engagement = counting_engagement
+    full = first.analyze_publication(incremental=True, freshness_days=7)
+    assert len(fetched) == 25
+
+    # All fake posts are from 2024, so a new run only needs the store
+    fetched.clear()
+    second = _offline_collector(post_store=PostStore(store_path))
+    second.get_post_engagement = counting_engagement
+    assert _without_stats(second.analyze_publication(incremental=True, freshness_days=7)) == _without_stats(full)
+    assert fetched == []
+
+    # Posts inside the freshness window are always refetched
+    fetched.clear()
+    third = _offline_collector(post_store=PostStore(store_path))
+    third.get_post_engagement = counting_engagement
+    third.analyze_publication(incremental=True, freshness_days=365 * 100)
+    assert len(fetched) == 25
+
+
+def test_incremental_analysis_refetches_long_stored_posts(tmp_path):
+    store = PostStore(str(tmp_path / "store.json"))
+    fetched = []
+    collector = _offline_collector(post_store=store)
+    collector.get_post_engagement = lambda post_url: fetched.append(post_url) or _fake_engagement(post_url)
+    posts = collector.fetch_posts()
+    for post in posts:
+        store.put(post['link'], _fake_engagement(post['link']), datetime.now() - timedelta(days=40))
+    store.put(posts[0]['link'], _fake_engagement(posts[0]['link']))
+
+    progress = []
+    collector.analyze_publication(incremental=True, refetch_after_days=None,
+                                  progress_callback=lambda done, total: progress.append((done, total)))
+    assert fetched == []
+    # Reused posts advance the progress callback like fetched ones
+    assert progress == [(done, 25) for done in range(1, 26)]
+    # Only the entry fetched today is young enough to reuse
+    collector.analyze_publication(incremental=True)
+    assert sorted(fetched) == sorted(post['link'] for post in posts[1:])
+
+
+def _bs4_rss_reference(rss_content):
+    from parser_backend import parse_xml
+    soup = parse_xml(rss_content)
+    return [
+        {
+            "title": item.find("title").text if item.find("title") else "",
+            "link": item.find("link").text if item.find("link") else "",
+            "description": item.find("description").text if item.find("description") else "",
+            "pub_date": item.find("pubDate").text if item.find("pubDate") else "",
+            "author": item.find("author").text if item.find("author") else "",
+        }
+        for item in soup.find_all("item")
+    ]
+
+
+class _ChunkedResponse:
+    """Stands in for a streamed requests.Response and records how much was read."""
+
+    def __init__(self, body, chunk_size):
+        self.chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+        self.chunks_read = 0
+        self.closed = False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=None):
+        for chunk in self.chunks:
+            self.chunks_read += 1
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+def test_streaming_rss_parser_matches_bs4_xml():
+    pytest.importorskip('lxml')
+    feeds = [
+        open(os.path.join(FIXTURES, 'feed.xml'), encoding='utf-8').read(),
+        '<rss xmlns:atom="http://www.w3.org/2005/Atom" xmlns:a="urn:x"><channel>'
+        '<item><atom:link href="x">AL</atom:link><title>T<b>x</b>y</title><link>L</link>'
+        '<a:author>NS</a:author><pubDate> P </pubDate></item>'
+        '<item><author>A</author><Title>case</Title></item></channel></rss>',
+    ]
+    collector = SubstackDataCollector("example")
+    for feed in feeds:
+        assert collector._parse_rss_feed(feed) == _bs4_rss_reference(feed)
+
+
+def test_iter_posts_stops_reading_once_limit_is_reached():
+    items = ''.join(
+        f'<item><title>Post {i}</title><link>https://example.substack.com/p/{i}</link>'
+        f'<pubDate>Mon, 01 Jan 2024 10:00:00 GMT</pubDate></item>'
+        for i in range(2000)
+    )
+    body = f'<?xml version="1.0" encoding="UTF-8"?><rss><channel>{items}</channel></rss>'.encode('utf-8')
+    response = _ChunkedResponse(body, 4096)
+    collector = SubstackDataCollector("example", requests_per_second=0)
+    collector._get = lambda url, **kwargs: response
+
+    posts = collector.fetch_posts(limit=10)
+
+    assert [post['title'] for post in posts] == [f'Post {i}' for i in range(10)]
+    assert response.closed
+    assert response.chunks_read < len(response.chunks) / 10
+
+
+def test_iter_analysis_streams_posts_with_running_totals():
+    collector = _offline_collector(max_workers=4)
+    events = list(collector.iter_analysis(limit=10))
+
+    assert events[0] == {'type': 'start', 'publication': events[0]['publication'], 'total_posts': 10}
+    post_events = [event for event in events if event['type'] == 'post']
+    assert sorted(event['index'] for event in post_events) == list(range(10))
+    assert [event['done'] for event in post_events] == list(range(1, 11))
+    assert post_events[0]['running']['posts_done'] == 1
+
+    # The running totals end where the final analytics do
+    analysis = events[-1]['analysis']
+    final = post_events[-1]['running']
+    assert events[-1]['type'] == 'complete'
+    for key in ('total_posts_analyzed', 'posts_failed', 'average_likes_per_post',
+                'average_word_count', 'total_engagement'):
+        assert final[key] == analysis['analytics'][key]
+    assert _without_stats(analysis) == _without_stats(_offline_collector().analyze_publication(limit=10))
+
+
+def test_stopped_incremental_stream_keeps_fetched_posts(tmp_path):
+    store_path = str(tmp_path / "store.json")
+    stream = _offline_collector(post_store=PostStore(store_path)).iter_analysis(incremental=True)
+    for event in stream:
+        if event['type'] == 'post' and event['done'] == 5:
+            break
+    stream.close()
+
+    assert len(PostStore(store_path)) == 5
+
+
+def test_default_post_store_is_per_publication_host(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _offline_collector("https://www.foo.com").analyze_publication(limit=3, incremental=True)
+
+    assert len(PostStore(str(tmp_path / "post_store_www.foo.com.json"))) == 3
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Parity tests: the single-pass extractor must agree with the legacy extractors.
+"""
+
+import os
+import random
+import sys
+
+import pytest
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+
+from engagement_extractor import extract_engagement
+from legacy_extraction import extract_engagement_legacy
+
+FRAGMENTS = [
+    '<button data-testid="like-button"><span>{n}</span></button>',
+    '<button data-testid="comment-button">{n}</button>',
+    '<a class="post-ufi-button like-button">{n}</a>',
+    '<div class="pencraft liked-state">Liked by {n}</div>',
+    '<button aria-label="like this post">{n}</button>',
+    '<button title="restack it">{n} restacks</button>',
+    '<button aria-label="repost">{n}</button>',
+    '<span class="share-count">share {n}</span>',
+    '<div class="comments-section"><p>{n} Comments</p></div>',
+    '<p>{n} likes and {n} replies</p>',
+    '<p>Over {n} hearts, {n} favorites, {n} retweets</p>',
+    '<p>{n} re-shares and {n} reposts</p>',
+    '<p>{n}\nSHARES</p>',
+    '<script>var likes = "{n} likes";</script>',
+    '<style>.like-button::after {{ content: "{n} likes" }}</style>',
+    '<!-- {n} comments -->',
+    '<template class="like-button">{n}</template>',
+    '<button class="restack-button"><svg></svg></button>',
+    '<p>No numbers here, just words about liking and sharing.</p>',
+]
+
+
+def _random_page(rng):
+    body = []
+    for _ in range(rng.randint(1, 25)):
+        fragment = rng.choice(FRAGMENTS)
+        body.append(fragment.replace('{n}', str(rng.choice([0, 1, 7, 42, 99, 101, 500, 1000, 1001, 12345]))))
+    article = ' '.join(rng.choice(['word', 'another', '17 likes', 'text']) for _ in range(rng.randint(0, 400)))
+    wrapper = rng.choice([
+        '<article><h1>Title</h1><div class="body markup post-content">{a}</div></article>',
+        '<div class="available-content"><article>{a}</article></div>',
+        '<div>{a}</div>',
+    ])
+    rng.shuffle(body)
+    middle = rng.randint(0, len(body))
+    return ('<html><head><title>Post</title></head><body>'
+            + ''.join(body[:middle]) + wrapper.replace('{a}', article) + ''.join(body[middle:])
+            + '</body></html>')
+
+
+@pytest.mark.parametrize('parser', ['html.parser', 'lxml'])
+def test_single_pass_matches_legacy_extractors(parser):
+    if parser == 'lxml':
+        pytest.importorskip('lxml')
+    rng = random.Random(1234)
+    for _ in range(300):
+        soup = BeautifulSoup(_random_page(rng), parser)
+        assert extract_engagement(soup) == extract_engagement_legacy(soup)
+
+
+def test_empty_page_has_no_engagement():
+    result = extract_engagement(BeautifulSoup('<html><body></body></html>', 'html.parser'))
+    assert result['likes'] == result['comments'] == result['shares'] == result['restacks'] == "-"
+    assert result['word_count'] == 0
+    assert result['total_engagement'] == 0
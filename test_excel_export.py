@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the write-only streaming Excel export.
+"""
+
+import openpyxl
+
+from data_collector import SubstackDataCollector
+
+
+def _post(i):
+    return {'title': f"Post number {i}" + " long" * (i % 7), 'link': f"https://ledgerlines.substack.com/p/{i}",
+            'description': "", 'pub_date': "Mon, 01 Jan 2024 00:00:00 GMT", 'author': "",
+            'likes': str(i), 'comments': "-", 'shares': "-", 'restacks': str(i % 3),
+            'likes_num': i, 'comments_num': 0, 'shares_num': 0, 'restacks_num': i % 3,
+            'word_count': 100 * i, 'reading_time': i / 2, 'total_engagement': i + i % 3, 'engagement_rate': 0}
+
+
+def _analysis(posts):
+    return {
+        'publication': {'name': "ledgerlines", 'url': "https://ledgerlines.substack.com",
+                        'subscriber_count': None, 'last_updated': "2024-01-01T00:00:00"},
+        'analytics': {'total_posts_analyzed': len(posts), 'average_likes_per_post': 1.5,
+                      'average_comments_per_post': 0.0, 'average_shares_per_post': 0.0,
+                      'average_restacks_per_post': 1.0, 'average_word_count': 500.0,
+                      'average_reading_time': 2.5, 'publishing_frequency': 1.2, 'total_engagement': 42},
+        'top_posts': sorted(posts, key=lambda p: p['total_engagement'], reverse=True)[:5],
+        'all_posts': posts,
+    }
+
+
+def _sheets(path):
+    wb = openpyxl.load_workbook(path)
+    return {
+        ws.title: (
+            [[cell.value for cell in row] for row in ws.iter_rows()],
+            {letter: dim.width for letter, dim in ws.column_dimensions.items()},
+            [(cell.font.b, cell.fill.fgColor.rgb) for cell in ws[1]],
+        )
+        for ws in wb.worksheets
+    }
+
+
+def test_streaming_export_matches_regular_export(tmp_path):
+    collector = SubstackDataCollector("ledgerlines")
+    analysis = _analysis([_post(i) for i in range(40)])
+
+    regular = collector.export_to_excel(analysis, str(tmp_path / "regular.xlsx"))
+    streamed = collector.export_to_excel(analysis, str(tmp_path / "streamed.xlsx"), streaming=True)
+
+    regular_sheets, streamed_sheets = _sheets(regular), _sheets(streamed)
+    assert list(streamed_sheets) == list(regular_sheets)
+    for title, (rows, widths, header) in regular_sheets.items():
+        streamed_rows, streamed_widths, streamed_header = streamed_sheets[title]
+        if title == "Publication Overview":
+            # "Analysis Date" is the export time
+            rows, streamed_rows = rows[:-1], streamed_rows[:-1]
+        assert streamed_rows == rows
+        assert streamed_header == header
+        assert {k: streamed_widths[k] for k in widths} == widths
+
+
+def test_streaming_export_consumes_a_generator_of_posts(tmp_path):
+    collector = SubstackDataCollector("ledgerlines")
+    analysis = _analysis([])
+    del analysis['all_posts']
+
+    path = collector.export_to_excel(analysis, str(tmp_path / "archive.xlsx"), streaming=True,
+                                     posts=(_post(i) for i in range(2500)))
+
+    rows = list(openpyxl.load_workbook(path, read_only=True)["All Posts"].values)
+    assert len(rows) == 2501
+    assert rows[-1][-1] == "https://ledgerlines.substack.com/p/2499"
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for pipeline mode: fetch threads feeding an extractor process pool.
+"""
+
+import time
+
+import pytest
+
+from data_collector import SubstackDataCollector
+from extract_pool import ExtractorPool
+from subscriber_extractor import SubscriberCountPipeline
+
+
+@pytest.fixture
+def site(fixture_site):
+    return fixture_site()
+
+
+@pytest.fixture(scope='module')
+def extractor_pool():
+    with ExtractorPool(max_workers=2) as pool:
+        yield pool
+
+
+def _collector(site, **kwargs):
+    collector = SubstackDataCollector(site, requests_per_second=0, max_workers=4, metrics_registry=None,
+                                      subscriber_pipeline=SubscriberCountPipeline(), **kwargs)
+    collector.retry_policy.max_retries = 0
+    return collector
+
+
+def test_pipeline_mode_matches_in_thread_extraction(site, extractor_pool, comparable):
+    threaded = _collector(site)
+    pipelined = _collector(site, extractor_pool=extractor_pool)
+    progress = []
+
+    expected = threaded.analyze_publication()
+    actual = pipelined.analyze_publication(progress_callback=lambda done, total: progress.append(done))
+
+    assert comparable(actual) == comparable(expected)
+    assert actual['publication']['subscriber_count'] is not None
+    assert pipelined.subscriber_count_strategy == threaded.subscriber_count_strategy
+    assert pipelined.subscriber_pipeline.wins == threaded.subscriber_pipeline.wins
+    # The missing page is reported like on the threaded path
+    assert 'fetch_error' in actual['all_posts'][3]
+    assert actual['analytics']['posts_failed'] == 1
+    assert sorted(progress) == [1, 2, 3, 4]
+    assert actual['stats']['phases']['extraction']['count'] == 4
+
+
+def test_single_post_engagement_uses_the_pool(site, extractor_pool):
+    pipelined = _collector(site, extractor_pool=extractor_pool)
+    assert pipelined.get_post_engagement(f"{site}/p/long") == _collector(site).get_post_engagement(f"{site}/p/long")
+
+
+def test_submit_blocks_when_max_pending_are_outstanding():
+    with ExtractorPool(max_workers=1, max_pending=1) as pool:
+        first = pool.submit(time.sleep, 0.3)
+        started = time.perf_counter()
+        second = pool.submit(time.sleep, 0)
+        assert first.done()
+        assert time.perf_counter() - started >= 0.2
+        second.result()
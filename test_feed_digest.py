@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for feed-digest change detection against the local replay server.
+"""
+
+import pytest
+
+from batch_analyzer import BatchAnalyzer
+from data_collector import SubstackDataCollector
+from feed_digest import FeedDigestStore, feed_digest
+from replay_server import ReplayResponse
+from post_store import PostStore
+
+POST = b"""<html><body><div class="post">
+<button aria-label="Like (12)">12</button><p>Some words in the post body.</p>
+</div></body></html>"""
+
+
+def _feed(base, slugs):
+    items = ''.join(
+        f"<item><title>{slug}</title><link>{base}/p/{slug}</link>"
+        f"<pubDate>Mon, 0{i + 1} Jan 2024 10:00:00 GMT</pubDate></item>"
+        for i, slug in enumerate(slugs))
+    return f'<?xml version="1.0"?><rss><channel>{items}</channel></rss>'.encode()
+
+
+class _Feed:
+    """The /feed route; tests change slugs, or stop honoring validators, between runs."""
+
+    def __init__(self):
+        self.slugs = ['one', 'two']
+        self.honor_validators = True
+
+    def __call__(self, request):
+        etag = f'"{len(self.slugs)}"'
+        if self.honor_validators and request.headers.get('If-None-Match') == etag:
+            return ReplayResponse(status=304, headers={'ETag': etag})
+        return ReplayResponse(_feed(request.base_url, self.slugs), content_type='application/rss+xml',
+                              headers={'ETag': etag})
+
+
+def _page(request):
+    return POST if request.path.startswith('/p/') else b'<html><body>1,234 subscribers</body></html>'
+
+
+@pytest.fixture
+def feed():
+    return _Feed()
+
+
+@pytest.fixture
+def feed_server(replay_server, feed):
+    replay_server.routes = {'/feed': feed, '*': _page}
+    return replay_server.url
+
+
+def _collector(url, tmp_path):
+    return SubstackDataCollector(url, requests_per_second=0, metrics_registry=None,
+                                 post_store=PostStore(str(tmp_path / "posts.json")))
+
+
+def test_digest_ignores_item_order():
+    posts = [{'link': 'a', 'pub_date': 'x'}, {'link': 'b', 'pub_date': 'y'}]
+    assert feed_digest(posts) == feed_digest(posts[::-1])
+    assert feed_digest(posts) != feed_digest(posts[:1])
+
+
+def test_unchanged_feed_skips_analysis(feed_server, feed, replay_server, tmp_path):
+    store = FeedDigestStore(str(tmp_path / "digests.json"))
+
+    first = _collector(feed_server, tmp_path).refresh_publication(store)
+    assert first['refresh'] == {'mode': 'full', 'feed_changed': True, 'feed_not_modified': False,
+                                'precheck_seconds': first['refresh']['precheck_seconds']}
+    assert first['analytics']['total_posts_analyzed'] == 2
+    # The precheck's feed download is reused by the analysis
+    assert replay_server.hits['/feed'] == 1
+
+    replay_server.hits.clear()
+    assert _collector(feed_server, tmp_path).refresh_publication(FeedDigestStore(store.path)) is None
+    assert dict(replay_server.hits) == {'/feed': 1}
+
+    # Without validator support the full body comes back, but the digest matches
+    feed.honor_validators = False
+    replay_server.hits.clear()
+    assert _collector(feed_server, tmp_path).refresh_publication(store) is None
+    assert dict(replay_server.hits) == {'/feed': 1}
+
+
+def test_changed_feed_runs_full_analysis(feed_server, feed, replay_server, tmp_path):
+    store = FeedDigestStore(str(tmp_path / "digests.json"))
+    _collector(feed_server, tmp_path).refresh_publication(store)
+
+    feed.slugs = ['one', 'two', 'three']
+    replay_server.hits.clear()
+    analysis = _collector(feed_server, tmp_path).refresh_publication(store)
+    assert analysis['refresh']['mode'] == 'full'
+    assert analysis['analytics']['total_posts_analyzed'] == 3
+    assert replay_server.hits['/'] == 1
+    assert store.get(feed_server)['post_count'] == 3
+    # The precheck's feed download and outcome are part of the run's stats
+    assert analysis['stats']['phases']['feed_fetch']['count'] == 1
+    assert analysis['stats']['counters']['feed_prechecks'] == 1
+
+
+def test_light_refresh_reuses_previous_analysis(feed_server, replay_server, tmp_path):
+    store = FeedDigestStore(str(tmp_path / "digests.json"))
+    previous = _collector(feed_server, tmp_path).refresh_publication(store, incremental=True)
+
+    replay_server.hits.clear()
+    analysis = _collector(feed_server, tmp_path).refresh_publication(
+        store, unchanged='light', previous_analysis=previous)
+    assert analysis['refresh']['mode'] == 'light'
+    assert analysis['refresh']['feed_not_modified']
+    assert analysis['publication'] == previous['publication']
+    assert [p['link'] for p in analysis['all_posts']] == [p['link'] for p in previous['all_posts']]
+    # One conditional feed request; no homepage, no feed body, no old post pages
+    assert dict(replay_server.hits) == {'/feed': 1}
+
+
+def test_batch_refresh_yields_none_for_unchanged_publications(feed_server, tmp_path):
+    store = FeedDigestStore(str(tmp_path / "digests.json"))
+    with BatchAnalyzer(max_concurrency=2, requests_per_second=0, metrics_registry=None) as batch:
+        assert list(batch.refresh([feed_server], store))[0][1]['refresh']['mode'] == 'full'
+        assert list(batch.refresh([feed_server], store)) == [(feed_server, None)]
+
+
+def test_batch_refresh_saves_the_digest_store_once(feed_server, tmp_path, monkeypatch):
+    store = FeedDigestStore(str(tmp_path / "digests.json"))
+    saves = []
+    save = store.save
+    monkeypatch.setattr(store, 'save', lambda: (saves.append(1), save()))
+    with BatchAnalyzer(max_concurrency=2, requests_per_second=0, metrics_registry=None) as batch:
+        results = list(batch.refresh([feed_server, feed_server + '/', feed_server + '/feed'], store))
+
+    assert len(results) == 3
+    assert len(saves) == 1
+    assert FeedDigestStore(store.path).get(feed_server) is not None
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the on-disk HTTP cache against the local replay server.
+"""
+
+import io
+import os
+
+import pytest
+import requests
+
+from data_collector import SubstackDataCollector
+from http_cache import HttpCache
+from replay_server import ReplayResponse
+
+FEED = b"""<?xml version="1.0"?><rss><channel>
+<item><title>Hello</title><link>https://example.substack.com/p/hello</link>
+<pubDate>Mon, 01 Jan 2024 10:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+
+ETAG = '"v1"'
+
+
+def _feed(request):
+    if request.headers.get('If-None-Match') == ETAG:
+        return ReplayResponse(status=304, headers={'ETag': ETAG})
+    return ReplayResponse(FEED, content_type='application/rss+xml; charset=utf-8', headers={'ETag': ETAG})
+
+
+@pytest.fixture
+def feed_server(replay_server):
+    replay_server.routes = {'*': _feed}
+    return replay_server
+
+
+def _hits(server):
+    """(path, conditional) for every request the server answered."""
+    return [(request.path, request.headers.get('If-None-Match') == ETAG) for request in server.requests]
+
+
+def _collector(base_url, cache):
+    return SubstackDataCollector(base_url, requests_per_second=0, http_cache=cache)
+
+
+def test_fresh_entry_skips_network(feed_server, tmp_path):
+    cache = HttpCache(str(tmp_path))
+    first = _collector(feed_server.url, cache).fetch_posts()
+    second = _collector(feed_server.url, cache).fetch_posts()
+
+    assert first == second
+    assert first[0]['title'] == "Hello"
+    assert _hits(feed_server) == [('/feed', False)]
+
+
+def test_stale_entry_is_revalidated_with_conditional_get(feed_server, tmp_path):
+    cache = HttpCache(str(tmp_path), ttls={'feed': 0})
+    first = _collector(feed_server.url, cache).fetch_posts()
+    # A new cache instance reloads its index from disk
+    second = _collector(feed_server.url, HttpCache(str(tmp_path), ttls={'feed': 0})).fetch_posts()
+
+    assert first == second
+    assert _hits(feed_server) == [('/feed', False), ('/feed', True)]
+
+
+def test_lru_eviction_keeps_cache_under_size_bound(feed_server, tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=2 * len(FEED))
+    collector = _collector(feed_server.url, cache)
+    for page in ('a', 'b', 'c'):
+        collector._get(f"{feed_server.url}/{page}", resource_type='post')
+
+    assert cache.total_bytes <= 2 * len(FEED)
+    # The least recently used page was evicted and has to be downloaded again
+    collector._get(f"{feed_server.url}/a", resource_type='post')
+    assert _hits(feed_server)[-1] == ('/a', False)
+
+
+class _CountingBody(io.BytesIO):
+    """Raw response body that records how many reads were made."""
+
+    reads = 0
+
+    def read(self, *args):
+        self.reads += 1
+        return super().read(*args)
+
+
+def _raw_response(status_code, raw):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers['ETag'] = ETAG
+    response.raw = raw
+    return response
+
+
+def test_streamed_body_is_cached_only_once_fully_read(tmp_path):
+    cache = HttpCache(str(tmp_path))
+    url = "https://example.substack.com/feed"
+    body = b"x" * 100_000
+
+    partial = _CountingBody(body)
+    chunks = cache.fetch(url, 'feed', lambda headers: _raw_response(200, partial)).iter_content(1000)
+    next(chunks)
+    chunks.close()
+    # Stopping early reads no more of the body and leaves nothing behind
+    assert partial.reads == 1
+    assert cache.total_bytes == 0 and not os.listdir(tmp_path)
+
+    assert cache.fetch(url, 'feed', lambda headers: _raw_response(200, _CountingBody(body))).content == body
+    assert cache.total_bytes == len(body)
+    assert cache.fetch(url, 'feed', lambda headers: pytest.fail("served from the cache")).content == body
+
+
+def test_not_modified_response_is_closed(tmp_path):
+    cache = HttpCache(str(tmp_path), ttls={'post': 0})
+    url = "https://example.substack.com/p/hello"
+    assert cache.fetch(url, 'post', lambda headers: _raw_response(200, _CountingBody(FEED))).content == FEED
+
+    not_modified = _CountingBody(b"")
+    assert cache.fetch(url, 'post', lambda headers: _raw_response(304, not_modified)).content == FEED
+    assert not_modified.closed
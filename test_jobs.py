@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for background analysis jobs (no network access).
+"""
+
+import importlib
+import json
+import threading
+
+import pytest
+
+from data_collector import SubstackDataCollector
+from jobs import DONE, FAILED, EventBuffer, JobManager, run_analysis_job
+
+
+def _blocking_runner(release):
+    def runner(collector, job):
+        job.update_progress(1, 3)
+        release.wait(5)
+        job.update_progress(3, 3)
+        if collector.publication_name == 'broken':
+            raise RuntimeError("feed unavailable")
+        return {'publication_info': {'name': collector.publication_name}}, 'out.xlsx'
+    return runner
+
+
+def _wait(manager, job):
+    manager.shutdown(wait=True)
+    assert job.finished
+
+
+def test_in_flight_requests_for_one_publication_share_a_job():
+    release = threading.Event()
+    manager = JobManager(max_workers=2, collector_factory=SubstackDataCollector, runner=_blocking_runner(release))
+
+    first, created = manager.submit("ledgerlines")
+    second, created_again = manager.submit("https://LedgerLines.substack.com")
+    # Scheme does not make it another publication
+    third, _ = manager.submit("http://ledgerlines.substack.com/")
+    other, _ = manager.submit("cashandcache")
+
+    assert created and not created_again
+    assert second is first and third is first
+    assert other is not first
+    assert manager.get(first.id) is first
+
+    release.set()
+    _wait(manager, first)
+    assert first.status == DONE
+    assert first.to_dict()['progress'] == {'posts_done': 3, 'posts_total': 3}
+    assert first.to_dict(include_result=True)['excel_file'] == 'out.xlsx'
+
+
+def test_duplicate_submissions_do_not_build_collectors():
+    release = threading.Event()
+    built = []
+
+    def factory(publication_url):
+        built.append(publication_url)
+        return SubstackDataCollector(publication_url)
+
+    manager = JobManager(max_workers=1, collector_factory=factory, runner=_blocking_runner(release))
+    job, _ = manager.submit("ledgerlines")
+    for _ in range(5):
+        assert manager.submit("https://ledgerlines.substack.com/feed")[0] is job
+
+    release.set()
+    _wait(manager, job)
+    assert built == ["ledgerlines"]
+
+
+def test_failed_job_reports_error_and_frees_the_publication():
+    release = threading.Event()
+    release.set()
+    manager = JobManager(max_workers=1, collector_factory=SubstackDataCollector, runner=_blocking_runner(release))
+
+    job, _ = manager.submit("broken")
+    manager.shutdown(wait=True)
+
+    assert job.status == FAILED
+    assert job.error == "feed unavailable"
+    assert job.publication_key not in manager._in_flight
+
+
+def test_event_buffer_drops_oldest_events_and_reports_them_missed():
+    events = EventBuffer(max_events=3)
+    for i in range(5):
+        events.append('post', {'done': i + 1})
+
+    buffered, missed, closed = events.read()
+    assert [event_id for event_id, _, _ in buffered] == [2, 3, 4]
+    assert missed == 2 and not closed
+    assert events.read(4, timeout=0) == ([], 0, False)
+
+    events.close()
+    assert events.read(4) == ([], 0, True)
+
+
+def _offline_collector(publication_url):
+    collector = SubstackDataCollector(publication_url, requests_per_second=0, metrics_registry=None)
+    posts = [{'title': f"Post {i}", 'link': f"{collector.base_url}/p/post-{i}", 'description': "",
+              'pub_date': f"Mon, 0{i + 1} Jan 2024 10:00:00 GMT", 'author': ""} for i in range(3)]
+    collector.fetch_posts = lambda limit=None: posts
+    collector.get_publication_info = lambda: {'name': "Example", 'url': collector.base_url,
+                                              'subscriber_count': 10, 'last_updated': "2024-01-01T00:00:00"}
+    collector.get_post_engagement = lambda post_url: {
+        'likes': "2", 'comments': "1", 'shares': "-", 'restacks': "0", 'likes_num': 2, 'comments_num': 1,
+        'shares_num': 0, 'restacks_num': 0, 'word_count': 400, 'reading_time': 2, 'total_engagement': 3,
+    }
+    return collector
+
+
+def _parse_sse(body):
+    messages = []
+    for block in body.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+        messages.append((fields.get('id'), fields['event'], json.loads(fields['data'])))
+    return messages
+
+
+def test_dashboard_streams_job_events(tmp_path, monkeypatch):
+    pytest.importorskip('flask')
+    monkeypatch.chdir(tmp_path)
+    web_dashboard = importlib.import_module('web_dashboard')
+    manager = JobManager(max_workers=1, collector_factory=_offline_collector, runner=run_analysis_job)
+    monkeypatch.setattr(web_dashboard, 'job_manager', manager)
+    client = web_dashboard.app.test_client()
+
+    job, _ = manager.submit("example")
+    manager.shutdown(wait=True)
+    response = client.get(f"/api/jobs/{job.id}/events")
+
+    assert response.mimetype == 'text/event-stream'
+    messages = _parse_sse(response.get_data(as_text=True))
+    assert [event for _, event, _ in messages] == ['status', 'start', 'post', 'post', 'post', 'status']
+    assert messages[1][2]['total_posts'] == 3
+    assert messages[4][2]['running']['total_engagement'] == 9
+    assert messages[-1][2]['status'] == DONE
+    assert messages[-1][2]['analytics']['total_engagement'] == 9
+
+    # A reconnecting client resumes after the last event it saw
+    resumed = client.get(f"/api/jobs/{job.id}/events", headers={'Last-Event-ID': messages[3][0]})
+    assert [event for _, event, _ in _parse_sse(resumed.get_data(as_text=True))] == ['post', 'status']
+    assert client.get("/api/jobs/unknown/events").status_code == 404
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for phase timers, counters and the Prometheus text export.
+"""
+
+import importlib
+
+import pytest
+
+from data_collector import SubstackDataCollector
+from replay_server import ReplayResponse
+from metrics import MetricsRegistry, PhaseStats
+
+FEED = b"""<?xml version="1.0"?><rss><channel>
+<item><title>One</title><link>{base}/p/one</link><pubDate>Mon, 01 Jan 2024 10:00:00 GMT</pubDate></item>
+<item><title>Missing</title><link>{base}/p/missing</link><pubDate>Tue, 02 Jan 2024 10:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+POST = b"""<html><body><div class="post">
+<button aria-label="Like (12)">12</button><p>Some words in the post body.</p>
+</div></body></html>"""
+
+
+@pytest.fixture
+def publication_server(replay_server):
+    replay_server.routes = {
+        '/feed': lambda request: ReplayResponse(FEED.replace(b'{base}', request.base_url.encode()),
+                                                content_type='application/rss+xml'),
+        '/p/one': POST,
+        '/': b'<html><body>1,234 subscribers</body></html>',
+    }
+    return replay_server.url
+
+
+def test_phase_stats_summarize_timings_and_counters():
+    registry = MetricsRegistry()
+    stats = PhaseStats(registry)
+    stats.record('parse', 0.2)
+    stats.record('parse', 0.4)
+    with stats.time('export'):
+        pass
+    stats.count('http_responses', status=200)
+    stats.count('http_responses', status=200)
+
+    summary = stats.to_dict()
+    assert summary['phases']['parse'] == {'count': 2, 'total_seconds': 0.6, 'mean_seconds': 0.3, 'max_seconds': 0.4}
+    assert summary['phases']['export']['count'] == 1
+    assert summary['counters'] == {'http_responses': 2}
+    assert registry.counter_value('http_responses_total', status=200) == 2
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.inc('http_responses_total', description='Responses by status', status=200)
+    registry.observe('phase_seconds', 0.05, phase='parse')
+    registry.observe('phase_seconds', 0.5, phase='parse')
+    registry.observe('phase_seconds', 5, phase='parse')
+
+    lines = registry.render().splitlines()
+    assert '# HELP substack_http_responses_total Responses by status' in lines
+    assert '# TYPE substack_http_responses_total counter' in lines
+    assert 'substack_http_responses_total{status="200"} 1' in lines
+    assert '# TYPE substack_phase_seconds histogram' in lines
+    assert 'substack_phase_seconds_bucket{phase="parse",le="0.1"} 1' in lines
+    assert 'substack_phase_seconds_bucket{phase="parse",le="1"} 2' in lines
+    assert 'substack_phase_seconds_bucket{phase="parse",le="+Inf"} 3' in lines
+    assert 'substack_phase_seconds_count{phase="parse"} 3' in lines
+
+
+def test_analysis_and_export_report_phase_stats(publication_server, tmp_path):
+    registry = MetricsRegistry()
+    collector = SubstackDataCollector(publication_server, requests_per_second=0, max_workers=1,
+                                      metrics_registry=registry)
+    analysis = collector.analyze_publication()
+    collector.export_to_excel(analysis, str(tmp_path / "report.xlsx"))
+
+    stats = analysis['stats']
+    for phase in ('feed_fetch', 'homepage_fetch', 'post_fetch', 'parse', 'extraction', 'export'):
+        assert stats['phases'][phase]['count'] >= 1, phase
+    assert stats['phases']['post_fetch']['count'] == 2
+    assert stats['counters']['posts_fetched'] == 1
+    assert stats['counters']['post_fetch_errors'] == 1
+    assert stats['wall_seconds'] > 0
+    assert registry.counter_value('http_responses_total', status=404) == 1
+    assert registry.counter_value('analyses_total', outcome='success') == 1
+
+
+def test_dashboard_serves_metrics(tmp_path, monkeypatch):
+    pytest.importorskip('flask')
+    monkeypatch.chdir(tmp_path)
+    web_dashboard = importlib.import_module('web_dashboard')
+    client = web_dashboard.app.test_client()
+    client.get('/api/jobs/unknown')
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert 'substack_dashboard_requests_total{endpoint="get_job",status="404"}' in response.get_data(as_text=True)
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Parser backend parity: lxml must extract exactly what html.parser extracts
+from the saved pages in fixtures/.
+"""
+
+import glob
+import os
+
+import pytest
+
+from data_collector import SubstackDataCollector
+from engagement_extractor import extract_engagement
+from parser_backend import html_backend, parse_html
+
+pytest.importorskip('lxml')
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def _read(name):
+    with open(os.path.join(FIXTURES, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _pages(prefix):
+    return sorted(os.path.basename(path) for path in glob.glob(os.path.join(FIXTURES, f'{prefix}*.html')))
+
+
+def test_lxml_is_the_default_when_installed():
+    assert html_backend() == 'lxml'
+    assert SubstackDataCollector("example").parser_backend == 'lxml'
+    assert SubstackDataCollector("example", parser_backend='html.parser').parser_backend == 'html.parser'
+
+
+@pytest.mark.parametrize('page', _pages('post_'))
+def test_post_engagement_parity(page):
+    html = _read(page)
+    assert extract_engagement(parse_html(html, 'lxml')) == extract_engagement(parse_html(html, 'html.parser'))
+
+
+@pytest.mark.parametrize('page', _pages('home_'))
+def test_publication_page_parity(page):
+    html = _read(page)
+    collector = SubstackDataCollector("ledgerlines")
+    fast, slow = parse_html(html, 'lxml'), parse_html(html, 'html.parser')
+
+    assert fast.find('title').text == slow.find('title').text
+    assert collector._extract_subscriber_count(fast) == collector._extract_subscriber_count(slow)
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the columnar post metrics used by analyze_publication.
+"""
+
+import random
+import statistics
+
+from post_columns import PostColumns, columns_from_analyses
+
+
+def _posts(rng, count):
+    posts = []
+    for i in range(count):
+        likes, comments, restacks = rng.randint(0, 50), rng.randint(0, 5), rng.choice([0, 0, 1, 2])
+        words = rng.randint(0, 4000)
+        month = rng.choice(["Jan", "Feb", "Mar"])
+        posts.append({
+            'title': f"Post {i}", 'link': f"https://x.substack.com/p/{i}",
+            'pub_date': rng.choice([f"Mon, {rng.randint(1, 28):02d} {month} 2024 08:00:00 GMT", ""]),
+            'likes_num': likes, 'comments_num': comments, 'shares_num': 0, 'restacks_num': restacks,
+            'word_count': words, 'reading_time': max(1, words // 200) if words else 0,
+            'total_engagement': likes + comments + restacks,
+        })
+    return posts
+
+
+def test_aggregates_and_top_n_match_the_dict_computation():
+    rng = random.Random(7)
+    posts = _posts(rng, 500)
+    columns = PostColumns.from_posts(posts)
+
+    assert columns.total('likes') == sum(p['likes_num'] for p in posts)
+    assert columns.mean('word_count') == sum(p['word_count'] for p in posts) / len(posts)
+    assert columns.median('likes') == statistics.median(p['likes_num'] for p in posts)
+    assert columns.percentile('likes', 100) == max(p['likes_num'] for p in posts)
+    # Ties keep feed order, exactly like the old stable sort
+    assert columns.top_n('total_engagement', 5) == sorted(
+        posts, key=lambda p: p['total_engagement'], reverse=True)[:5]
+    assert columns.summary()['comments']['median'] == statistics.median(p['comments_num'] for p in posts)
+
+
+def test_monthly_rollup_skips_undated_posts():
+    rng = random.Random(3)
+    posts = _posts(rng, 200)
+    rollup = PostColumns.from_posts(posts).monthly_rollup(['likes'])
+
+    dated = [p for p in posts if p['pub_date']]
+    assert list(rollup) == sorted(rollup)
+    assert sum(bucket['posts'] for bucket in rollup.values()) == len(dated)
+    assert rollup['2024-02']['likes'] == sum(p['likes_num'] for p in dated if " Feb " in p['pub_date'])
+
+
+def test_columns_span_several_publications():
+    rng = random.Random(11)
+    first, second = _posts(rng, 30), _posts(rng, 20)
+    combined = columns_from_analyses({'a': {'all_posts': first}, 'b': {'all_posts': second},
+                                      'c': {'error': "No posts found"}})
+
+    assert len(combined) == 50
+    assert combined.publications == ['a', 'b']
+    assert combined.for_publication('b').total('likes') == sum(p['likes_num'] for p in second)
+    merged = PostColumns.concat([PostColumns.from_posts(first, 'a'), PostColumns.from_posts(second, 'b')])
+    assert list(merged.column('likes')) == list(combined.column('likes'))
+    assert list(merged.publication_ids) == list(combined.publication_ids)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for retries and adaptive rate limiting against the local replay server.
+"""
+
+import os
+import time
+
+from data_collector import SubstackDataCollector
+from replay_server import ReplayResponse
+from rate_limiter import AdaptiveRateLimiter
+from retry_policy import RetryPolicy, parse_retry_after
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+POST = open(os.path.join(FIXTURES, 'post_short.html'), 'rb').read()
+
+
+def _flaky(script):
+    """Route answering each path's scripted statuses before succeeding (a trailing 'always' repeats forever)."""
+    def answer(request):
+        statuses = script.get(request.path, [])
+        if not statuses:
+            return POST
+        status = statuses[0] if statuses[-1] == 'always' else statuses.pop(0)
+        return ReplayResponse(status=status, headers={'Retry-After': '0'} if status == 429 else None)
+    return answer
+
+
+def _collector(base_url, limiter=None, max_retries=3):
+    return SubstackDataCollector(base_url, rate_limiter=limiter or AdaptiveRateLimiter(100),
+                                 retry_policy=RetryPolicy(max_retries=max_retries, backoff_base=0.01))
+
+
+def test_throttled_and_failing_requests_are_retried(replay_server):
+    replay_server.routes = {'*': _flaky({'/p/a': [429, 503]})}
+    flaky_server = replay_server.url
+    limiter = AdaptiveRateLimiter(100)
+    collector = _collector(flaky_server, limiter)
+    baseline = collector.get_post_engagement(f"{flaky_server}/p/ok")
+
+    engagement = collector.get_post_engagement(f"{flaky_server}/p/a")
+
+    assert engagement == baseline and 'fetch_error' not in engagement
+    assert replay_server.hits['/p/a'] == 3
+    assert limiter.rate_for(flaky_server) < 100
+
+
+def test_persistent_failures_are_excluded_from_aggregates(replay_server):
+    replay_server.routes = {'*': _flaky({'/p/broken': [500, 'always']})}
+    flaky_server = replay_server.url
+    collector = _collector(flaky_server, max_retries=2)
+    posts = [{'title': name, 'link': f"{flaky_server}/p/{name}", 'description': "", 'pub_date': "", 'author': ""}
+             for name in ('good', 'broken')]
+    collector.fetch_posts = lambda limit=None: posts
+    collector.get_publication_info = lambda: {'name': "stub", 'url': flaky_server, 'subscriber_count': None,
+                                              'last_updated': "2024-01-01T00:00:00"}
+    good = collector.get_post_engagement(f"{flaky_server}/p/good")
+
+    analysis = collector.analyze_publication()
+
+    assert replay_server.hits['/p/broken'] == 3
+    assert 'fetch_error' in analysis['all_posts'][1]
+    assert analysis['analytics']['posts_failed'] == 1
+    assert analysis['analytics']['total_posts_analyzed'] == 1
+    assert analysis['analytics']['average_likes_per_post'] == good['likes_num']
+
+
+def test_adaptive_limiter_backs_off_and_recovers():
+    limiter = AdaptiveRateLimiter(10, max_requests_per_second=20, increase_step=5)
+    url = "https://a.substack.com/p/x"
+
+    limiter.record(url, 429)
+    assert limiter.rate_for(url) == 5
+    for _ in range(10):
+        limiter.record(url, 200, latency=0.01)
+    assert limiter.rate_for(url) == 20
+    limiter.record(url, 200, latency=60)
+    assert limiter.rate_for(url) == 10
+
+    # Retry-After pauses the host before the next token is handed out
+    limiter.record(url, 429, retry_after=0.2)
+    start = time.monotonic()
+    limiter.acquire(url)
+    assert time.monotonic() - start >= 0.2
+    # Other hosts are unaffected
+    start = time.monotonic()
+    limiter.acquire("https://b.substack.com/p/y")
+    assert time.monotonic() - start < 0.1
+
+
+def test_backoff_grows_with_jitter_and_honours_retry_after():
+    policy = RetryPolicy(backoff_base=1, backoff_max=10)
+    assert all(0 <= policy.backoff(0) <= 1 for _ in range(50))
+    assert all(0 <= policy.backoff(5) <= 10 for _ in range(50))
+    assert policy.backoff(0, retry_after=3) == 3
+    assert RetryPolicy(jitter=False, backoff_base=1).backoff(2) == 4
+    assert parse_retry_after("7") == 7
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert parse_retry_after("soon") is None
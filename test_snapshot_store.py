@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the SQLite engagement snapshot store.
+"""
+
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from snapshot_store import SnapshotStore
+
+
+def _analysis(subscribers, likes_by_post, failed=()):
+    posts = []
+    for i, likes in enumerate(likes_by_post):
+        post = {'title': f"Post {i}", 'link': f"https://ledgerlines.substack.com/p/{i}",
+                'likes_num': likes, 'comments_num': 1, 'shares_num': 0, 'restacks_num': 0, 'word_count': 500}
+        if i in failed:
+            post.update(likes_num=0, comments_num=0, fetch_error="timed out")
+        posts.append(post)
+    return {'publication': {'name': "ledgerlines", 'subscriber_count': subscribers}, 'all_posts': posts}
+
+
+def test_runs_record_snapshots_and_report_deltas(tmp_path):
+    store = SnapshotStore(str(tmp_path / "history.db"))
+    start = datetime(2024, 1, 1)
+    store.record_analysis(_analysis(100, [5, 10, 3]), fetched_at=start)
+    store.record_analysis(_analysis(110, [9, 30, 3], failed={2}), fetched_at=start + timedelta(days=2))
+    store.record_analysis(_analysis(125, [11, 40, 4]), fetched_at=start + timedelta(days=5))
+
+    growth = store.subscriber_growth("LedgerLines")
+    assert [p['subscriber_count'] for p in growth['points']] == [100, 110, 125]
+    assert growth['delta'] == 25 and growth['growth_rate'] == 0.25 and growth['per_day'] == 5.0
+
+    deltas = store.post_deltas("ledgerlines")
+    assert [d['link'][-1] for d in deltas] == ['1', '0', '2']
+    assert deltas[0]['likes_num'] == 40 and deltas[0]['likes_num_delta'] == 30
+    assert deltas[0]['engagement_per_day'] == 6.0
+
+    # The failed fetch was not stored as a drop to zero
+    assert [s['likes_num'] for s in store.post_history("ledgerlines", "https://ledgerlines.substack.com/p/2")] == [3, 4]
+    assert [t['posts'] for t in store.engagement_totals("ledgerlines")] == [3, 2, 3]
+
+    recent = store.post_deltas("ledgerlines", since=start + timedelta(days=1), limit=1)
+    assert len(recent) == 1 and recent[0]['likes_num_delta'] == 10
+
+
+def test_query_plan_uses_the_publication_link_time_index(tmp_path):
+    store = SnapshotStore(str(tmp_path / "history.db"))
+    plan = store._query("EXPLAIN QUERY PLAN SELECT likes_num FROM post_snapshots "
+                        "WHERE publication = ? AND link = ? ORDER BY fetched_at", ("a", "b"))
+    assert any('idx_post_snapshots_publication_link_time' in row['detail'] for row in plan)
+
+
+def test_runs_in_the_same_second_keep_their_own_snapshots(tmp_path):
+    store = SnapshotStore(str(tmp_path / "history.db"))
+    store.record_analysis(_analysis(100, [5]))
+    store.record_analysis(_analysis(100, [6]))
+    assert [s['likes_num'] for s in store.post_history("ledgerlines", "https://ledgerlines.substack.com/p/0")] == [5, 6]
+
+    # A real key collision fails the whole run instead of overwriting the earlier one
+    fetched_at = datetime(2024, 1, 1)
+    store.record_analysis(_analysis(100, [7]), fetched_at=fetched_at)
+    with pytest.raises(sqlite3.IntegrityError):
+        store.record_analysis(_analysis(100, [8]), fetched_at=fetched_at)
+    assert len(store.runs("ledgerlines")) == 3
+
+
+def test_custom_domains_sharing_a_first_label_get_separate_histories(tmp_path):
+    from data_collector import SubstackDataCollector
+    from engagement_extractor import build_engagement
+
+    store = SnapshotStore(str(tmp_path / "history.db"))
+    for url, likes in (("https://www.foo.com", "5"), ("https://www.bar.com", "9")):
+        collector = SubstackDataCollector(url, requests_per_second=0, snapshot_store=store, metrics_registry=None)
+        collector.fetch_posts = lambda limit=None, url=url: [
+            {'title': "Post", 'link': f"{url}/p/post", 'description': "", 'author': "",
+             'pub_date': "Mon, 01 Jan 2024 10:00:00 GMT"}]
+        collector.get_publication_info = lambda url=url: {'name': url, 'url': url, 'subscriber_count': None,
+                                                          'last_updated': "2024-01-01T00:00:00"}
+        collector.get_post_engagement = lambda link, likes=likes: build_engagement(likes, "-", "-", "-", 100)
+        collector.analyze_publication()
+
+    assert [row['likes_num'] for row in store.engagement_totals("www.foo.com")] == [5]
+    assert [row['likes_num'] for row in store.engagement_totals("www.bar.com")] == [9]
+    assert store.engagement_totals("www") == []
+
+
+def test_incremental_runs_snapshot_only_fetched_posts(tmp_path):
+    from data_collector import SubstackDataCollector
+    from engagement_extractor import build_engagement
+    from post_store import PostStore
+
+    store = SnapshotStore(str(tmp_path / "history.db"))
+    post_store = PostStore(str(tmp_path / "posts.json"))
+    links = [f"https://ledgerlines.substack.com/p/{i}" for i in range(3)]
+    for likes in ("5", "9"):
+        collector = SubstackDataCollector("ledgerlines", requests_per_second=0, snapshot_store=store,
+                                          post_store=post_store, metrics_registry=None)
+        collector.fetch_posts = lambda limit=None: [
+            {'title': "Post", 'link': link, 'description': "", 'author': "",
+             'pub_date': "Mon, 01 Jan 2024 10:00:00 GMT"} for link in links]
+        collector.get_publication_info = lambda: {'name': "ledgerlines", 'url': collector.base_url,
+                                                  'subscriber_count': None, 'last_updated': "2024-01-01T00:00:00"}
+        collector.get_post_engagement = lambda link, likes=likes: build_engagement(likes, "-", "-", "-", 100)
+        collector.analyze_publication(incremental=True)
+        # Age one stored post past refetch_after_days so the next run fetches it again
+        post_store.put(links[0], post_store.get(links[0]), datetime(2024, 1, 1))
+
+    # The reused posts were not recorded again with stale counts
+    assert [t['posts'] for t in store.engagement_totals("ledgerlines.substack.com")] == [3, 1]
+    assert [s['likes_num'] for s in store.post_history("ledgerlines.substack.com", links[0])] == [5, 9]
+    assert len(store.post_history("ledgerlines.substack.com", links[1])) == 1
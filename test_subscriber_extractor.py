@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the subscriber-count strategy pipeline.
+"""
+
+import glob
+import os
+import random
+import sys
+
+import pytest
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+
+from data_collector import SubstackDataCollector
+from legacy_extraction import extract_subscriber_count_legacy
+from subscriber_extractor import PageContext, SubscriberCountPipeline
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+FRAGMENTS = [
+    '<p>Join {n} subscribers</p>',
+    '<p>{n} readers this week</p>',
+    '<span data-subscriber-count="{n}"></span>',
+    '<div class="pub-subscriberCount">{n}</div>',
+    '<div class="top-readers">{n}</div>',
+    '<script>var cfg = {{subscriberCount: {n}}};</script>',
+    '<meta name="subscriber-total" content="{n}">',
+    '<script type="application/ld+json">{{"subscribers": "{n}"}}</script>',
+    '<div data-testid="member-badge">{n}</div>',
+    '<script>window.a = {{"publication": {{"id": 1, "subdomain": "ledgerlines", "subscriber_count": {n}}}}};</script>',
+    '<script>window.b = {{"publication": {{"subdomain": "other", "subscribers": "{n}"}}}};</script>',
+    '<script>window.c = {{"total_subscribers": {n}}};</script>',
+    '<p>Nothing to see here.</p>',
+]
+
+
+def _random_homepage(rng):
+    fragments = [rng.choice(FRAGMENTS).replace('{n}', str(rng.choice([0, 3, 309, 4821, 2000000])))
+                 for _ in range(rng.randint(1, 6))]
+    fragments = [f.replace('{{', '{').replace('}}', '}') for f in fragments]
+    return '<html><head><title>Home</title></head><body>' + ''.join(fragments) + '</body></html>'
+
+
+def _pipeline_count(publication_name, html, soup):
+    count, _ = SubscriberCountPipeline().extract(PageContext(publication_name, html, soup))
+    return count
+
+
+@pytest.mark.parametrize('parser', ['html.parser', 'lxml'])
+def test_pipeline_matches_legacy_extraction(parser):
+    if parser == 'lxml':
+        pytest.importorskip('lxml')
+    pages = [open(path, encoding='utf-8').read() for path in sorted(glob.glob(os.path.join(FIXTURES, 'home_*.html')))]
+    rng = random.Random(99)
+    pages += [_random_homepage(rng) for _ in range(300)]
+
+    for html in pages:
+        soup = BeautifulSoup(html, parser)
+        assert (_pipeline_count('ledgerlines', str(soup), soup)
+                == extract_subscriber_count_legacy(soup, 'ledgerlines'))
+
+
+def test_winning_strategy_is_recorded_and_tried_first():
+    pipeline = SubscriberCountPipeline()
+    collector = SubstackDataCollector("ledgerlines", subscriber_pipeline=pipeline)
+    html = open(os.path.join(FIXTURES, 'home_json_count.html'), encoding='utf-8').read()
+
+    assert collector._extract_subscriber_count(BeautifulSoup(html, 'html.parser'), html) == 4821
+    assert collector.subscriber_count_strategy == 'script_variable'
+    assert pipeline.ordered_strategies('ledgerlines.substack.com')[0][0] == 'script_variable'
+    # Other publications keep the default order
+    assert pipeline.ordered_strategies('cashandcache.substack.com')[0][0] == 'text_pattern'
+
+
+def test_custom_domains_sharing_a_first_label_keep_their_own_winners():
+    pipeline = SubscriberCountPipeline()
+    foo = SubstackDataCollector("https://www.foo.com", subscriber_pipeline=pipeline)
+    html = open(os.path.join(FIXTURES, 'home_json_count.html'), encoding='utf-8').read()
+    foo._extract_subscriber_count(BeautifulSoup(html, 'html.parser'), html)
+
+    assert pipeline.ordered_strategies('www.foo.com')[0][0] == 'script_variable'
+    assert pipeline.ordered_strategies('www.bar.com')[0][0] == 'text_pattern'
+
+
+def test_embedded_json_scan_handles_unterminated_publication_objects():
+    # Thousands of "publication" keys with no closing brace made the old
+    # [^}]* patterns rescan the rest of the page for every occurrence
+    html = '<script>' + ('"publication": {"subdomain": "x", "name": "' + 'a' * 50 + '", ') * 4000 + '</script>'
+    html += '<script>{"publication": {"subdomain": "ledgerlines", "subscribers": 77}}</script>'
+    soup = BeautifulSoup('<html></html>', 'html.parser')
+    pipeline = SubscriberCountPipeline([s for s in SubscriberCountPipeline().strategies if s[0] == 'embedded_json'])
+
+    assert pipeline.extract(PageContext('ledgerlines', html, soup)) == (77, 'embedded_json')
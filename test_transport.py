@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the shared HTTP transport against the local replay server.
+"""
+
+import time
+
+import pytest
+import requests
+
+from data_collector import SubstackDataCollector
+from transport import Transport
+
+FEED = b"""<?xml version="1.0"?><rss><channel>
+<item><title>Hello</title><link>https://example.substack.com/p/hello</link></item>
+</channel></rss>"""
+
+
+def _slow_feed(request):
+    time.sleep(1)
+    return 'application/rss+xml', FEED
+
+
+@pytest.fixture
+def keep_alive_server(replay_server):
+    # The server gzips bodies for clients that accept it
+    replay_server.routes = {'*': ('application/rss+xml', FEED), '/slow': _slow_feed}
+    return replay_server
+
+
+def test_collectors_sharing_a_transport_reuse_one_connection(keep_alive_server):
+    with Transport(pool_size=2) as transport:
+        for _ in range(3):
+            collector = SubstackDataCollector(keep_alive_server.url, requests_per_second=0, transport=transport)
+            assert collector.fetch_posts()[0]['title'] == "Hello"
+
+    requests_seen = keep_alive_server.requests
+    assert len(requests_seen) == 3
+    assert len({request.client_address for request in requests_seen}) == 1
+    assert all('gzip' in request.headers.get('Accept-Encoding', '') for request in requests_seen)
+
+
+def test_read_timeout_is_enforced(keep_alive_server):
+    with Transport(read_timeout=0.2) as transport:
+        with pytest.raises(requests.Timeout):
+            transport.get(f"{keep_alive_server.url}/slow")
+
+
+def test_subscriber_api_goes_through_the_transport():
+    class RecordingTransport(Transport):
+        urls = []
+
+        def get(self, url, **kwargs):
+            self.urls.append(url)
+            response = requests.Response()
+            response.status_code = 200
+            response._content = b'{"publications": [{"subdomain": "ledgerlines", "subscriber_count": 42}]}'
+            return response
+
+    collector = SubstackDataCollector("ledgerlines", requests_per_second=0, transport=RecordingTransport())
+
+    assert collector._get_subscriber_count_from_api() == 42
+    assert RecordingTransport.urls == ["https://substack.com/api/v1/publication/search?query=ledgerlines&limit=20"]
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Shared HTTP transport for the Substack collector.
+
+One Transport owns a pooled keep-alive session with explicit connect/read
+timeouts and compression negotiation. Many collectors can share a single
+Transport, so batch runs reuse open TLS connections to substack.com.
+
+Brotli is requested only when a brotli decoder is installed. HTTP/2 is
+optional and needs httpx with h2 (pip install "httpx[http2]"); without
+them the transport stays on HTTP/1.1.
+"""
+
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import brotli  # noqa: F401  (lets urllib3 decode "br")
+    _HAS_BROTLI = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        _HAS_BROTLI = True
+    except ImportError:
+        _HAS_BROTLI = False
+
+try:
+    import httpx
+    import h2  # noqa: F401
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                      '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+
+
+def accept_encoding() -> str:
+    """Accept-Encoding value for the decoders available in this environment."""
+    return 'gzip, deflate, br' if _HAS_BROTLI else 'gzip, deflate'
+
+
+class Transport:
+    """Pooled, keep-alive HTTP client shared by collectors.
+
+    pool_size should match the number of concurrent requests (for a batch,
+    its max_concurrency) so no worker waits for or discards a connection.
+    """
+
+    def __init__(self, pool_size: int = 10, connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 http2: bool = False, user_agent: str = DEFAULT_USER_AGENT,
+                 headers: Optional[Dict[str, str]] = None):
+        self.pool_size = max(1, pool_size)
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.headers = {
+            'User-Agent': user_agent,
+            'Accept-Encoding': accept_encoding(),
+            'Connection': 'keep-alive',
+            **(headers or {}),
+        }
+
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.http2 = False
+        self._client = None
+        self._client_lock = threading.Lock()
+        if http2:
+            if httpx is None:
+                logger.info("HTTP/2 requested but httpx[http2] is not installed; using HTTP/1.1")
+            else:
+                self.http2 = True
+
+    def _http2_client(self):
+        with self._client_lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    http2=True,
+                    headers=self.headers,
+                    timeout=httpx.Timeout(self.timeout[1], connect=self.timeout[0]),
+                    limits=httpx.Limits(max_connections=self.pool_size,
+                                        max_keepalive_connections=self.pool_size),
+                )
+            return self._client
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET a URL; accepts the requests.get keyword arguments used by the collector."""
+        kwargs.setdefault('timeout', self.timeout)
+        if not self.http2:
+            return self.session.get(url, **kwargs)
+        return self._get_http2(url, **kwargs)
+
+    def _get_http2(self, url: str, headers: Optional[Dict[str, str]] = None, params=None,
+                   timeout=None, stream: bool = False, **_) -> requests.Response:
+        """GET over HTTP/2, returned as a buffered requests.Response for a uniform interface."""
+        connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        try:
+            reply = self._http2_client().get(url, headers=headers, params=params,
+                                             timeout=httpx.Timeout(read_timeout, connect=connect_timeout))
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(str(e)) from e
+
+        response = requests.Response()
+        response.status_code = reply.status_code
+        response.reason = reply.reason_phrase
+        response.headers = CaseInsensitiveDict(reply.headers)
+        response.url = str(reply.url)
+        response.encoding = reply.encoding
+        response._content = reply.content
+        response._content_consumed = True
+        return response
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        self.session.close()
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
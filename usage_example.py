@@ -7,7 +7,12 @@ This example shows how to use the improved Substack Analytics system
 with flexible URL input and accurate data extraction.
 """
 
+import logging
+
 from data_collector import SubstackDataCollector
+from http_cache import HttpCache
+
+http_cache = HttpCache()
 
 def analyze_publication(publication_input):
     """
@@ -22,8 +27,9 @@ def analyze_publication(publication_input):
     print(f"Analyzing: {publication_input}")
     print("=" * 60)
     
-    # Create collector with flexible input
-    collector = SubstackDataCollector(publication_input)
+    # Create collector with flexible input; the shared cache means the
+    # repeated examples below only revalidate pages instead of re-downloading
+    collector = SubstackDataCollector(publication_input, http_cache=http_cache)
     
     # Run analysis
     analysis = collector.analyze_publication(limit=10)
@@ -58,6 +64,8 @@ def analyze_publication(publication_input):
     return analysis
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+    
     # Example 1: Using publication name
     print("Example 1: Using publication name")
     analyze_publication("cashandcache")
@@ -4,38 +4,77 @@ Substack Analytics Web Dashboard
 A beautiful web interface for displaying Substack analytics data
 """
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request, stream_with_context
 import json
+import logging
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from data_collector import SubstackDataCollector
+from http_cache import HttpCache
+from analysis_store import AnalysisCache, AnalysisStore
+from jobs import JobManager
+from metrics import default_registry
+from snapshot_store import SnapshotStore
+from transport import Transport
 
 app = Flask(__name__)
+logger = logging.getLogger(__name__)
+
+# Shared across requests so repeated analyses revalidate instead of re-downloading.
+# Dashboard analyses exist to pick up new likes and comments, so homepages and
+# posts are always revalidated with a conditional GET rather than served from
+# the cache unchecked for hours (the feed keeps its short default TTL)
+http_cache = HttpCache(ttls={'homepage': 0, 'post': 0})
+
+# Engagement history recorded by every analysis the dashboard runs
+snapshot_store = SnapshotStore()
+
+# One connection pool for every collector the dashboard creates
+transport = Transport(pool_size=8)
+
+def publication_key(publication):
+    """Cache key for a publication given as a Substack name or a custom-domain host."""
+    if '.' in publication:
+        publication = f"https://{publication}"
+    return SubstackDataCollector.publication_key_for(publication)
+
+def analyze_publication(key):
+    """Run a fresh analysis of a publication, given its key (host)."""
+    collector = SubstackDataCollector(f"https://{key}", http_cache=http_cache,
+                                      snapshot_store=snapshot_store, transport=transport)
+    return collector.analyze_publication()
+
+# Latest analysis per publication key; stale entries are refreshed in the background
+analysis_cache = AnalysisCache(analyze_publication, store=AnalysisStore(), ttl_seconds=3600)
+
+# Analyses run in the background so requests return immediately
+job_manager = JobManager(
+    max_workers=2,
+    collector_factory=lambda publication_url: SubstackDataCollector(publication_url, http_cache=http_cache,
+                                                                     snapshot_store=snapshot_store, transport=transport),
+    on_result=lambda collector, analysis: analysis_cache.put(collector.publication_key, analysis),
+)
 
 def load_analytics_data(publication_name):
-    """Load analytics data from the most recent Excel file or run fresh analysis."""
+    """Load analytics data from the analysis cache, analyzing only if nothing is stored."""
     try:
-        # Look for the most recent Excel file
-        excel_files = [f for f in os.listdir('.') if f.startswith(f'substack_analytics_{publication_name}_') and f.endswith('.xlsx')]
-        
-        if excel_files:
-            # Get the most recent file
-            latest_file = max(excel_files, key=os.path.getctime)
-            print(f"Loading data from: {latest_file}")
-            
-            # For now, we'll run fresh analysis to get the data
-            # In a production environment, you might want to parse the Excel file
-            collector = SubstackDataCollector(f"https://{publication_name}.substack.com")
-            return collector.analyze_publication()
-        else:
-            # No existing file, run fresh analysis
-            print("No existing data found, running fresh analysis...")
-            collector = SubstackDataCollector(f"https://{publication_name}.substack.com")
-            return collector.analyze_publication()
+        return analysis_cache.get(publication_key(publication_name))
     except Exception as e:
-        print(f"Error loading analytics data: {e}")
+        logger.warning("Error loading analytics data: %s", e)
         return None
 
+@app.after_request
+def count_request(response):
+    """Count dashboard requests per endpoint and status for /metrics."""
+    default_registry.inc('dashboard_requests_total', description='Dashboard HTTP requests',
+                         endpoint=request.endpoint or 'unknown', status=response.status_code)
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus-style collector and dashboard metrics."""
+    return Response(default_registry.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/')
 def dashboard():
     """Main dashboard page."""
@@ -64,7 +103,7 @@ def get_analytics(publication_name):
 
 @app.route('/api/run_analysis', methods=['POST'])
 def run_analysis():
-    """API endpoint to run fresh analysis."""
+    """API endpoint to start a fresh analysis in the background."""
     try:
         data = request.get_json()
         publication_url = data.get('publication_url', '')
@@ -75,22 +114,122 @@ def run_analysis():
                 'error': 'Publication URL is required'
             })
         
-        collector = SubstackDataCollector(publication_url)
-        analysis = collector.analyze_publication()
-        
-        if 'error' in analysis:
-            return jsonify({
-                'success': False,
-                'error': analysis['error']
-            })
-        
-        # Also export to Excel
-        excel_filename = collector.export_to_excel(analysis)
+        # Requests for a publication that is already being analyzed share its job
+        job, created = job_manager.submit(publication_url)
         
         return jsonify({
             'success': True,
-            'data': analysis,
-            'excel_file': excel_filename
+            'job_id': job.id,
+            'deduplicated': not created,
+            'status': job.status
+        }), 202
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """API endpoint to get the status and progress of an analysis job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'job': job.to_dict()
+    })
+
+def format_sse(event, data, event_id=None):
+    """One Server-Sent Events message."""
+    message = f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+    return f"id: {event_id}\n{message}" if event_id is not None else message
+
+# Idle streams get a comment this often so proxies keep them open
+SSE_KEEPALIVE_SECONDS = 15
+
+@app.route('/api/jobs/<job_id>/events')
+def stream_job_events(job_id):
+    """Server-Sent Events for a job: start, one event per analyzed post with running totals, final status.
+
+    Each client follows the job's bounded event log at its own pace, so a
+    slow client never blocks the analysis. Reconnecting clients resume
+    after Last-Event-ID; a client that fell too far behind gets a 'lagged'
+    event with the current job state in place of the dropped events.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+    
+    last_event_id = request.headers.get('Last-Event-ID', default=-1, type=int)
+    
+    def stream():
+        after = last_event_id
+        while True:
+            events, missed, closed = job.events.read(after, timeout=SSE_KEEPALIVE_SECONDS)
+            if missed:
+                yield format_sse('lagged', {'missed': missed, 'job': job.to_dict()})
+            for event_id, event, data in events:
+                yield format_sse(event, data, event_id)
+                after = event_id
+            if closed:
+                return
+            if not events and not missed:
+                yield ": keep-alive\n\n"
+    
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/jobs/<job_id>/result')
+def get_job_result(job_id):
+    """API endpoint to get the final result of an analysis job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+    
+    if not job.finished:
+        return jsonify({
+            'success': False,
+            'error': 'Job is still running',
+            'job': job.to_dict()
+        }), 202
+    
+    if job.error:
+        return jsonify({
+            'success': False,
+            'error': job.error
+        })
+    
+    return jsonify({
+        'success': True,
+        'data': job.result,
+        'excel_file': job.excel_file
+    })
+
+@app.route('/api/history/<publication_name>')
+def get_history(publication_name):
+    """API endpoint for engagement and subscriber growth from stored snapshots (no scraping)."""
+    try:
+        days = request.args.get('days', type=float)
+        key = publication_key(publication_name)
+        since = datetime.now() - timedelta(days=days) if days else None
+        return jsonify({
+            'success': True,
+            'data': {
+                'subscriber_growth': snapshot_store.subscriber_growth(key, since),
+                'engagement_totals': snapshot_store.engagement_totals(key, since),
+                'top_movers': snapshot_store.post_deltas(key, since, limit=10)
+            }
         })
     except Exception as e:
         return jsonify({
@@ -99,6 +238,8 @@ def run_analysis():
         })
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(name)s: %(message)s')
+    
     # Create templates directory if it doesn't exist
     if not os.path.exists('templates'):
         os.makedirs('templates')